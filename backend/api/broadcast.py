@@ -0,0 +1,256 @@
+"""
+Diffusion des images d'une session en direct à plusieurs spectateurs.
+
+Un thread par session lit la source, détecte, floute et encode chaque image une
+seule fois, puis publie la dernière image encodée. Les spectateurs (flux MJPEG,
+requêtes /frame) lisent la plus récente: un spectateur lent saute des images au
+lieu d'accumuler du retard. Le thread est cadencé sur l'horloge murale
+(utils.frame_pacing): il saute les images en retard plutôt que de ralentir.
+"""
+
+import time
+import base64
+import threading
+import cv2
+from typing import Dict, Any, Optional, Tuple
+
+from utils.frame_pacing import FramePacer
+from utils.metrics import STAGE_DURATION, STREAM_FRAMES_DROPPED
+
+# Rendu demandé par un spectateur: (floutage, rectangles de détection)
+Variant = Tuple[bool, bool]
+
+
+def variant_label(variant: Variant) -> str:
+    """Étiquette de métrique d'un rendu: 'blur', 'blur+detections', 'detections' ou 'raw'."""
+    apply_blur, draw_detections = variant
+    parts = (["blur"] if apply_blur else []) + (["detections"] if draw_detections else [])
+    return "+".join(parts) or "raw"
+
+
+class BroadcastFrame:
+    """Image encodée publiée pour un rendu, partagée par tous ses spectateurs."""
+
+    def __init__(self, sequence: int, jpeg: bytes, detection_data: Dict[str, Any]):
+        self.sequence = sequence
+        self.jpeg = jpeg
+        self.detection_data = detection_data
+        self._base64: Optional[str] = None
+
+    def as_base64(self) -> str:
+        """Image encodée en base64 (calculée une fois pour toutes les requêtes /frame)."""
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self.jpeg).decode('utf-8')
+        return self._base64
+
+
+class FrameBroadcaster:
+    """
+    Thread de capture et de traitement d'une session, publiant la dernière image
+    de chaque rendu demandé.
+
+    Le thread démarre avec le premier spectateur et s'arrête lorsque plus aucun
+    spectateur ne s'est manifesté depuis idle_timeout secondes: une source sans
+    spectateur n'est pas lue.
+    """
+
+    def __init__(self, session, idle_timeout: float = 5.0, max_errors: int = 10):
+        """
+        Args:
+            session: VideoSession diffusée
+            idle_timeout: Durée (s) sans spectateur après laquelle le thread s'arrête
+            max_errors: Nombre d'échecs de lecture consécutifs avant l'arrêt de la session
+        """
+        self.session = session
+        self.idle_timeout = idle_timeout
+        self.max_errors = max_errors
+
+        # Dernière image publiée par rendu
+        self._latest: Dict[Variant, BroadcastFrame] = {}
+        # Flux abonnés et dernière requête /frame, par rendu
+        self._subscribers: Dict[Variant, int] = {}
+        self._last_request: Dict[Variant, float] = {}
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        # Horloge de diffusion, reconfigurée à chaque démarrage du thread
+        self.pacer = FramePacer()
+
+    def subscribe(self, variant: Variant):
+        """Inscrit un flux MJPEG pour un rendu (à désinscrire avec unsubscribe)."""
+        with self._condition:
+            self._subscribers[variant] = self._subscribers.get(variant, 0) + 1
+            self._last_request[variant] = time.monotonic()
+        self.ensure_running()
+
+    def unsubscribe(self, variant: Variant):
+        """Désinscrit un flux MJPEG."""
+        with self._condition:
+            count = self._subscribers.get(variant, 0) - 1
+            if count > 0:
+                self._subscribers[variant] = count
+            else:
+                self._subscribers.pop(variant, None)
+            # Le rendu reste produit pendant le délai d'inactivité (reconnexion du navigateur)
+            self._last_request[variant] = time.monotonic()
+
+    def latest(self, variant: Variant, timeout: float = 5.0) -> Optional[BroadcastFrame]:
+        """
+        Dernière image publiée pour un rendu (requête /frame), en attendant la
+        première si le rendu n'est pas encore produit.
+
+        Returns:
+            Image publiée, ou None si aucune image n'a pu être produite à temps
+        """
+        with self._condition:
+            self._last_request[variant] = time.monotonic()
+        self.ensure_running()
+        return self.wait_next(variant, -1, timeout)
+
+    def wait_next(self, variant: Variant, after_sequence: int, timeout: float = 5.0) -> Optional[BroadcastFrame]:
+        """
+        Attend une image plus récente que after_sequence (flux MJPEG).
+
+        Seule la dernière image est conservée: les images publiées pendant que le
+        spectateur envoyait la précédente sont sautées.
+
+        Args:
+            variant: Rendu demandé
+            after_sequence: Numéro de la dernière image reçue par le spectateur
+            timeout: Délai maximal d'attente en secondes
+
+        Returns:
+            Image publiée, ou None à l'expiration du délai ou à l'arrêt de la session
+        """
+        def available():
+            frame = self._latest.get(variant)
+            return (frame is not None and frame.sequence > after_sequence) or not self.session.is_running
+
+        with self._condition:
+            self._condition.wait_for(available, timeout=timeout)
+            frame = self._latest.get(variant)
+            if frame is not None and frame.sequence > after_sequence:
+                return frame
+            return None
+
+    def latest_detection_data(self) -> Optional[Dict[str, Any]]:
+        """Données de détection de la dernière image diffusée (None si la diffusion est arrêtée)."""
+        with self._condition:
+            if not self.is_running() or not self._latest:
+                return None
+            return max(self._latest.values(), key=lambda frame: frame.sequence).detection_data
+
+    def is_running(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Spectateurs abonnés, rendus produits et cadence de diffusion."""
+        with self._condition:
+            return {
+                "broadcasting": self.is_running(),
+                "viewers": sum(self._subscribers.values()),
+                "variants": len(self._active_variants(time.monotonic())),
+                "frames_published": self._sequence,
+                **self.pacer.get_stats()
+            }
+
+    def stop(self):
+        """Arrête le thread (sans l'attendre s'il s'agit du thread appelant)."""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5.0)
+
+    def ensure_running(self):
+        """Démarre le thread s'il n'est pas en cours (jamais pour une session arrêtée)."""
+        with self._condition:
+            if not self.session.is_running:
+                return
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name=f"session-{self.session.session_id}", daemon=True
+                )
+                self._thread.start()
+
+    def _active_variants(self, now: float) -> Tuple[Variant, ...]:
+        """Rendus ayant un flux abonné ou une requête récente (verrou détenu)."""
+        for variant, last_request in list(self._last_request.items()):
+            if variant not in self._subscribers and now - last_request > self.idle_timeout:
+                # Rendu abandonné: son image ne doit pas être resservie plus tard
+                del self._last_request[variant]
+                self._latest.pop(variant, None)
+        return tuple(self._last_request)
+
+    def _run(self):
+        session = self.session
+        error_count = 0
+
+        with self._condition:
+            self.pacer.configure(*session.stream_rate())
+
+        try:
+            while session.is_running and not self._stop_event.is_set():
+                with self._condition:
+                    variants = self._active_variants(time.monotonic())
+                    if not variants:
+                        # Plus aucun spectateur: le prochain relancera un thread
+                        self._thread = None
+                        return
+
+                try:
+                    # Détection une seule fois, puis un rendu et un encodage par variante demandée
+                    with session.lock:
+                        # Échéances dépassées: les images correspondantes du fichier sont sautées
+                        dropped = self.pacer.frames_dropped
+                        skip = self.pacer.next_frame()
+                        if skip:
+                            session.skip_frames(skip)
+                        if self.pacer.frames_dropped > dropped:
+                            STREAM_FRAMES_DROPPED.inc(self.pacer.frames_dropped - dropped)
+
+                        frame = session.get_frame()
+                        if frame is None:
+                            raise RuntimeError("Impossible de récupérer une image")
+
+                        faces_data = session.detect(frame)
+                        detection_data = session.detection_data(frame, faces_data)
+                        encoded = {}
+                        for apply_blur, draw_detections in variants:
+                            result_frame = session.render(frame, faces_data, draw_detections, apply_blur)
+                            with STAGE_DURATION.time(stage="jpeg_encode", source="live"):
+                                _, buffer = cv2.imencode('.jpg', result_frame)
+                            encoded[(apply_blur, draw_detections)] = buffer.tobytes()
+
+                    with self._condition:
+                        self._sequence += 1
+                        for variant, jpeg in encoded.items():
+                            self._latest[variant] = BroadcastFrame(self._sequence, jpeg, detection_data)
+                        delay = self.pacer.frame_published()
+                        self._condition.notify_all()
+
+                    # Réinitialiser le compteur d'erreurs si une image est traitée avec succès
+                    error_count = 0
+
+                    # Attendre l'échéance suivante, jamais lorsque le traitement est en retard
+                    if delay > 0:
+                        self._stop_event.wait(delay)
+
+                except Exception as e:
+                    error_count += 1
+                    print(f"Erreur dans la diffusion de la session ({error_count}/{self.max_errors}): {e}")
+                    if error_count >= self.max_errors:
+                        print("Trop d'erreurs, arrêt de la session")
+                        session.stop()
+                        break
+                    time.sleep(0.1)  # Petit délai pour éviter une boucle trop rapide
+        finally:
+            # Réveiller les spectateurs en attente (session arrêtée ou thread terminé)
+            with self._condition:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+                self._condition.notify_all()
@@ -0,0 +1,237 @@
+"""
+Gestion des traitements vidéo asynchrones (jobs).
+"""
+
+import os
+import time
+import uuid
+import shutil
+import threading
+from dataclasses import asdict, fields
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
+
+from core.face_detector import FaceDetector
+from core.blur_processor import BlurProcessor
+from utils.video_utils import VideoProcessor
+from api.schemas import ProcessingStatusResponse
+import config
+
+# Champs du statut exposés par l'API
+STATUS_FIELDS = [field.name for field in fields(ProcessingStatusResponse)]
+
+# Statistiques de réutilisation des détections suivies pendant le traitement
+DETECTION_STATS_FIELDS = ("detections_reused", "detections_cached", "detections_fresh", "static_frame_threshold")
+
+class ProcessingJob:
+    """Traitement d'une vidéo exécuté en arrière-plan."""
+
+    def __init__(self,
+                 output_path: str,
+                 detector_settings: Dict[str, Any],
+                 blur_settings: Dict[str, Any],
+                 input_path: str = "",
+                 prepare_input: Optional[Callable[[], str]] = None,
+                 selected_faces: Optional[List[int]] = None,
+                 processor_options: Optional[Dict[str, Any]] = None,
+                 session_id: Optional[str] = None,
+                 action: str = "render"):
+        """
+        Prépare un job de traitement.
+
+        Args:
+            output_path: Chemin du fichier vidéo de sortie (ou dossier de l'index pour une analyse)
+            detector_settings: Paramètres du FaceDetector créé pour ce job
+            blur_settings: Paramètres du BlurProcessor créé pour ce job
+            input_path: Chemin de la vidéo d'entrée
+            prepare_input: Fonction exécutée en arrière-plan qui produit la vidéo
+                           d'entrée (capture webcam) et retourne son chemin
+            selected_faces: Liste des indices des visages à flouter (None = tous)
+            processor_options: Options supplémentaires de VideoProcessor
+            session_id: Session à l'origine du job
+            action: 'render' (vidéo floutée) ou 'analyze' (index des pistes de visages)
+        """
+        self.job_id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.action = action
+        self.input_path = input_path
+        self.output_path = output_path
+        self.prepare_input = prepare_input
+        self.detector_settings = detector_settings
+        self.blur_settings = blur_settings
+        self.selected_faces = selected_faces
+        self.processor_options = dict(processor_options or {})
+        self.created_at = time.time()
+
+        self.status = asdict(ProcessingStatusResponse(
+            status="queued",
+            progress=0.0,
+            frames_processed=0,
+            total_frames=0,
+            elapsed_time=0.0,
+            estimated_time_remaining=0.0
+        ))
+
+        # Numéro de version incrémenté à chaque mise à jour (pour les flux SSE)
+        self.version = 0
+        self._condition = threading.Condition()
+        self._processor: Optional[VideoProcessor] = None
+
+    def update(self, **status_fields):
+        """Met à jour le statut et réveille les clients en attente."""
+        with self._condition:
+            self.status.update(status_fields)
+            self.version += 1
+            self._condition.notify_all()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Retourne une copie du statut courant."""
+        with self._condition:
+            return {"job_id": self.job_id, **self.status}
+
+    def is_finished(self) -> bool:
+        """Indique si le job est terminé (avec succès ou en erreur)."""
+        return self.status["status"] in ("completed", "error")
+
+    def wait_for_change(self, version: int, timeout: Optional[float] = None) -> int:
+        """
+        Attend une mise à jour postérieure à la version donnée.
+
+        Args:
+            version: Dernière version connue par l'appelant
+            timeout: Délai maximal d'attente en secondes
+
+        Returns:
+            Version courante du statut
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.version != version or self.is_finished(),
+                timeout=timeout
+            )
+            return self.version
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Attend la fin du job et retourne son statut."""
+        with self._condition:
+            self._condition.wait_for(self.is_finished, timeout=timeout)
+        return self.get_status()
+
+    def run(self):
+        """Exécute le traitement (appelé par le JobManager dans un thread de fond)."""
+        face_detector = None
+
+        try:
+            self.update(status="processing")
+
+            if self.prepare_input is not None:
+                self.input_path = self.prepare_input()
+
+            # Détecteur dédié: celui de la session peut être utilisé en parallèle par le flux
+            face_detector = FaceDetector(**self.detector_settings)
+            blur_processor = BlurProcessor(**self.blur_settings)
+
+            processor = self._processor = VideoProcessor(
+                self.input_path,
+                self.output_path,
+                face_detector,
+                blur_processor,
+                progress_callback=self._on_progress,
+                **self.processor_options
+            )
+            if self.action == "analyze":
+                result = processor.analyze_video(self.output_path)
+            else:
+                result = processor.process_video(selected_faces=self.selected_faces)
+            self.update(**{key: result[key] for key in STATUS_FIELDS if key in result})
+
+        except Exception as e:
+            print(f"Erreur lors du traitement du job {self.job_id}: {e}")
+            self.update(status="error", error_message=str(e))
+
+        finally:
+            if face_detector is not None:
+                face_detector.release()
+
+    def _on_progress(self, progress: float, frames_processed: int, total_frames: int,
+                     elapsed_time: float, estimated_time_remaining: float):
+        """Fonction de rappel de VideoProcessor."""
+        processing_status = self._processor.processing_status if self._processor else {}
+        self.update(
+            progress=progress,
+            frames_processed=frames_processed,
+            total_frames=total_frames,
+            elapsed_time=elapsed_time,
+            estimated_time_remaining=estimated_time_remaining,
+            **{key: processing_status[key] for key in DETECTION_STATS_FIELDS if key in processing_status}
+        )
+
+
+def remove_job_output(output_path: str):
+    """Supprime la vidéo rendue ou le dossier d'index d'un job oublié."""
+    try:
+        if os.path.isdir(output_path):
+            shutil.rmtree(output_path)
+        elif os.path.exists(output_path):
+            os.remove(output_path)
+    except OSError as e:
+        print(f"Impossible de supprimer {output_path}: {e}")
+
+
+class JobManager:
+    """Exécute les jobs de traitement sur un pool de threads et garde leur historique."""
+
+    def __init__(self, max_workers: int = 2):
+        """
+        Args:
+            max_workers: Nombre de jobs traités simultanément
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="processing-job")
+        self._jobs: Dict[str, ProcessingJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, job: ProcessingJob) -> ProcessingJob:
+        """Enregistre un job et le place dans la file d'exécution."""
+        with self._lock:
+            expired_outputs = self._prune_finished_jobs()
+            self._jobs[job.job_id] = job
+        self._executor.submit(job.run)
+
+        # Suppression hors du verrou: un index de visages peut être un dossier volumineux
+        for output_path in expired_outputs:
+            remove_job_output(output_path)
+        return job
+
+    def get(self, job_id: str) -> Optional[ProcessingJob]:
+        """Retourne le job correspondant à l'identifiant, ou None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune_finished_jobs(self) -> List[str]:
+        """
+        Oublie les jobs terminés depuis plus de config.JOB_RETENTION_SECONDS.
+
+        Returns:
+            Sorties (vidéos ou dossiers d'index) des jobs oubliés qu'aucun job conservé
+            n'utilise encore, à supprimer
+        """
+        limit = time.time() - config.JOB_RETENTION_SECONDS
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.is_finished() and job.created_at < limit]
+        expired_outputs = {self._jobs.pop(job_id).output_path for job_id in expired}
+
+        # Un index de visages est partagé par les jobs d'une même vidéo
+        in_use = set()
+        for job in self._jobs.values():
+            in_use.add(job.output_path)
+            in_use.add(job.processor_options.get("face_index_path"))
+        return [path for path in expired_outputs if path and path not in in_use]
+
+    def queue_depth(self) -> int:
+        """Nombre de jobs en attente d'exécution."""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status["status"] == "queued")
+
+
+# Gestionnaire partagé par toutes les routes
+JOB_MANAGER = JobManager(max_workers=config.PROCESSING_JOB_WORKERS)
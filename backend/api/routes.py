@@ -3,9 +3,11 @@ Routes API pour l'application Blur Face utilisant Flask-RESTX.
 """
 
 import os
+import json
 import time
 import uuid
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional, Tuple
 import cv2
 import numpy as np
 from flask import Flask, request, Response
@@ -16,8 +18,25 @@ from flask import send_file
 
 
 from core.face_detector import FaceDetector
+from core.detector_backends import DETECTOR_BACKENDS
+from core.detector_pool import DETECTOR_POOL
 from core.blur_processor import BlurProcessor
-from utils.video_utils import get_available_webcams, get_video_info
+from core.face_tracker import FaceTracker
+from core.frame_gate import StaticFrameGate
+from core.detections import Detections
+from utils.video_utils import get_available_webcams, get_video_info, extract_frame
+from utils.frame_buffers import FrameRing
+from utils.frame_access import build_keyframe_index_async
+from utils.camera_registry import CAMERA_REGISTRY
+from utils.metrics import (
+    REGISTRY, STAGE_DURATION, FACES_PER_FRAME, FRAMES_SERVED,
+    ACTIVE_STREAMS, ACTIVE_SESSIONS_GAUGE, JOB_QUEUE_DEPTH,
+    DETECTOR_POOL_IDLE, DETECTOR_POOL_LEASED
+)
+from utils.face_index import FaceIndex, face_index_path
+from api.jobs import JOB_MANAGER, ProcessingJob
+from api.broadcast import FrameBroadcaster, variant_label
+from api.schemas import VideoStreamSettings
 import config
 
 # Dictionnaire pour stocker les sessions actives
@@ -32,23 +51,50 @@ class VideoSession:
         self.device_id = device_id
         self.file_path = file_path
         self.cap = None
+        self.camera_reserved = False
+        self.start_error: Optional[str] = None
         self.face_detector = FaceDetector(
             min_detection_confidence=config.FACE_DETECTION_CONFIDENCE,
-            model_selection=1
+            model_selection=1,
+            detection_size=config.FACE_DETECTION_SIZE,
+            detection_scale=config.FACE_DETECTION_SCALE,
+            roi_tracking=config.FACE_ROI_TRACKING,
+            full_scan_interval=config.FACE_FULL_SCAN_INTERVAL,
+            roi_padding=config.FACE_ROI_PADDING,
+            backend=config.FACE_DETECTION_MODEL
         )
         self.blur_processor = BlurProcessor(
             blur_method=config.DEFAULT_BLUR_METHOD,
             blur_intensity=config.DEFAULT_BLUR_INTENSITY
         )
+        self.detection_interval = config.DETECTION_INTERVAL
+        self.static_frame_threshold = config.STATIC_FRAME_THRESHOLD
+        self.build_frame_detector()
         self.is_running = False
         self.frame_count = 0
         self.selected_faces = None
+        self.selected_tracks = None
         self.last_frame = None
         
+        # Lecture et traitement de la source, réservés au thread de diffusion
+        # (et aux requêtes ponctuelles lorsqu'il ne tourne pas)
+        self.lock = threading.Lock()
+        self.broadcaster = FrameBroadcaster(self, idle_timeout=config.SESSION_BROADCAST_IDLE_TIMEOUT)
+        self.stream_settings = VideoStreamSettings(fps=config.STREAM_TARGET_FPS)
+        
+        # Images lues et images traitées, décodées et floutées dans des tampons réutilisés
+        self.capture_buffers = FrameRing(config.SESSION_FRAME_BUFFERS) if config.FRAME_BUFFER_REUSE else None
+        self.output_buffers = FrameRing(config.SESSION_FRAME_BUFFERS) if config.FRAME_BUFFER_REUSE else None
+        
     def start(self) -> bool:
         """Démarre la session vidéo."""
         try:
             if self.source_type == "webcam":
+                # Aucun sondage du registre ni aucune autre session ne doit ouvrir la caméra en même temps
+                if not CAMERA_REGISTRY.reserve(self.device_id):
+                    self.start_error = f"Caméra {self.device_id} déjà utilisée par une autre session"
+                    return False
+                self.camera_reserved = True
                 self.cap = cv2.VideoCapture(self.device_id)
             elif self.source_type == "file" and os.path.exists(self.file_path):
                 self.cap = cv2.VideoCapture(self.file_path)
@@ -67,9 +113,24 @@ class VideoSession:
     def stop(self):
         """Arrête la session vidéo."""
         self.is_running = False
+        self.broadcaster.stop()
         if self.cap is not None:
             self.cap.release()
+        if self.camera_reserved:
+            CAMERA_REGISTRY.release(self.device_id)
+            self.camera_reserved = False
         self.face_detector.release()
+    
+    def read_capture(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Lit l'image suivante de la capture, dans le prochain tampon de la session si possible."""
+        if self.capture_buffers is None:
+            return self.cap.read()
+        if self.last_frame is not None:
+            shape = self.last_frame.shape
+        else:
+            shape = (int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        # OpenCV alloue une nouvelle image si les dimensions du tampon ne conviennent pas
+        return self.cap.read(self.capture_buffers.next(shape))
             
     def get_frame(self) -> Optional[np.ndarray]:
         """Récupère une image de la source vidéo."""
@@ -82,7 +143,7 @@ class VideoSession:
                     print("Session not running or capture not initialized")
                     return None
                     
-                ret, frame = self.cap.read()
+                ret, frame = self.read_capture()
                 if not ret or frame is None or frame.size == 0:
                     print(f"Failed to read frame or empty frame (attempt {retry_count+1}/{max_retries})")
                     
@@ -90,7 +151,7 @@ class VideoSession:
                     if self.source_type == "file" and self.cap.get(cv2.CAP_PROP_POS_FRAMES) >= self.cap.get(cv2.CAP_PROP_FRAME_COUNT):
                         print("End of video file reached, resetting to beginning")
                         self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                        ret, frame = self.cap.read()
+                        ret, frame = self.read_capture()
                         if ret and frame is not None and frame.size > 0:
                             self.frame_count += 1
                             self.last_frame = frame
@@ -121,73 +182,181 @@ class VideoSession:
         # Si toutes les tentatives échouent, retourner la dernière image valide ou None
         return self.last_frame
         
-    def process_frame(self, frame: np.ndarray, draw_detections: bool = False, apply_blur: bool = True) -> Dict[str, Any]:
-        """Traite une image pour détecter et flouter les visages."""
-        try:
-            # Vérifier que le frame n'est pas vide
-            if frame is None or frame.size == 0:
-                print("Empty frame received in process_frame")
-                return {
-                    "frame": np.zeros((480, 640, 3), dtype=np.uint8),  # Default blank frame
-                    "detection_data": {
-                        "faces": [],
-                        "frame_id": self.frame_count,
-                        "timestamp": time.time(),
-                        "width": 640,
-                        "height": 480
-                    }
-                }
-            
-            # Détecter les visages
-            _, faces_data = self.face_detector.detect_faces(frame)
-            
-            result_frame = frame.copy()
-            
-            # Appliquer le floutage si demandé
-            if apply_blur and faces_data:
-                # Ajouter une vérification supplémentaire
-                if result_frame.size > 0:
-                    result_frame = self.blur_processor.blur_faces(result_frame, faces_data, self.selected_faces)
-                else:
-                    print("Cannot apply blur to empty frame")
-            
-            # Dessiner les rectangles de détection si demandé
-            if draw_detections:
-                result_frame = self.face_detector.draw_detections(result_frame, faces_data)
-            
-            # Préparer la réponse
-            height, width = frame.shape[:2]
-            
-            response = {
-                "faces": [
-                    {
-                        "bbox": face.get("bbox", {}),
-                        "keypoints": face.get("keypoints", {}),
-                        "score": face.get("score", 0.0),
-                        "face_id": idx
-                    }
-                    for idx, face in enumerate(faces_data)
-                ],
-                "frame_id": self.frame_count,
-                "timestamp": time.time(),
-                "width": width,
-                "height": height
-            }
+    def stream_rate(self) -> Tuple[float, float]:
+        """
+        Cadence de diffusion de la session.
+        
+        Returns:
+            (cadence visée, cadence du fichier lu ou 0 pour une webcam); la cadence
+            visée est celle de la source, plafonnée par stream_settings.fps
+        """
+        target_fps = float(self.stream_settings.fps)
+        source_fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap is not None else 0.0
+        if not 0 < source_fps <= 1000:
+            # Cadence inconnue (certaines webcams, conteneurs mal renseignés)
+            return target_fps, 0.0
+        return min(target_fps, source_fps), (source_fps if self.source_type == "file" else 0.0)
+    
+    def skip_frames(self, count: int) -> int:
+        """Avance un fichier vidéo de count images sans les décoder (rattrapage du temps réel)."""
+        skipped = 0
+        if self.source_type == "file" and self.cap is not None:
+            while skipped < count and self.cap.grab():
+                skipped += 1
+        return skipped
+        
+    def build_frame_detector(self):
+        """(Re)crée le suivi et le filtre d'images statiques autour du détecteur courant."""
+        self.face_tracker = FaceTracker(
+            self.face_detector,
+            detection_interval=self.detection_interval,
+            min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
+        )
+        self.frame_gate = StaticFrameGate(
+            self.face_tracker,
+            threshold=self.static_frame_threshold,
+            scene_cut_threshold=config.SCENE_CUT_THRESHOLD
+        )
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques de détection du flux de la session."""
+        return {
+            "frame_count": self.frame_count,
+            "is_running": self.is_running,
+            "static_frame_threshold": self.static_frame_threshold,
+            "detections_reused": self.frame_gate.reused_frames,
+            "detections_fresh": self.frame_gate.fresh_detections,
+            "scene_cuts": self.frame_gate.scene_cuts,
+            "detector_calls": self.face_tracker.detector_calls,
+            "full_scans": self.face_detector.full_scans,
+            "roi_scans": self.face_detector.roi_scans,
+            **self.broadcaster.get_stats()
+        }
+    
+    def detector_settings(self) -> Dict[str, Any]:
+        """Paramètres permettant de recréer le détecteur de la session."""
+        return {
+            "min_detection_confidence": self.face_detector.min_detection_confidence,
+            "model_selection": self.face_detector.model_selection,
+            "detection_size": self.face_detector.detection_size,
+            "detection_scale": self.face_detector.detection_scale,
+            "roi_tracking": self.face_detector.roi_tracking,
+            "full_scan_interval": self.face_detector.full_scan_interval,
+            "roi_padding": self.face_detector.roi_padding,
+            "backend": self.face_detector.backend_name
+        }
+    
+    def detection_settings(self) -> Dict[str, Any]:
+        """Paramètres qui déterminent les détections (clé des caches et de l'index des pistes)."""
+        return {
+            **self.detector_settings(),
+            "detection_interval": self.detection_interval,
+            "static_frame_threshold": self.static_frame_threshold
+        }
+    
+    def face_index_path(self) -> Optional[str]:
+        """Dossier de l'index des pistes de la vidéo de la session (sources fichier uniquement)."""
+        if self.source_type != "file" or not os.path.exists(self.file_path):
+            return None
+        return face_index_path(self.file_path, self.detection_settings())
+    
+    def capture_clip(self, output_path: str, duration: float = 5.0, fps: int = 30) -> str:
+        """
+        Enregistre quelques secondes de la source vidéo dans un fichier.
+        
+        Args:
+            output_path: Chemin du fichier à écrire
+            duration: Durée de la capture en secondes
+            fps: Images par seconde de l'enregistrement
             
-            return {"frame": result_frame, "detection_data": response}
-        except Exception as e:
-            print(f"Erreur détaillée lors du traitement de l'image : {e}")
-            # Retourner un frame vide en cas d'erreur
-            return {
-                "frame": np.zeros((480, 640, 3), dtype=np.uint8),
-                "detection_data": {
-                    "faces": [],
-                    "frame_id": self.frame_count,
-                    "timestamp": time.time(),
-                    "width": 640,
-                    "height": 480
-                }
-            }
+        Returns:
+            Chemin du fichier écrit
+        """
+        frames_to_capture = int(duration * fps)
+        
+        # Configurer l'enregistreur vidéo
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+        out = cv2.VideoWriter(
+            output_path,
+            fourcc,
+            fps,
+            (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        )
+        
+        # Capturer les images (la diffusion de la session est suspendue pendant la capture)
+        frames_captured = 0
+        with self.lock:
+            while frames_captured < frames_to_capture:
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                out.write(frame)
+                frames_captured += 1
+        
+        out.release()
+        return output_path
+        
+    def next_output_buffer(self, frame: np.ndarray) -> np.ndarray:
+        """Tampon de la prochaine image traitée (nouvelle image si les tampons ne sont pas réutilisés)."""
+        if self.output_buffers is None:
+            return np.empty_like(frame)
+        return self.output_buffers.next(frame.shape, frame.dtype)
+        
+    def detect(self, frame: np.ndarray) -> Detections:
+        """
+        Détecte les visages (ou les suit entre deux images clés, ou réutilise les
+        détections précédentes si l'image n'a pas changé).
+        """
+        with STAGE_DURATION.time(stage="detect", source="live"):
+            _, faces_data = self.frame_gate.detect_faces(frame)
+        FACES_PER_FRAME.observe(len(faces_data), source="live")
+        return faces_data
+    
+    def render(self, frame: np.ndarray, faces_data: Detections, draw_detections: bool = False,
+               apply_blur: bool = True) -> np.ndarray:
+        """
+        Floute et/ou annote une image déjà analysée.
+        
+        L'image lue n'est jamais modifiée (elle reste la dernière image de la session);
+        sans floutage ni annotations, elle est renvoyée telle quelle. Le résultat
+        n'est valide que jusqu'aux rendus suivants (tampons réutilisés).
+        """
+        result_frame = frame
+        
+        # Appliquer le floutage si demandé
+        if apply_blur and faces_data:
+            with STAGE_DURATION.time(stage="blur", source="live"):
+                result_frame = self.blur_processor.blur_faces(
+                    frame, faces_data, self.selected_faces, out=self.next_output_buffer(frame)
+                )
+        
+        # Dessiner les rectangles de détection si demandé
+        if draw_detections:
+            if result_frame is frame:
+                result_frame = self.next_output_buffer(frame)
+                np.copyto(result_frame, frame)
+            result_frame = self.face_detector.draw_detections(result_frame, faces_data, in_place=True)
+        
+        return result_frame
+    
+    def detection_data(self, frame: np.ndarray, faces_data: Detections) -> Dict[str, Any]:
+        """Données de détection d'une image, au format de l'API."""
+        height, width = frame.shape[:2]
+        return {
+            "faces": faces_data.to_dicts(),
+            "frame_id": self.frame_count,
+            "timestamp": time.time(),
+            "width": width,
+            "height": height
+        }
+
+def owned_webcams() -> Dict[int, Any]:
+    """Webcams ouvertes par les sessions actives (indice -> capture)."""
+    return {
+        session.device_id: session.cap
+        for session in list(ACTIVE_SESSIONS.values())
+        if session.source_type == "webcam" and session.is_running
+    }
 
 def configure_routes(app: Flask, api: Api):
     """Configure les routes pour l'application Flask avec Flask-RESTX."""
@@ -197,6 +366,22 @@ def configure_routes(app: Flask, api: Api):
     ns_session = api.namespace('session', description='Gestion des sessions vidéo')
     ns_webcams = api.namespace('webcams', description='Gestion des webcams')
     ns_videos = api.namespace('videos', description='Gestion des vidéos')
+    ns_jobs = api.namespace('jobs', description='Traitements vidéo asynchrones')
+    
+    # Jauges calculées à chaque export des métriques
+    ACTIVE_SESSIONS_GAUGE.set_function(lambda: len(ACTIVE_SESSIONS))
+    JOB_QUEUE_DEPTH.set_function(JOB_MANAGER.queue_depth)
+    DETECTOR_POOL_IDLE.set_function(DETECTOR_POOL.idle_count)
+    DETECTOR_POOL_LEASED.set_function(DETECTOR_POOL.leased_count)
+    
+    # Export des métriques au format Prometheus
+    @app.route('/api/metrics')
+    def metrics():
+        return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+    
+    # Le registre des caméras ne doit jamais rouvrir une webcam utilisée par une session
+    CAMERA_REGISTRY.set_owned_devices_provider(owned_webcams)
+    CAMERA_REGISTRY.start()
     
     # Modèles Swagger pour la documentation
     status_model = api.model('Status', {
@@ -205,6 +390,13 @@ def configure_routes(app: Flask, api: Api):
         'timestamp': fields.Float(required=True, description='Horodatage de la requête')
     })
     
+    readiness_model = api.model('Readiness', {
+        'ready': fields.Boolean(required=True, description='Le service peut traiter des sessions'),
+        'warming_up': fields.Boolean(description='Préparation des détecteurs en cours'),
+        'error': fields.String(description='Erreur de préparation des détecteurs'),
+        'detector_pool': fields.Raw(description='Moteurs inactifs, prêtés, créés et réutilisés')
+    })
+    
     video_source_model = api.model('VideoSource', {
         'source_type': fields.String(required=True, description='Type de source (webcam ou file)', enum=['webcam', 'file']),
         'device_id': fields.Integer(description='ID du périphérique pour webcam'),
@@ -259,12 +451,24 @@ def configure_routes(app: Flask, api: Api):
     blur_settings_model = api.model('BlurSettings', {
         'method': fields.String(description='Méthode de floutage', enum=['gaussian', 'pixelate', 'solid']),
         'intensity': fields.Integer(description='Intensité du floutage', min=1, max=100),
-        'selected_faces': fields.List(fields.Integer, description='Indices des visages à flouter')
+        'selected_faces': fields.List(fields.Integer, description='Indices des visages à flouter'),
+        'selected_tracks': fields.List(fields.Integer, description='Pistes de l\'index à flouter lors du rendu')
     })
     
     detection_settings_model = api.model('DetectionSettings', {
         'min_confidence': fields.Float(description='Seuil de confiance minimal', min=0.0, max=1.0),
-        'model_selection': fields.Integer(description='Sélection du modèle', enum=[0, 1])
+        'model_selection': fields.Integer(description='Sélection du modèle', enum=[0, 1]),
+        'detection_interval': fields.Integer(description='Détection complète toutes les N images', min=1),
+        'detection_size': fields.Integer(description='Grand côté maximal (px) de l\'image analysée', min=1),
+        'detection_scale': fields.Float(description='Facteur de réduction de l\'image analysée', min=0.0, max=1.0),
+        'static_frame_threshold': fields.Float(description='Écart de luminance (0-255) sous lequel les détections sont réutilisées (0 = désactivé)', min=0.0),
+        'roi_tracking': fields.Boolean(description='N\'analyser que les zones autour des visages précédents'),
+        'full_scan_interval': fields.Integer(description='Analyse de l\'image entière toutes les N images en mode suivi', min=1),
+        'backend': fields.String(description='Moteur de détection', enum=list(DETECTOR_BACKENDS))
+    })
+    
+    job_request_model = api.model('JobRequest', {
+        'backend': fields.String(description='Moteur de détection utilisé pour ce job (par défaut celui de la session)', enum=list(DETECTOR_BACKENDS))
     })
     
     webcam_model = api.model('Webcam', {
@@ -289,7 +493,64 @@ def configure_routes(app: Flask, api: Api):
         'frame_count': fields.Integer(description='Nombre total d\'images'),
         'duration': fields.Integer(description='Durée en secondes'),
         'duration_str': fields.String(description='Durée au format HH:MM:SS'),
-        'format': fields.String(description='Format de la vidéo')
+        'format': fields.String(description='Format de la vidéo'),
+        'container': fields.String(description='Format du conteneur (ffprobe)'),
+        'codec': fields.String(description='Codec vidéo'),
+        'bit_rate': fields.Integer(description='Débit en bits par seconde'),
+        'rotation': fields.Integer(description='Rotation d\'affichage en degrés'),
+        'has_audio': fields.Boolean(description='Présence d\'une piste audio'),
+        'audio_codec': fields.String(description='Codec audio')
+    })
+    
+    job_status_model = api.model('JobStatus', {
+        'job_id': fields.String(required=True, description='Identifiant du job'),
+        'status': fields.String(required=True, description='État du traitement', enum=['queued', 'processing', 'completed', 'error']),
+        'progress': fields.Float(required=True, description='Progression (0.0 à 1.0)'),
+        'frames_processed': fields.Integer(required=True, description='Nombre d\'images traitées'),
+        'total_frames': fields.Integer(required=True, description='Nombre total d\'images'),
+        'elapsed_time': fields.Float(required=True, description='Temps écoulé en secondes'),
+        'estimated_time_remaining': fields.Float(required=True, description='Temps restant estimé en secondes'),
+        'error_message': fields.String(description='Message d\'erreur'),
+        'detections_reused': fields.Integer(description='Images ayant réutilisé les détections précédentes'),
+        'detections_cached': fields.Integer(description='Images dont les détections ont été relues (cache, index des visages)'),
+        'detections_fresh': fields.Integer(description='Images réellement analysées'),
+        'static_frame_threshold': fields.Float(description='Seuil des images statiques utilisé')
+    })
+    
+    session_stats_model = api.model('SessionStats', {
+        'success': fields.Boolean(required=True, default=True),
+        'frame_count': fields.Integer(description='Nombre d\'images lues'),
+        'is_running': fields.Boolean(description='Session active'),
+        'static_frame_threshold': fields.Float(description='Seuil des images statiques'),
+        'detections_reused': fields.Integer(description='Images ayant réutilisé les détections précédentes'),
+        'detections_fresh': fields.Integer(description='Images analysées (détection ou suivi)'),
+        'scene_cuts': fields.Integer(description='Coupures de scène détectées'),
+        'detector_calls': fields.Integer(description='Appels au détecteur de visages'),
+        'full_scans': fields.Integer(description='Analyses de l\'image entière (mode suivi)'),
+        'roi_scans': fields.Integer(description='Analyses limitées aux zones des visages précédents (mode suivi)'),
+        'broadcasting': fields.Boolean(description='Thread de diffusion en cours'),
+        'viewers': fields.Integer(description='Flux MJPEG abonnés'),
+        'variants': fields.Integer(description='Rendus produits (floutage, annotations)'),
+        'frames_published': fields.Integer(description='Images diffusées'),
+        'target_fps': fields.Float(description='Cadence de diffusion visée (source ou réglage du flux)'),
+        'achieved_fps': fields.Float(description='Cadence de diffusion atteinte (2 dernières secondes)'),
+        'frames_dropped': fields.Integer(description='Images sautées faute de temps de traitement')
+    })
+    
+    track_detection_model = api.model('TrackDetection', {
+        'frame': fields.Integer(required=True, description='Numéro de l\'image'),
+        'time': fields.Float(required=True, description='Horodatage en secondes'),
+        'track_id': fields.Integer(required=True, description='Identifiant de la piste du visage'),
+        'bbox': fields.Nested(bbox_model, required=True, description='Rectangle englobant'),
+        'score': fields.Float(required=True, description='Score de confiance')
+    })
+    
+    face_index_query_model = api.model('FaceIndexQuery', {
+        'success': fields.Boolean(required=True, default=True),
+        'start': fields.Float(required=True, description='Début de l\'intervalle en secondes'),
+        'end': fields.Float(required=True, description='Fin de l\'intervalle en secondes'),
+        'fps': fields.Float(required=True, description='Images par seconde de la vidéo'),
+        'detections': fields.List(fields.Nested(track_detection_model), description='Détections de l\'intervalle')
     })
     
     # Route pour vérifier que l'API est en ligne
@@ -305,6 +566,30 @@ def configure_routes(app: Flask, api: Api):
                 "timestamp": time.time()
             }
     
+    # Sonde de vivacité: le processus répond, sans dépendance au détecteur
+    @ns_status.route('/live')
+    class LivenessResource(Resource):
+        @ns_status.doc('get_liveness')
+        def get(self):
+            """Vérifier que le processus répond"""
+            return {"status": "alive"}
+    
+    # Sonde de disponibilité: prêt une fois un détecteur initialisé
+    @ns_status.route('/ready')
+    class ReadinessResource(Resource):
+        @ns_status.doc('get_readiness')
+        @ns_status.response(200, 'Service prêt', readiness_model)
+        @ns_status.response(503, 'Détecteurs en cours de préparation', readiness_model)
+        def get(self):
+            """Vérifier qu'un détecteur est prêt à traiter des images"""
+            ready = DETECTOR_POOL.ready.is_set()
+            return {
+                "ready": ready,
+                "warming_up": DETECTOR_POOL.is_warming_up(),
+                "error": DETECTOR_POOL.warmup_error,
+                "detector_pool": DETECTOR_POOL.get_stats()
+            }, 200 if ready else 503
+    
     # Liste des webcams disponibles
     @ns_webcams.route('')
     class WebcamsResource(Resource):
@@ -323,6 +608,7 @@ def configure_routes(app: Flask, api: Api):
         # @ns_session.marshal_with(error_model, code=400)
         def post(self):
             """Créer une nouvelle session vidéo"""
+            session = None
             try:
                 # Ensure JSON data is present
                 if not request.json:
@@ -351,9 +637,11 @@ def configure_routes(app: Flask, api: Api):
                 session = VideoSession(session_id, source_type, device_id, file_path)
                 
                 if not session.start():
+                    # Rendre le moteur de détection au pool et libérer la capture
+                    session.stop()
                     return {
                         "success": False,
-                        "error": "Impossible de démarrer la session vidéo"
+                        "error": session.start_error or "Impossible de démarrer la session vidéo"
                     }, 400
                 
                 # Stocker la session
@@ -372,6 +660,8 @@ def configure_routes(app: Flask, api: Api):
             except Exception as e:
                 # Log any unexpected errors
                 print(f"Unexpected error in session creation: {e}")
+                if session is not None and ACTIVE_SESSIONS.get(session.session_id) is not session:
+                    session.stop()
                 return {
                     "success": False,
                     "error": f"Erreur inattendue: {str(e)}"
@@ -449,6 +739,12 @@ def configure_routes(app: Flask, api: Api):
                     print(f"Mise à jour des visages sélectionnés: {selected_faces}")
                     session.selected_faces = selected_faces
                 
+                # Mettre à jour les pistes sélectionnées si présentes (rendu depuis l'index)
+                if 'selected_tracks' in data:
+                    selected_tracks = data['selected_tracks']
+                    print(f"Mise à jour des pistes sélectionnées: {selected_tracks}")
+                    session.selected_tracks = selected_tracks
+                
                 return {"success": True}
                 
             except Exception as e:
@@ -510,21 +806,128 @@ def configure_routes(app: Flask, api: Api):
                             "error": "La sélection du modèle doit être 0 ou 1"
                         }, 400
                 
-                # Libérer l'ancien détecteur
-                session.face_detector.release()
+                # Récupérer l'intervalle de détection s'il est présent
+                if 'detection_interval' in data:
+                    detection_interval = data['detection_interval']
+                    print(f"Mise à jour de l'intervalle de détection: {detection_interval}")
+                    
+                    # Vérifier que l'intervalle est valide
+                    if not isinstance(detection_interval, int) or detection_interval < 1:
+                        return {
+                            "success": False,
+                            "error": "L'intervalle de détection doit être un entier supérieur ou égal à 1"
+                        }, 400
+                    session.detection_interval = detection_interval
+                
+                # Résolution de détection: conserver les valeurs actuelles par défaut
+                detection_size = session.face_detector.detection_size
+                detection_scale = session.face_detector.detection_scale
+                
+                # Récupérer la taille de détection si elle est présente (None = pleine résolution)
+                if 'detection_size' in data:
+                    detection_size = data['detection_size']
+                    print(f"Mise à jour de la taille de détection: {detection_size}")
+                    
+                    # Vérifier que la taille est valide
+                    if detection_size is not None and (not isinstance(detection_size, int) or detection_size < 1):
+                        return {
+                            "success": False,
+                            "error": "La taille de détection doit être un entier positif ou null"
+                        }, 400
+                
+                # Récupérer le facteur de réduction s'il est présent
+                if 'detection_scale' in data:
+                    detection_scale = data['detection_scale']
+                    print(f"Mise à jour du facteur de détection: {detection_scale}")
+                    
+                    # Vérifier que le facteur est valide
+                    if not isinstance(detection_scale, (int, float)) or detection_scale <= 0 or detection_scale > 1:
+                        return {
+                            "success": False,
+                            "error": "Le facteur de détection doit être un nombre entre 0 (exclu) et 1"
+                        }, 400
+                
+                # Récupérer le seuil des images statiques s'il est présent
+                if 'static_frame_threshold' in data:
+                    static_frame_threshold = data['static_frame_threshold']
+                    print(f"Mise à jour du seuil des images statiques: {static_frame_threshold}")
+                    
+                    # Vérifier que le seuil est valide
+                    if not isinstance(static_frame_threshold, (int, float)) or static_frame_threshold < 0:
+                        return {
+                            "success": False,
+                            "error": "Le seuil des images statiques doit être un nombre positif ou nul"
+                        }, 400
+                    session.static_frame_threshold = float(static_frame_threshold)
+                
+                # Mode suivi: conserver les valeurs actuelles par défaut
+                roi_tracking = session.face_detector.roi_tracking
+                full_scan_interval = session.face_detector.full_scan_interval
+                
+                # Récupérer le mode suivi s'il est présent
+                if 'roi_tracking' in data:
+                    roi_tracking = data['roi_tracking']
+                    print(f"Mise à jour du mode suivi: {roi_tracking}")
+                    
+                    if not isinstance(roi_tracking, bool):
+                        return {
+                            "success": False,
+                            "error": "Le mode suivi doit être un booléen"
+                        }, 400
                 
-                # Créer un nouveau détecteur avec les paramètres mis à jour
-                # Si un paramètre n'est pas spécifié, utiliser la valeur actuelle
+                # Récupérer l'intervalle d'analyse complète s'il est présent
+                if 'full_scan_interval' in data:
+                    full_scan_interval = data['full_scan_interval']
+                    print(f"Mise à jour de l'intervalle d'analyse complète: {full_scan_interval}")
+                    
+                    if not isinstance(full_scan_interval, int) or full_scan_interval < 1:
+                        return {
+                            "success": False,
+                            "error": "L'intervalle d'analyse complète doit être un entier supérieur ou égal à 1"
+                        }, 400
+                
+                # Moteur de détection: conserver le moteur actuel par défaut
+                backend = session.face_detector.backend_name
+                
+                # Récupérer le moteur de détection s'il est présent
+                if 'backend' in data:
+                    backend = data['backend']
+                    print(f"Mise à jour du moteur de détection: {backend}")
+                    
+                    if backend not in DETECTOR_BACKENDS:
+                        return {
+                            "success": False,
+                            "error": f"Le moteur de détection doit être l'un de: {', '.join(DETECTOR_BACKENDS)}"
+                        }, 400
+                
+                # Mettre à jour le détecteur avec les paramètres reçus
+                # Si un paramètre n'est pas spécifié, utiliser la valeur par défaut
                 new_min_confidence = min_confidence if min_confidence is not None else config.FACE_DETECTION_CONFIDENCE
                 new_model_selection = model_selection if model_selection is not None else 1
                 
-                print(f"Création d'un nouveau détecteur avec: min_confidence={new_min_confidence}, model_selection={new_model_selection}")
+                print(f"Mise à jour du détecteur avec: min_confidence={new_min_confidence}, model_selection={new_model_selection}")
                 
-                # Créer un nouveau détecteur
-                session.face_detector = FaceDetector(
-                    min_detection_confidence=new_min_confidence,
-                    model_selection=new_model_selection
-                )
+                # Le moteur n'est remplacé (par un moteur du pool) que si nécessaire;
+                # un moteur indisponible (fichiers du modèle absents) laisse la session intacte.
+                # Le verrou attend la fin de l'image en cours de diffusion.
+                with session.lock:
+                    try:
+                        session.face_detector.reconfigure(
+                            min_detection_confidence=new_min_confidence,
+                            model_selection=new_model_selection,
+                            backend=backend
+                        )
+                    except (ImportError, OSError) as e:
+                        return {
+                            "success": False,
+                            "error": f"Moteur de détection '{backend}' indisponible: {e}"
+                        }, 400
+                    
+                    session.face_detector.detection_size = detection_size
+                    session.face_detector.detection_scale = detection_scale
+                    session.face_detector.roi_tracking = roi_tracking
+                    session.face_detector.full_scan_interval = full_scan_interval
+                    session.build_frame_detector()
                 
                 return {"success": True}
                 
@@ -550,32 +953,48 @@ def configure_routes(app: Flask, api: Api):
             
             session = ACTIVE_SESSIONS[session_id]
             
-            # Obtenir et traiter une nouvelle image
-            frame = session.get_frame()
+            # Options de traitement
+            draw_detections = request.args.get('draw_detections', 'false').lower() == 'true'
+            apply_blur = request.args.get('apply_blur', 'true').lower() == 'true'
+            
+            # Dernière image diffusée pour ce rendu (traitée et encodée une seule fois
+            # pour tous les spectateurs de la session)
+            frame = session.broadcaster.latest((apply_blur, draw_detections))
             if frame is None:
                 return {
                     "success": False,
                     "error": "Impossible de récupérer une image"
                 }, 400
-            
-            # Options de traitement
-            draw_detections = request.args.get('draw_detections', 'false').lower() == 'true'
-            apply_blur = request.args.get('apply_blur', 'true').lower() == 'true'
-            
-            # Traiter l'image
-            result = session.process_frame(frame, draw_detections, apply_blur)
-            
-            # Encoder l'image en base64
-            _, buffer = cv2.imencode('.jpg', result["frame"])
-            img_base64 = base64.b64encode(buffer).decode('utf-8')
+            FRAMES_SERVED.inc(
+                endpoint="frame",
+                source=session.source_type,
+                variant=variant_label((apply_blur, draw_detections))
+            )
             
             # Retourner l'image et les données de détection
             return {
                 "success": True,
-                "frame": img_base64,
-                "detection_data": result["detection_data"]
+                "frame": frame.as_base64(),
+                "detection_data": frame.detection_data
             }
     
+    # Statistiques de détection de la session
+    @ns_session.route('/<string:session_id>/stats')
+    @ns_session.param('session_id', 'Identifiant de la session')
+    class SessionStatsResource(Resource):
+        @ns_session.doc('get_session_stats')
+        @ns_session.response(200, 'Statistiques de la session', session_stats_model)
+        @ns_session.response(404, 'Session non trouvée', error_model)
+        def get(self, session_id):
+            """Récupérer les statistiques de détection (détections réutilisées ou recalculées)"""
+            if session_id not in ACTIVE_SESSIONS:
+                return {
+                    "success": False,
+                    "error": "Session non trouvée"
+                }, 404
+            
+            return {"success": True, **ACTIVE_SESSIONS[session_id].get_stats()}
+    
     # Récupérer les données de détection
     @ns_session.route('/<string:session_id>/detections')
     @ns_session.param('session_id', 'Identifiant de la session')
@@ -593,39 +1012,27 @@ def configure_routes(app: Flask, api: Api):
                 
                 session = ACTIVE_SESSIONS[session_id]
                 
-                # Utiliser la dernière image traitée si disponible
-                if session.last_frame is None:
-                    frame = session.get_frame()
-                    if frame is None:
-                        return {
-                            "success": False,
-                            "error": "Impossible de récupérer une image"
-                        }, 400
-                else:
-                    frame = session.last_frame
-                
-                # Détecter les visages sans appliquer de floutage ni dessiner
-                _, faces_data = session.face_detector.detect_faces(frame)
+                # Pendant la diffusion, les détections de la dernière image diffusée
+                detection_data = session.broadcaster.latest_detection_data()
+                if detection_data is not None:
+                    return {"success": True, **detection_data}
                 
-                # Préparer la réponse
-                height, width = frame.shape[:2]
+                with session.lock:
+                    # Utiliser la dernière image traitée si disponible
+                    if session.last_frame is None:
+                        frame = session.get_frame()
+                        if frame is None:
+                            return {
+                                "success": False,
+                                "error": "Impossible de récupérer une image"
+                            }, 400
+                    else:
+                        frame = session.last_frame
+                    
+                    # Détecter les visages sans appliquer de floutage ni dessiner
+                    _, faces_data = session.face_detector.detect_faces(frame)
                 
-                return {
-                    "success": True,
-                    "faces": [
-                        {
-                            "bbox": face.get("bbox", {}),
-                            "keypoints": face.get("keypoints", {}),
-                            "score": face.get("score", 0.0),
-                            "face_id": idx
-                        }
-                        for idx, face in enumerate(faces_data)
-                    ],
-                    "frame_id": session.frame_count,
-                    "timestamp": time.time(),
-                    "width": width,
-                    "height": height
-                }
+                return {"success": True, **session.detection_data(frame, faces_data)}
             except Exception as e:
                 print(f"Erreur lors de la récupération des détections : {e}")
                 return {
@@ -655,6 +1062,47 @@ def configure_routes(app: Flask, api: Api):
             # Utiliser la fonction get_video_info des utilitaires vidéo
             return get_video_info(file_path)
     
+    # Extraire une image d'une vidéo (défilement de la timeline)
+    @ns_videos.route('/frame')
+    class VideoFrameResource(Resource):
+        @ns_videos.doc('get_video_frame')
+        @ns_videos.expect(api.model('VideoFrameRequest', {
+            'file_path': fields.String(required=True, description='Chemin du fichier vidéo'),
+            'frame_number': fields.Integer(required=True, description='Numéro de l\'image', min=0)
+        }))
+        def post(self):
+            """Récupérer une image précise d'un fichier vidéo"""
+            data = request.json
+            file_path = data.get('file_path')
+            frame_number = data.get('frame_number')
+            
+            if not file_path or not os.path.exists(file_path):
+                return {
+                    "success": False,
+                    "error": "Chemin de fichier invalide"
+                }, 400
+            
+            if not isinstance(frame_number, int) or frame_number < 0:
+                return {
+                    "success": False,
+                    "error": "Le numéro d'image doit être un entier positif ou nul"
+                }, 400
+            
+            success, frame = extract_frame(file_path, frame_number)
+            if not success:
+                return {
+                    "success": False,
+                    "error": "Impossible de lire cette image"
+                }, 400
+            
+            # Encoder l'image en base64
+            _, buffer = cv2.imencode('.jpg', frame)
+            return {
+                "success": True,
+                "frame_number": frame_number,
+                "frame": base64.b64encode(buffer).decode('utf-8')
+            }
+    
     # Stream vidéo (MJPEG)
     @ns_session.route('/<string:session_id>/stream')
     @ns_session.param('session_id', 'Identifiant de la session')
@@ -673,44 +1121,30 @@ def configure_routes(app: Flask, api: Api):
             
             def generate_frames(draw_detections, apply_blur):
                 session = ACTIVE_SESSIONS[session_id]
-                error_count = 0
-                max_errors = 10  # Nombre maximal d'erreurs avant d'arrêter
+                variant = (apply_blur, draw_detections)
+                label = variant_label(variant)
                 
-                while session.is_running and error_count < max_errors:
-                    try:
-                        frame = session.get_frame()
+                # Les images sont produites par le thread de diffusion de la session:
+                # chaque spectateur reçoit la plus récente, sans retraitement
+                session.broadcaster.subscribe(variant)
+                ACTIVE_STREAMS.inc()
+                try:
+                    sequence = -1
+                    while session.is_running:
+                        frame = session.broadcaster.wait_next(variant, sequence)
                         if frame is None:
-                            error_count += 1
-                            print(f"Frame read failed. Error count: {error_count}")
-                            time.sleep(0.1)  # Petit délai pour éviter une boucle trop rapide
+                            # Aucune image à temps: relancer la diffusion si elle s'est arrêtée
+                            session.broadcaster.ensure_running()
                             continue
-                        
-                        # Réinitialiser le compteur d'erreurs si un frame est lu avec succès
-                        error_count = 0
-                        
-                        # Traiter l'image
-                        result = session.process_frame(frame, draw_detections, apply_blur)
-                        
-                        # Convertir l'image pour le streaming
-                        _, buffer = cv2.imencode('.jpg', result["frame"])
-                        frame_bytes = buffer.tobytes()
+                        sequence = frame.sequence
                         
                         # Envoyer l'image au format MJPEG
+                        FRAMES_SERVED.inc(endpoint="stream", source=session.source_type, variant=label)
                         yield (b'--frame\r\n'
-                            b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-                        
-                        # Limiter le fps pour économiser les ressources
-                        time.sleep(1/30)  # 30 FPS maximum
-                    
-                    except Exception as e:
-                        print(f"Erreur dans generate_frames: {e}")
-                        error_count += 1
-                        time.sleep(0.1)
-                
-                # Arrêter la session si trop d'erreurs
-                if error_count >= max_errors:
-                    print("Trop d'erreurs, arrêt de la session")
-                    session.stop()
+                            b'Content-Type: image/jpeg\r\n\r\n' + frame.jpeg + b'\r\n')
+                finally:
+                    session.broadcaster.unsubscribe(variant)
+                    ACTIVE_STREAMS.dec()
             
             return Response(
                 generate_frames(draw_detections, apply_blur),
@@ -751,6 +1185,9 @@ def configure_routes(app: Flask, api: Api):
                 video_info = get_video_info(file_path)
                 
                 if video_info["success"]:
+                    # Préparer l'index des images clés pour le défilement de la timeline
+                    build_keyframe_index_async(file_path)
+                    
                     return {
                         "success": True,
                         "file_path": file_path,
@@ -767,12 +1204,257 @@ def configure_routes(app: Flask, api: Api):
                     "success": False,
                     "error": str(e)
                 }, 500
+    def submit_session_job(session: VideoSession, output_path: str, action: str = "render",
+                           backend: Optional[str] = None) -> ProcessingJob:
+        """
+        Crée un job de traitement à partir des paramètres actuels de la session.
+        
+        backend remplace le moteur de détection de la session pour ce job uniquement.
+        """
+        detector_settings = session.detector_settings()
+        if backend:
+            detector_settings["backend"] = backend
+        
+        job = ProcessingJob(
+            output_path,
+            detector_settings=detector_settings,
+            blur_settings={
+                "blur_method": session.blur_processor.blur_method,
+                "blur_intensity": session.blur_processor.blur_intensity
+            },
+            selected_faces=session.selected_faces,
+            processor_options={
+                "num_workers": config.VIDEO_PROCESSING_WORKERS,
+                "pipelined": config.VIDEO_PIPELINE_ENABLED,
+                "detection_interval": session.detection_interval,
+                "static_frame_threshold": session.static_frame_threshold,
+                "detection_cache": config.DETECTION_CACHE_ENABLED,
+                "encoder": config.VIDEO_ENCODER,
+                "encoder_options": {
+                    "codec": config.FFMPEG_CODEC,
+                    "preset": config.FFMPEG_PRESET,
+                    "crf": config.FFMPEG_CRF
+                }
+            },
+            session_id=session.session_id,
+            action=action
+        )
+        
+        # Rendre à partir de l'index des pistes s'il a déjà été calculé (avec le même moteur)
+        if action == "render" and detector_settings == session.detector_settings():
+            index_path = session.face_index_path()
+            if index_path and FaceIndex.exists(index_path):
+                job.processor_options["face_index_path"] = index_path
+                job.processor_options["selected_tracks"] = session.selected_tracks
+        
+        if session.source_type == "webcam":
+            # Pour les webcams, capturer d'abord quelques secondes de vidéo (en arrière-plan)
+            job.prepare_input = lambda: session.capture_clip(
+                os.path.join(config.TEMP_DIR, f"webcam_capture_{job.job_id}.mp4")
+            )
+        else:
+            # Pour les fichiers vidéo, utiliser le chemin existant
+            job.input_path = session.file_path
+        
+        return JOB_MANAGER.submit(job)
+    
+    # Lancer le traitement asynchrone de la vidéo d'une session
+    @ns_session.route('/<string:session_id>/jobs')
+    @ns_session.param('session_id', 'Identifiant de la session')
+    class SessionJobsResource(Resource):
+        @ns_session.doc('submit_processing_job')
+        @ns_session.expect(job_request_model, validate=False)
+        def post(self, session_id):
+            """Lance le traitement de la vidéo en arrière-plan et retourne l'identifiant du job"""
+            if session_id not in ACTIVE_SESSIONS:
+                return {
+                    "success": False,
+                    "error": "Session non trouvée"
+                }, 404
+            
+            # Moteur de détection propre à ce job (facultatif)
+            backend = (request.get_json(silent=True) or {}).get('backend')
+            if backend is not None and backend not in DETECTOR_BACKENDS:
+                return {
+                    "success": False,
+                    "error": f"Le moteur de détection doit être l'un de: {', '.join(DETECTOR_BACKENDS)}"
+                }, 400
+            
+            try:
+                output_path = os.path.join(config.OUTPUT_DIR, f"job_{uuid.uuid4()}.mp4")
+                job = submit_session_job(ACTIVE_SESSIONS[session_id], output_path, backend=backend)
+                
+                return {
+                    "success": True,
+                    "job_id": job.job_id
+                }, 202
+            
+            except Exception as e:
+                return {
+                    "success": False,
+                    "error": str(e)
+                }, 500
+    
+    # Index des pistes de visages (analyse en deux passes)
+    @ns_session.route('/<string:session_id>/index')
+    @ns_session.param('session_id', 'Identifiant de la session')
+    class FaceIndexResource(Resource):
+        @ns_session.doc('analyze_video')
+        def post(self, session_id):
+            """Lance la passe d'analyse qui construit l'index des pistes de visages"""
+            if session_id not in ACTIVE_SESSIONS:
+                return {
+                    "success": False,
+                    "error": "Session non trouvée"
+                }, 404
+            
+            session = ACTIVE_SESSIONS[session_id]
+            index_path = session.face_index_path()
+            if index_path is None:
+                return {
+                    "success": False,
+                    "error": "L'analyse n'est disponible que pour les sessions de fichier vidéo"
+                }, 400
+            
+            job = submit_session_job(session, index_path, action="analyze")
+            return {
+                "success": True,
+                "job_id": job.job_id
+            }, 202
+        
+        @ns_session.doc('query_face_index', params={
+            'start': 'Début de l\'intervalle en secondes',
+            'end': 'Fin de l\'intervalle en secondes'
+        })
+        @ns_session.response(200, 'Détections de l\'intervalle', face_index_query_model)
+        @ns_session.response(404, 'Session ou index non trouvé', error_model)
+        def get(self, session_id):
+            """Récupérer les détections d'un intervalle de temps sans décoder la vidéo"""
+            if session_id not in ACTIVE_SESSIONS:
+                return {
+                    "success": False,
+                    "error": "Session non trouvée"
+                }, 404
+            
+            try:
+                start = float(request.args.get('start', 0))
+                end = float(request.args.get('end', start + 1))
+            except ValueError:
+                return {
+                    "success": False,
+                    "error": "Les paramètres start et end doivent être des nombres"
+                }, 400
+            
+            index_path = ACTIVE_SESSIONS[session_id].face_index_path()
+            if index_path is None or not FaceIndex.exists(index_path):
+                return {
+                    "success": False,
+                    "error": "Index non trouvé: lancer d'abord l'analyse"
+                }, 404
+            
+            face_index = FaceIndex(index_path)
+            return {
+                "success": True,
+                "start": start,
+                "end": end,
+                "fps": face_index.fps,
+                "detections": face_index.query(start, end)
+            }
+    
+    # Statut d'un job
+    @ns_jobs.route('/<string:job_id>')
+    @ns_jobs.param('job_id', 'Identifiant du job')
+    class JobStatusResource(Resource):
+        @ns_jobs.doc('get_job_status')
+        @ns_jobs.response(200, 'Statut du job', job_status_model)
+        @ns_jobs.response(404, 'Job non trouvé', error_model)
+        def get(self, job_id):
+            """Récupérer la progression d'un job de traitement"""
+            job = JOB_MANAGER.get(job_id)
+            if job is None:
+                return {
+                    "success": False,
+                    "error": "Job non trouvé"
+                }, 404
+            
+            return job.get_status()
+    
+    # Flux de progression d'un job (Server-Sent Events)
+    @ns_jobs.route('/<string:job_id>/events')
+    @ns_jobs.param('job_id', 'Identifiant du job')
+    class JobEventsResource(Resource):
+        @ns_jobs.doc('stream_job_events')
+        def get(self, job_id):
+            """Suivre la progression d'un job en Server-Sent Events"""
+            job = JOB_MANAGER.get(job_id)
+            if job is None:
+                return {
+                    "success": False,
+                    "error": "Job non trouvé"
+                }, 404
+            
+            def generate_events():
+                version = -1
+                while True:
+                    # Sans mise à jour, renvoyer le statut sert de keep-alive
+                    version = job.wait_for_change(version, timeout=15)
+                    yield f"data: {json.dumps(job.get_status())}\n\n"
+                    if job.is_finished():
+                        break
+                    # Regrouper les mises à jour image par image
+                    time.sleep(config.JOB_EVENTS_MIN_INTERVAL)
+            
+            return Response(
+                generate_events(),
+                mimetype='text/event-stream',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+            )
+    
+    # Fichier produit par un job terminé
+    @ns_jobs.route('/<string:job_id>/file')
+    @ns_jobs.param('job_id', 'Identifiant du job')
+    class JobFileResource(Resource):
+        @ns_jobs.doc('download_job_file')
+        def get(self, job_id):
+            """Télécharger la vidéo floutée produite par un job"""
+            job = JOB_MANAGER.get(job_id)
+            if job is None:
+                return {
+                    "success": False,
+                    "error": "Job non trouvé"
+                }, 404
+            
+            if job.action != "render":
+                return {
+                    "success": False,
+                    "error": "Ce job ne produit pas de fichier vidéo"
+                }, 400
+            
+            status = job.get_status()
+            if status["status"] != "completed":
+                return {
+                    "success": False,
+                    "error": status.get("error_message") or "Le traitement n'est pas terminé"
+                }, 409
+            
+            timestamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(job.created_at))
+            return send_file(
+                job.output_path,
+                mimetype='video/mp4',
+                as_attachment=True,
+                download_name=f"blurface_video_{timestamp}.mp4"
+            )
+    
     @ns_session.route('/<string:session_id>/download')
     @ns_session.param('session_id', 'Identifiant de la session')
     class DownloadVideoResource(Resource):
         @ns_session.doc('download_processed_video')
         def get(self, session_id):
-            """Traite et permet le téléchargement de la vidéo avec les visages floutés"""
+            """
+            Traite et permet le téléchargement de la vidéo avec les visages floutés.
+            
+            Route synchrone conservée pour compatibilité: préférer POST /session/<id>/jobs.
+            """
             if session_id not in ACTIVE_SESSIONS:
                 return {
                     "success": False,
@@ -786,51 +1468,8 @@ def configure_routes(app: Flask, api: Api):
                 timestamp = time.strftime("%Y%m%d-%H%M%S")
                 temp_output_path = os.path.join(config.TEMP_DIR, f"download_{timestamp}.mp4")
                 
-                # Traiter la vidéo (de façon synchrone pour un téléchargement immédiat)
-                from utils.video_utils import VideoProcessor
-                
-                # Pour les webcams, nous devons d'abord capturer quelques secondes de vidéo
-                if session.source_type == "webcam":
-                    # Capturer 5 secondes de webcam dans un fichier temporaire
-                    webcam_capture_path = os.path.join(config.TEMP_DIR, f"webcam_capture_{timestamp}.mp4")
-                    frames_to_capture = 5 * 30  # 5 seconds at 30 FPS
-                    
-                    # Configurer l'enregistreur vidéo
-                    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                    out = cv2.VideoWriter(
-                        webcam_capture_path,
-                        fourcc,
-                        30,  # FPS
-                        (session.cap.get(cv2.CAP_PROP_FRAME_WIDTH), session.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    )
-                    
-                    # Capturer les images
-                    frames_captured = 0
-                    while frames_captured < frames_to_capture:
-                        ret, frame = session.cap.read()
-                        if not ret:
-                            break
-                        out.write(frame)
-                        frames_captured += 1
-                    
-                    out.release()
-                    input_path = webcam_capture_path
-                else:
-                    # Pour les fichiers vidéo, utiliser le chemin existant
-                    input_path = session.file_path
-                
-                # Traiter la vidéo
-                processor = VideoProcessor(
-                    input_path,
-                    temp_output_path,
-                    session.face_detector,
-                    session.blur_processor
-                )
-                
-                processing_status = processor.process_video(
-                    selected_faces=session.selected_faces,
-                    draw_detections=False  # Ne pas dessiner les détections pour le téléchargement
-                )
+                # Traiter la vidéo et attendre la fin pour un téléchargement immédiat
+                processing_status = submit_session_job(session, temp_output_path).wait()
                 
                 if processing_status["status"] == "completed":
                     # Renvoyer le fichier pour téléchargement
@@ -843,7 +1482,7 @@ def configure_routes(app: Flask, api: Api):
                 else:
                     return {
                         "success": False,
-                        "error": processing_status.get("error_message", "Échec du traitement vidéo")
+                        "error": processing_status.get("error_message") or "Échec du traitement vidéo"
                     }, 500
                     
             except Exception as e:
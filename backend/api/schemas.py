@@ -11,12 +11,20 @@ class BlurSettingsRequest:
     method: str
     intensity: int
     selected_faces: Optional[List[int]] = None
+    selected_tracks: Optional[List[int]] = None  # Pistes de l'index des visages
 
 @dataclass
 class DetectionSettingsRequest:
     """Paramètres pour configurer la détection des visages."""
     min_confidence: float
     model_selection: int
+    detection_interval: int = 1  # Détection complète toutes les N images
+    detection_size: Optional[int] = None  # Grand côté max (px) de l'image analysée
+    detection_scale: Optional[float] = None  # Facteur de réduction de l'image analysée
+    static_frame_threshold: Optional[float] = None  # Écart de luminance (0-255) des images statiques (0 = désactivé)
+    roi_tracking: Optional[bool] = None  # Analyse limitée aux zones des visages précédents
+    full_scan_interval: Optional[int] = None  # Analyse de l'image entière toutes les N images
+    backend: Optional[str] = None  # Moteur de détection: 'mediapipe', 'opencv', 'haar'
 
 @dataclass
 class VideoSourceRequest:
@@ -27,7 +35,7 @@ class VideoSourceRequest:
 
 @dataclass
 class FaceData:
-    """Données d'un visage détecté."""
+    """Données d'un visage détecté (format JSON produit par core.detections.Detections.to_dicts)."""
     bbox: Dict[str, int]  # xmin, ymin, width, height, xmax, ymax
     keypoints: Dict[str, Dict[str, int]]
     score: float
@@ -45,13 +53,17 @@ class DetectionResponse:
 @dataclass
 class ProcessingStatusResponse:
     """Statut du traitement d'une vidéo."""
-    status: str  # 'processing', 'completed', 'error'
+    status: str  # 'queued', 'processing', 'completed', 'error'
     progress: float  # 0.0 à 1.0
     frames_processed: int
     total_frames: int
     elapsed_time: float
     estimated_time_remaining: float
     error_message: Optional[str] = None
+    detections_reused: int = 0  # Images ayant réutilisé les détections de la précédente
+    detections_cached: int = 0  # Images dont les détections ont été relues (cache, index des visages)
+    detections_fresh: int = 0  # Images réellement analysées
+    static_frame_threshold: float = 0.0
 
 @dataclass
 class VideoProcessingRequest:
@@ -0,0 +1,323 @@
+"""
+Traitement par lots de fichiers vidéo en ligne de commande, sans passer par l'API.
+
+Utilisation (depuis le dossier backend):
+    python batch.py videos/ --output-dir floutees/
+    python batch.py a.mp4 b.mov --output-dir floutees/ --workers 4 --method pixelate --intensity 60
+
+Les sorties déjà à jour (même fichier d'entrée et mêmes paramètres) sont ignorées.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Any, Optional, Tuple
+
+import config
+from core.detector_backends import DETECTOR_BACKENDS
+
+# Suffixe du fichier annexe décrivant comment une sortie a été produite
+MANIFEST_SUFFIX = ".blurface.json"
+
+
+def find_videos(inputs: List[str]) -> List[Tuple[str, str]]:
+    """
+    Recherche les vidéos à traiter.
+
+    Args:
+        inputs: Fichiers ou dossiers (parcourus récursivement)
+
+    Returns:
+        Liste de tuples (chemin de la vidéo, chemin relatif utilisé pour la sortie)
+    """
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for filename in sorted(files):
+                    if filename.lower().endswith(config.BATCH_VIDEO_EXTENSIONS):
+                        video_path = os.path.join(root, filename)
+                        videos.append((video_path, os.path.relpath(video_path, path)))
+        elif os.path.isfile(path):
+            videos.append((path, os.path.basename(path)))
+        else:
+            print(f"Entrée introuvable ignorée: {path}", file=sys.stderr)
+    return videos
+
+
+def output_path_for(relative_path: str, output_dir: str, keep_extension: bool = False) -> str:
+    """
+    Chemin de sortie (arborescence des dossiers d'entrée conservée, extension .mp4).
+
+    Args:
+        relative_path: Chemin relatif de la vidéo d'entrée
+        output_dir: Dossier des vidéos floutées
+        keep_extension: Conserver l'extension d'origine (a.mov -> a.mov.mp4)
+    """
+    if not keep_extension:
+        relative_path = os.path.splitext(relative_path)[0]
+    return os.path.join(output_dir, relative_path + ".mp4")
+
+
+def assign_output_paths(videos: List[Tuple[str, str]], output_dir: str
+                        ) -> Tuple[List[Tuple[str, str]], Dict[str, List[str]]]:
+    """
+    Associe une sortie distincte à chaque vidéo.
+
+    Deux entrées qui ne diffèrent que par l'extension (a.mp4 et a.mov) conservent leur
+    extension dans le nom de sortie; une même vidéo donnée deux fois n'est traitée qu'une fois.
+
+    Args:
+        videos: Résultat de find_videos
+        output_dir: Dossier des vidéos floutées
+
+    Returns:
+        (liste de tuples (entrée, sortie), sorties toujours partagées par plusieurs entrées)
+    """
+    unique = {}
+    for input_path, relative_path in videos:
+        unique.setdefault(os.path.realpath(input_path), (input_path, relative_path))
+    videos = list(unique.values())
+
+    def group_by_output(paths: List[str]) -> Dict[str, List[int]]:
+        groups: Dict[str, List[int]] = {}
+        for index, output_path in enumerate(paths):
+            groups.setdefault(os.path.normcase(os.path.normpath(output_path)), []).append(index)
+        return groups
+
+    outputs = [output_path_for(relative_path, output_dir) for _, relative_path in videos]
+    for indices in group_by_output(outputs).values():
+        if len(indices) > 1:
+            for index in indices:
+                outputs[index] = output_path_for(videos[index][1], output_dir, keep_extension=True)
+
+    collisions = {
+        outputs[indices[0]]: [videos[index][0] for index in indices]
+        for indices in group_by_output(outputs).values()
+        if len(indices) > 1
+    }
+    return [(input_path, output_path) for (input_path, _), output_path in zip(videos, outputs)], collisions
+
+
+def input_signature(input_path: str) -> Dict[str, Any]:
+    """Taille et date de modification de la vidéo d'entrée."""
+    stat = os.stat(input_path)
+    return {"path": os.path.abspath(input_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def is_up_to_date(input_path: str, output_path: str, settings: Dict[str, Any]) -> bool:
+    """
+    Indique si la sortie a déjà été produite à partir de la même entrée et des mêmes paramètres.
+
+    Args:
+        input_path: Vidéo d'entrée
+        output_path: Vidéo de sortie
+        settings: Paramètres du traitement
+
+    Returns:
+        True si la sortie et son fichier annexe correspondent
+    """
+    manifest_path = output_path + MANIFEST_SUFFIX
+    if not os.path.exists(output_path) or not os.path.exists(manifest_path):
+        return False
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return manifest.get("input") == input_signature(input_path) and manifest.get("settings") == settings
+
+
+def process_file(input_path: str, output_path: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Floute une vidéo (exécuté dans un processus du pool).
+
+    Args:
+        input_path: Vidéo d'entrée
+        output_path: Vidéo de sortie
+        settings: Paramètres du détecteur, du flou et du processeur
+
+    Returns:
+        Résultat du traitement de ce fichier
+    """
+    import cv2
+    from core.face_detector import FaceDetector
+    from core.blur_processor import BlurProcessor
+    from utils.video_utils import VideoProcessor
+
+    # Le parallélisme vient des processus du pool
+    cv2.setNumThreads(1)
+
+    manifest_path = output_path + MANIFEST_SUFFIX
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    # Une sortie interrompue ne doit jamais passer pour à jour
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    start = time.perf_counter()
+    face_detector = FaceDetector(**settings["detector"])
+    try:
+        processor = VideoProcessor(
+            input_path,
+            output_path,
+            face_detector,
+            BlurProcessor(**settings["blur"]),
+            **settings["processor"]
+        )
+        status = dict(processor.process_video())
+    finally:
+        face_detector.release()
+    elapsed = time.perf_counter() - start
+
+    if status.get("status") == "completed":
+        with open(manifest_path, "w") as f:
+            json.dump({"input": input_signature(input_path), "settings": settings}, f, indent=2)
+
+    return {
+        "input": input_path,
+        "output": output_path,
+        "status": status.get("status"),
+        "error": status.get("error_message"),
+        "frames": status.get("frames_processed", 0),
+        "elapsed": elapsed
+    }
+
+
+def build_settings(args) -> Dict[str, Any]:
+    """Paramètres du traitement à partir des arguments de la ligne de commande."""
+    return {
+        "detector": {
+            "min_detection_confidence": args.confidence,
+            "model_selection": args.model_selection,
+            "detection_size": args.detection_size,
+            "detection_scale": config.FACE_DETECTION_SCALE,
+            "backend": args.backend
+        },
+        "blur": {
+            "blur_method": args.method,
+            "blur_intensity": args.intensity
+        },
+        "processor": {
+            "num_workers": args.shards,
+            "pipelined": config.VIDEO_PIPELINE_ENABLED,
+            "detection_interval": args.detection_interval,
+            "static_frame_threshold": args.static_threshold,
+            "detection_cache": config.DETECTION_CACHE_ENABLED,
+            "encoder": args.encoder,
+            "encoder_options": {
+                "codec": config.FFMPEG_CODEC,
+                "preset": config.FFMPEG_PRESET,
+                "crf": config.FFMPEG_CRF
+            }
+        }
+    }
+
+
+def parse_arguments():
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Blur Face - Floutage des visages d'un lot de vidéos")
+    parser.add_argument("inputs", nargs="+", help="Fichiers vidéo ou dossiers à traiter")
+    parser.add_argument("--output-dir", required=True, help="Dossier des vidéos floutées")
+    parser.add_argument("--workers", type=int, default=config.BATCH_WORKERS,
+                        help="Nombre de vidéos traitées simultanément")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Processus de rendu par vidéo (utile pour quelques vidéos longues)")
+    parser.add_argument("--method", default=config.DEFAULT_BLUR_METHOD, choices=["gaussian", "pixelate", "solid"],
+                        help="Méthode de floutage")
+    parser.add_argument("--intensity", type=int, default=config.DEFAULT_BLUR_INTENSITY, help="Intensité du floutage")
+    parser.add_argument("--backend", default=config.FACE_DETECTION_MODEL, choices=list(DETECTOR_BACKENDS),
+                        help="Moteur de détection")
+    parser.add_argument("--confidence", type=float, default=config.FACE_DETECTION_CONFIDENCE,
+                        help="Seuil de confiance de la détection")
+    parser.add_argument("--model-selection", type=int, default=1, choices=[0, 1],
+                        help="Modèle MediaPipe (0 = courte distance, 1 = longue distance)")
+    parser.add_argument("--detection-size", type=int, default=config.FACE_DETECTION_SIZE,
+                        help="Grand côté maximal (px) de l'image analysée")
+    parser.add_argument("--detection-interval", type=int, default=config.DETECTION_INTERVAL,
+                        help="Détection complète toutes les N images")
+    parser.add_argument("--static-threshold", type=float, default=config.STATIC_FRAME_THRESHOLD,
+                        help="Écart de luminance sous lequel les détections sont réutilisées (0 = désactivé)")
+    parser.add_argument("--encoder", default=config.VIDEO_ENCODER, choices=["ffmpeg", "opencv"],
+                        help="Encodeur vidéo")
+    parser.add_argument("--force", action="store_true", help="Retraiter les sorties déjà à jour")
+    parser.add_argument("--report", help="Fichier JSON du bilan détaillé")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    settings = build_settings(args)
+
+    assignments, collisions = assign_output_paths(find_videos(args.inputs), args.output_dir)
+    if collisions:
+        # Des rendus simultanés vers une même sortie s'écraseraient mutuellement
+        for output_path, input_paths in collisions.items():
+            print(f"Sortie partagée par plusieurs entrées: {output_path} <- {', '.join(input_paths)}", file=sys.stderr)
+        print("Renommer ces vidéos ou les traiter séparément (--output-dir distinct)", file=sys.stderr)
+        return 2
+
+    tasks = []
+    skipped = []
+    for input_path, output_path in assignments:
+        if not args.force and is_up_to_date(input_path, output_path, settings):
+            skipped.append(input_path)
+        else:
+            tasks.append((input_path, output_path))
+
+    print(f"{len(tasks)} vidéo(s) à traiter, {len(skipped)} déjà à jour", file=sys.stderr)
+
+    start = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    if tasks:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(tasks))), mp_context=ctx) as executor:
+            futures = {
+                executor.submit(process_file, input_path, output_path, settings): input_path
+                for input_path, output_path in tasks
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"input": futures[future], "status": "error", "error": str(e), "frames": 0, "elapsed": 0.0}
+                results.append(result)
+
+                if result["status"] == "completed":
+                    fps = result["frames"] / result["elapsed"] if result["elapsed"] > 0 else 0.0
+                    print(f"[{len(results)}/{len(tasks)}] {result['input']}: {result['frames']} images "
+                          f"en {result['elapsed']:.1f} s ({fps:.1f} images/s)", file=sys.stderr)
+                else:
+                    print(f"[{len(results)}/{len(tasks)}] {result['input']}: ÉCHEC ({result['error']})", file=sys.stderr)
+    wall_time = time.perf_counter() - start
+
+    completed = [result for result in results if result["status"] == "completed"]
+    failed = [result for result in results if result["status"] != "completed"]
+    total_frames = sum(result["frames"] for result in completed)
+    summary = {
+        "processed": len(completed),
+        "skipped": len(skipped),
+        "failed": len(failed),
+        "frames": total_frames,
+        "wall_time": wall_time,
+        "fps": total_frames / wall_time if wall_time > 0 else 0.0,
+        "videos_per_minute": len(completed) / wall_time * 60 if wall_time > 0 else 0.0
+    }
+
+    print(f"Traitées: {summary['processed']}, à jour: {summary['skipped']}, échecs: {summary['failed']}")
+    print(f"{total_frames} images en {wall_time:.1f} s: {summary['fps']:.1f} images/s, "
+          f"{summary['videos_per_minute']:.1f} vidéos/min")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"summary": summary, "settings": settings, "results": results, "skipped": skipped}, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Mesures de performance des étapes du traitement vidéo.
+"""
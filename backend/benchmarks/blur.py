@@ -0,0 +1,97 @@
+"""
+Mesure le coût du flou gaussien par visage selon l'intensité (1 à 100) et la
+taille du visage, comparé au flou gaussien direct d'OpenCV (noyau intensité*2+1).
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.blur
+    python -m benchmarks.blur --sizes 200 800 1400 --intensities 1 25 50 100 --output blur.json
+"""
+
+import sys
+import json
+import argparse
+import cv2
+import numpy as np
+from typing import Dict, List, Any
+
+from core.blur_processor import BlurProcessor
+from benchmarks.stages import environment, time_per_frame
+
+# Tailles de visages (côté en pixels): petit visage en 1080p, gros plan en 4K
+FACE_SIZES = (100, 400, 1400)
+INTENSITIES = (1, 5, 10, 25, 50, 75, 100)
+
+
+def face_regions(size: int, count: int) -> List[np.ndarray]:
+    """Régions de test: texture, contours nets et texte, comme un visage réel."""
+    rng = np.random.default_rng(size)
+    regions = []
+    for i in range(count):
+        region = cv2.GaussianBlur(rng.integers(0, 255, (size, size, 3), dtype=np.uint8), (0, 0), 2)
+        cv2.ellipse(region, (size // 2, size // 2), (size // 3, size // 2 - 1), 0, 0, 360, (200, 170, 150), -1)
+        cv2.rectangle(region, (size // 3, size // 3), (size // 2, size // 2 - size // 10), (30, 30, 30), -1)
+        cv2.putText(region, str(i), (size // 4, 3 * size // 4), cv2.FONT_HERSHEY_SIMPLEX,
+                    max(0.5, size / 100), (255, 255, 255), max(1, size // 50))
+        regions.append(region)
+    return regions
+
+
+def reference_blur(region: np.ndarray, intensity: int) -> np.ndarray:
+    """Flou gaussien direct, tel qu'appliqué avant le flou à coût constant."""
+    kernel_size = max(1, intensity * 2 + 1)
+    return cv2.GaussianBlur(region, (kernel_size, kernel_size), 0)
+
+
+def bench_intensity(regions: List[np.ndarray], intensity: int) -> Dict[str, Any]:
+    """Mesure le flou de BlurProcessor et la référence pour une intensité."""
+    blur_processor = BlurProcessor(blur_method="gaussian", blur_intensity=intensity)
+
+    result = {
+        "blur": time_per_frame(regions, blur_processor._apply_gaussian_blur),
+        "reference": time_per_frame(regions, lambda region: reference_blur(region, intensity))
+    }
+
+    # Écart visuel par rapport à la référence (niveaux de gris 0-255)
+    errors = np.concatenate([
+        np.abs(blur_processor._apply_gaussian_blur(region).astype(np.int16) - reference_blur(region, intensity)).ravel()
+        for region in regions
+    ])
+    result["mean_abs_error"] = float(errors.mean())
+    result["p99_abs_error"] = float(np.percentile(errors, 99))
+    result["speedup"] = result["reference"]["mean_ms"] / result["blur"]["mean_ms"] if result["blur"]["mean_ms"] else 0.0
+    return result
+
+
+def parse_arguments():
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Coût du flou gaussien par visage selon l'intensité")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(FACE_SIZES), help="Côtés des visages en pixels")
+    parser.add_argument("--intensities", type=int, nargs="*", default=list(INTENSITIES), help="Intensités mesurées")
+    parser.add_argument("--faces", type=int, default=10, help="Nombre de visages mesurés par combinaison")
+    parser.add_argument("--output", help="Fichier JSON des résultats (sortie standard par défaut)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+
+    results = {}
+    for size in args.sizes:
+        regions = face_regions(size, args.faces)
+        for intensity in args.intensities:
+            result = results[f"{size}px/i{intensity}"] = bench_intensity(regions, intensity)
+            print(f"{size:>5}px intensité {intensity:>3}: {result['blur']['mean_ms']:8.2f} ms "
+                  f"(direct {result['reference']['mean_ms']:8.2f} ms, x{result['speedup']:.1f}, "
+                  f"écart moyen {result['mean_abs_error']:.2f})", file=sys.stderr)
+
+    output = json.dumps({"environment": environment(), "faces": args.faces, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
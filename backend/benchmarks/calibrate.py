@@ -0,0 +1,142 @@
+"""
+Mesure la vitesse de chaque moteur de détection sur des images de test et
+recommande celui à utiliser sur cette machine (config.FACE_DETECTION_MODEL).
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.calibrate
+    python -m benchmarks.calibrate --input ma_video.mp4 --target-fps 25 --output calibration.json
+"""
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import numpy as np
+from typing import Dict, List, Any, Optional
+
+import config
+from core.detector_backends import DETECTOR_BACKENDS
+from core.face_detector import FaceDetector
+from benchmarks.stages import RESOLUTIONS, environment, generate_clip, read_frames, time_per_frame
+
+# Ordre de préférence à vitesse suffisante: précision et points clés d'abord
+BACKEND_PREFERENCE = ("mediapipe", "opencv", "haar")
+
+
+def calibrate_backend(name: str, frames: List[np.ndarray]) -> Dict[str, Any]:
+    """
+    Mesure un moteur de détection avec les paramètres de détection de la configuration.
+
+    Args:
+        name: Nom du moteur
+        frames: Images de test (BGR)
+
+    Returns:
+        Mesures du moteur, ou la raison pour laquelle il est indisponible
+    """
+    try:
+        face_detector = FaceDetector(
+            min_detection_confidence=config.FACE_DETECTION_CONFIDENCE,
+            detection_size=config.FACE_DETECTION_SIZE,
+            detection_scale=config.FACE_DETECTION_SCALE,
+            backend=name
+        )
+    except Exception as e:
+        return {"available": False, "error": str(e)}
+
+    try:
+        face_counts = [len(face_detector.detect_faces(frame)[1]) for frame in frames]
+        result = time_per_frame(frames, face_detector.detect_faces)
+    finally:
+        face_detector.release()
+
+    result.update({
+        "available": True,
+        "mean_faces": float(np.mean(face_counts)) if face_counts else 0.0
+    })
+    return result
+
+
+def recommend(results: Dict[str, Dict[str, Any]], target_fps: float) -> Optional[str]:
+    """
+    Choisit le moteur préféré parmi ceux qui atteignent la cadence cible,
+    ou le plus rapide si aucun ne l'atteint.
+    """
+    available = {name: result for name, result in results.items() if result.get("available")}
+    if not available:
+        return None
+
+    for name in BACKEND_PREFERENCE:
+        if name in available and available[name]["fps"] >= target_fps:
+            return name
+    return max(available, key=lambda name: available[name]["fps"])
+
+
+def parse_arguments():
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Calibration des moteurs de détection de Blur Face")
+    parser.add_argument("--input", help="Vidéo dont les premières images servent à la mesure (vidéo générée par défaut)")
+    parser.add_argument("--resolution", default="1080p", choices=list(RESOLUTIONS),
+                        help="Résolution de la vidéo générée")
+    parser.add_argument("--frames", type=int, default=60, help="Nombre d'images mesurées")
+    parser.add_argument("--backends", nargs="*", default=list(DETECTOR_BACKENDS),
+                        choices=list(DETECTOR_BACKENDS), help="Moteurs à mesurer")
+    parser.add_argument("--target-fps", type=float, default=config.DEFAULT_FPS,
+                        help="Cadence de détection visée")
+    parser.add_argument("--output", help="Fichier JSON des résultats (sortie standard par défaut)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+
+    if args.input:
+        frames = read_frames(args.input, args.frames)
+    else:
+        work_dir = tempfile.mkdtemp(prefix="blurface_calibrate_", dir=config.TEMP_DIR)
+        try:
+            path = os.path.join(work_dir, f"synthetic_{args.resolution}.mp4")
+            generate_clip(path, RESOLUTIONS[args.resolution], args.frames)
+            frames = read_frames(path, args.frames)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if not frames:
+        print("Aucune image à mesurer", file=sys.stderr)
+        return 1
+
+    results = {}
+    for name in args.backends:
+        results[name] = calibrate_backend(name, frames)
+        if results[name]["available"]:
+            print(f"{name}: {results[name]['fps']:.1f} images/s (p95 {results[name]['p95_ms']:.1f} ms)",
+                  file=sys.stderr)
+        else:
+            print(f"{name}: indisponible ({results[name]['error']})", file=sys.stderr)
+
+    recommended = recommend(results, args.target_fps)
+    report = {
+        "environment": environment(),
+        "frames": len(frames),
+        "frame_size": [frames[0].shape[1], frames[0].shape[0]],
+        "target_fps": args.target_fps,
+        "results": results,
+        "recommended": recommended
+    }
+
+    if recommended:
+        print(f"Moteur recommandé: FACE_DETECTION_MODEL = \"{recommended}\"", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0 if recommended else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,409 @@
+"""
+Mesure les performances de chaque étape du traitement (décodage, détection,
+floutage, encodage, traitement complet) sur des vidéos générées ou enregistrées.
+
+Utilisation (depuis le dossier backend):
+    python -m benchmarks.stages --output results.json
+    python -m benchmarks.stages --input ma_video.mp4 --compare baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import cv2
+import numpy as np
+from typing import Dict, List, Any, Callable, Tuple
+
+import config
+from core.face_detector import FaceDetector
+from core.detector_backends import DETECTOR_BACKENDS
+from core.blur_processor import BlurProcessor
+from core.detections import Detections
+from utils.video_utils import VideoProcessor
+from utils.video_writer import create_video_writer
+
+# Résolutions des vidéos générées
+RESOLUTIONS = {
+    "480p": (854, 480),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160)
+}
+
+BLUR_METHODS = ("gaussian", "pixelate", "solid")
+BLUR_INTENSITIES = (25, 50, 100)
+FACE_COUNTS = (1, 5, 20)
+
+# Métriques comparées à la référence: (nom, True si une valeur plus élevée est meilleure)
+COMPARED_METRICS = (("fps", True), ("p50_ms", False), ("p95_ms", False))
+
+
+def summarize(latencies: List[float]) -> Dict[str, Any]:
+    """
+    Résume des durées par image.
+
+    Args:
+        latencies: Durées en secondes
+
+    Returns:
+        Images par seconde et percentiles de latence en millisecondes
+    """
+    values = np.asarray(latencies, dtype=np.float64) * 1000.0
+    total = float(values.sum())
+    return {
+        "frames": int(len(values)),
+        "fps": len(values) / (total / 1000.0) if total > 0 else 0.0,
+        "mean_ms": float(values.mean()) if len(values) else 0.0,
+        "p50_ms": float(np.percentile(values, 50)) if len(values) else 0.0,
+        "p95_ms": float(np.percentile(values, 95)) if len(values) else 0.0,
+        "p99_ms": float(np.percentile(values, 99)) if len(values) else 0.0
+    }
+
+
+def time_per_frame(frames: List[np.ndarray], operation: Callable[[np.ndarray], Any],
+                   warmup: int = 2) -> Dict[str, Any]:
+    """Mesure une opération appliquée à chaque image (après quelques appels de chauffe)."""
+    for frame in frames[:warmup]:
+        operation(frame)
+
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        operation(frame)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def generate_clip(path: str, size: Tuple[int, int], frame_count: int, fps: float = 30.0):
+    """
+    Génère une vidéo de test: fond texturé et formes claires en mouvement.
+
+    Args:
+        path: Chemin du fichier à écrire
+        size: (largeur, hauteur)
+        frame_count: Nombre d'images
+        fps: Images par seconde
+    """
+    width, height = size
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (0, 0), 5)
+
+    writer = create_video_writer(path, fps, size, encoder="opencv")
+    for i in range(frame_count):
+        frame = background.copy()
+        for k in range(3):
+            center = (int((0.2 + 0.3 * k) * width + 0.05 * width * np.sin(i / 10 + k)),
+                      int(0.5 * height + 0.1 * height * np.cos(i / 15 + k)))
+            axes = (max(1, width // 20), max(1, height // 9))
+            cv2.ellipse(frame, center, axes, 0, 0, 360, (150, 180, 210), -1)
+        writer.write(frame)
+    writer.release()
+
+
+def read_frames(path: str, max_frames: int) -> List[np.ndarray]:
+    """Décode les premières images d'une vidéo."""
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def synthetic_faces(size: Tuple[int, int], count: int) -> Detections:
+    """Visages fictifs répartis sur une grille, au format de FaceDetector.detect_faces."""
+    width, height = size
+    columns = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / columns))
+    face_width, face_height = width // (columns * 2), height // (rows * 2)
+
+    indices = np.arange(count)
+    xmin = (indices % columns) * width // columns + face_width // 2
+    ymin = (indices // columns) * height // rows + face_height // 2
+    return Detections(
+        np.stack([xmin, ymin, xmin + face_width, ymin + face_height], axis=1),
+        np.ones(count, dtype=np.float32)
+    )
+
+
+def bench_decode(path: str, max_frames: int) -> Dict[str, Any]:
+    cap = cv2.VideoCapture(path)
+    latencies = []
+    while len(latencies) < max_frames:
+        start = time.perf_counter()
+        ret, _ = cap.read()
+        if not ret:
+            break
+        latencies.append(time.perf_counter() - start)
+    cap.release()
+    return summarize(latencies)
+
+
+def create_detector(backend: str) -> FaceDetector:
+    return FaceDetector(min_detection_confidence=config.FACE_DETECTION_CONFIDENCE, backend=backend)
+
+
+def bench_detect(frames: List[np.ndarray], backend: str) -> Dict[str, Any]:
+    try:
+        face_detector = create_detector(backend)
+    except Exception as e:
+        return {"available": False, "error": str(e)}
+
+    try:
+        return time_per_frame(frames, face_detector.detect_faces)
+    finally:
+        face_detector.release()
+
+
+def bench_blur(frames: List[np.ndarray], method: str, intensity: int, face_count: int) -> Dict[str, Any]:
+    blur_processor = BlurProcessor(blur_method=method, blur_intensity=intensity)
+    height, width = frames[0].shape[:2]
+    faces_data = synthetic_faces((width, height), face_count)
+    return time_per_frame(frames, lambda frame: blur_processor.blur_faces(frame, faces_data))
+
+
+def bench_encode(frames: List[np.ndarray], encoder: str, work_dir: str, fps: float) -> Dict[str, Any]:
+    height, width = frames[0].shape[:2]
+    output_path = os.path.join(work_dir, f"encode_{encoder}.mp4")
+    encoder_options = {
+        "codec": config.FFMPEG_CODEC,
+        "preset": config.FFMPEG_PRESET,
+        "crf": config.FFMPEG_CRF
+    } if encoder == "ffmpeg" else {}
+    writer = create_video_writer(output_path, fps, (width, height), encoder=encoder, **encoder_options)
+
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        writer.write(frame)
+        latencies.append(time.perf_counter() - start)
+
+    # La fin de l'encodage (vidage des tampons) est répartie sur toutes les images
+    start = time.perf_counter()
+    writer.release()
+    flush = (time.perf_counter() - start) / max(1, len(latencies))
+    return summarize([latency + flush for latency in latencies])
+
+
+def bench_end_to_end(path: str, work_dir: str, label: str, backend: str) -> Dict[str, Any]:
+    try:
+        face_detector = create_detector(backend)
+    except Exception as e:
+        return {"available": False, "error": str(e)}
+
+    processor = VideoProcessor(
+        path,
+        os.path.join(work_dir, f"processed_{label}.mp4"),
+        face_detector,
+        BlurProcessor(blur_method=config.DEFAULT_BLUR_METHOD, blur_intensity=config.DEFAULT_BLUR_INTENSITY),
+        num_workers=config.VIDEO_PROCESSING_WORKERS,
+        pipelined=config.VIDEO_PIPELINE_ENABLED,
+        detection_interval=config.DETECTION_INTERVAL,
+        encoder=config.VIDEO_ENCODER
+    )
+    try:
+        start = time.perf_counter()
+        result = processor.process_video()
+        elapsed = time.perf_counter() - start
+    finally:
+        face_detector.release()
+
+    if result["status"] != "completed":
+        raise RuntimeError(f"Échec du traitement de {path}: {result.get('error_message')}")
+
+    frames = result["frames_processed"]
+    return {
+        "frames": frames,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "total_s": elapsed
+    }
+
+
+def run_benchmarks(inputs: Dict[str, str], frame_count: int, stages: List[str],
+                   work_dir: str, backend: str = config.FACE_DETECTION_MODEL) -> Dict[str, Dict[str, Any]]:
+    """
+    Exécute les mesures demandées sur chaque vidéo.
+
+    Args:
+        inputs: Libellé -> chemin de la vidéo
+        frame_count: Nombre d'images mesurées par étape
+        stages: Étapes à mesurer (decode, detect, blur, encode, end_to_end)
+        work_dir: Dossier des fichiers temporaires
+        backend: Moteur de détection des étapes detect et end_to_end
+
+    Returns:
+        Résultats indexés par "étape/paramètres/vidéo" ('available' à False, avec
+        l'erreur, si le moteur de détection ne peut pas être chargé)
+    """
+    results = {}
+    for label, path in inputs.items():
+        cap = cv2.VideoCapture(path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or config.DEFAULT_FPS
+        cap.release()
+        frames = read_frames(path, frame_count)
+        if not frames:
+            print(f"Aucune image lisible dans {path}, ignoré", file=sys.stderr)
+            continue
+
+        def record(name: str, measure: Callable[[], Dict[str, Any]]):
+            print(f"  {name}...", file=sys.stderr)
+            results[name] = measure()
+            if results[name].get("available") is False:
+                print(f"  {name} indisponible: {results[name]['error']}", file=sys.stderr)
+
+        print(f"{label} ({frames[0].shape[1]}x{frames[0].shape[0]}):", file=sys.stderr)
+        if "decode" in stages:
+            record(f"decode/{label}", lambda: bench_decode(path, frame_count))
+        if "detect" in stages:
+            record(f"detect/{label}", lambda: bench_detect(frames, backend))
+        if "blur" in stages:
+            for method in BLUR_METHODS:
+                for intensity in BLUR_INTENSITIES:
+                    for face_count in FACE_COUNTS:
+                        record(
+                            f"blur/{method}/i{intensity}/f{face_count}/{label}",
+                            lambda: bench_blur(frames, method, intensity, face_count)
+                        )
+        if "encode" in stages:
+            encoders = ["opencv"] + (["ffmpeg"] if shutil.which("ffmpeg") else [])
+            for encoder in encoders:
+                record(f"encode/{encoder}/{label}", lambda: bench_encode(frames, encoder, work_dir, fps))
+        if "end_to_end" in stages:
+            record(f"end_to_end/{label}", lambda: bench_end_to_end(path, work_dir, label, backend))
+
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """Versions et matériel, pour interpréter les résultats."""
+    try:
+        import mediapipe
+        mediapipe_version = getattr(mediapipe, "__version__", "inconnue")
+    except ImportError:
+        mediapipe_version = None
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "mediapipe": mediapipe_version
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> List[Dict[str, Any]]:
+    """
+    Compare des résultats à une référence.
+
+    Args:
+        results: Résultats courants
+        baseline: Résultats de référence
+        tolerance: Écart relatif toléré avant de signaler une régression (0.1 = 10 %)
+
+    Returns:
+        Une entrée par métrique comparée, avec l'indicateur 'regression'
+    """
+    comparisons = []
+    for name in sorted(set(results) & set(baseline)):
+        for metric, higher_is_better in COMPARED_METRICS:
+            current = results[name].get(metric)
+            reference = baseline[name].get(metric)
+            if not current or not reference:
+                continue
+
+            change = (current - reference) / reference
+            regression = change < -tolerance if higher_is_better else change > tolerance
+            comparisons.append({
+                "name": name,
+                "metric": metric,
+                "baseline": reference,
+                "current": current,
+                "change": change,
+                "regression": regression
+            })
+    return comparisons
+
+
+def parse_arguments():
+    """Parse les arguments de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Mesures de performance des étapes de Blur Face")
+    parser.add_argument("--resolutions", nargs="*", default=list(RESOLUTIONS),
+                        choices=list(RESOLUTIONS), help="Vidéos générées à mesurer")
+    parser.add_argument("--input", action="append", default=[],
+                        help="Vidéo enregistrée à mesurer (option répétable)")
+    parser.add_argument("--frames", type=int, default=60, help="Nombre d'images mesurées par étape")
+    parser.add_argument("--stages", nargs="*", default=["decode", "detect", "blur", "encode", "end_to_end"],
+                        choices=["decode", "detect", "blur", "encode", "end_to_end"], help="Étapes à mesurer")
+    parser.add_argument("--backend", default=config.FACE_DETECTION_MODEL, choices=list(DETECTOR_BACKENDS),
+                        help="Moteur de détection des étapes detect et end_to_end")
+    parser.add_argument("--output", help="Fichier JSON des résultats (sortie standard par défaut)")
+    parser.add_argument("--compare", help="Fichier JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Écart relatif toléré avant de signaler une régression")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    work_dir = tempfile.mkdtemp(prefix="blurface_bench_", dir=config.TEMP_DIR)
+
+    try:
+        inputs = {}
+        for resolution in args.resolutions:
+            path = os.path.join(work_dir, f"synthetic_{resolution}.mp4")
+            generate_clip(path, RESOLUTIONS[resolution], args.frames)
+            inputs[resolution] = path
+        for path in args.input:
+            inputs[os.path.splitext(os.path.basename(path))[0]] = path
+
+        report = {
+            "environment": environment(),
+            "frames": args.frames,
+            "backend": args.backend,
+            "results": run_benchmarks(inputs, args.frames, args.stages, work_dir, args.backend)
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        comparisons = compare(report["results"], baseline["results"], args.tolerance)
+        report["comparison"] = {
+            "baseline": args.compare,
+            "tolerance": args.tolerance,
+            "entries": comparisons,
+            "regressions": sum(1 for entry in comparisons if entry["regression"])
+        }
+
+        for entry in comparisons:
+            if entry["regression"]:
+                print(f"RÉGRESSION {entry['name']} {entry['metric']}: "
+                      f"{entry['baseline']:.2f} -> {entry['current']:.2f} ({entry['change']:+.1%})",
+                      file=sys.stderr)
+        if report["comparison"]["regressions"]:
+            exit_code = 1
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
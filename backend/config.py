@@ -5,14 +5,35 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent
 TEMP_DIR = os.path.join(BASE_DIR, "temp")
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+DETECTION_CACHE_DIR = os.path.join(CACHE_DIR, "detections")
+FACE_INDEX_DIR = os.path.join(CACHE_DIR, "face_index")
 
 # Créer les dossiers s'ils n'existent pas
 os.makedirs(TEMP_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+os.makedirs(DETECTION_CACHE_DIR, exist_ok=True)
+os.makedirs(FACE_INDEX_DIR, exist_ok=True)
 
 # Paramètres de détection des visages
 FACE_DETECTION_CONFIDENCE = 0.1
-FACE_DETECTION_MODEL = "mediapipe"  # Options: 'mediapipe', 'opencv'
+FACE_DETECTION_MODEL = "mediapipe"  # Options: 'mediapipe', 'opencv' (réseau DNN), 'haar'
+FACE_DETECTION_SIZE = None  # Grand côté max (px) de l'image analysée, None = pleine résolution
+FACE_DETECTION_SCALE = 1.0  # Facteur de réduction de l'image analysée
+FACE_ROI_TRACKING = False  # N'analyser que les zones autour des visages précédents (sessions en direct)
+FACE_FULL_SCAN_INTERVAL = 10  # Analyse de l'image entière toutes les N images en mode suivi
+FACE_ROI_PADDING = 0.5  # Marge autour de chaque visage, en proportion de sa taille
+
+# Pool de moteurs de détection partagés par les sessions et les jobs
+DETECTOR_POOL_WARM_SIZE = 2  # Moteurs créés au démarrage pour le moteur par défaut
+DETECTOR_POOL_MAX_IDLE = 4  # Moteurs inactifs conservés par combinaison (moteur, modèle, seuil)
+DETECTOR_POOL_BASE_CONFIDENCE = 0.1  # Seuil des graphes; les seuils supérieurs sont appliqués après détection
+
+# Fichiers des moteurs de détection OpenCV (non fournis: modèle SSD ResNet-10 du dépôt opencv/opencv_3rdparty)
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+OPENCV_DNN_PROTOTXT = os.path.join(MODELS_DIR, "deploy.prototxt")
+OPENCV_DNN_MODEL = os.path.join(MODELS_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+HAAR_CASCADE_PATH = None  # None = cascade frontale fournie avec OpenCV (cv2.data.haarcascades)
 
 # Paramètres de floutage
 DEFAULT_BLUR_METHOD = "gaussian"  # Options: 'gaussian', 'pixelate', 'solid'
@@ -20,4 +41,61 @@ DEFAULT_BLUR_INTENSITY = 100  # Plus la valeur est élevée, plus le floutage es
 
 # Paramètres vidéo
 DEFAULT_FPS = 30
-DEFAULT_RESOLUTION = (640, 480)  # (width, height)
\ No newline at end of file
+DEFAULT_RESOLUTION = (640, 480)  # (width, height)
+
+# Diffusion des sessions en direct (un thread de capture par session, partagé par les spectateurs)
+SESSION_BROADCAST_IDLE_TIMEOUT = 5.0  # Durée (s) sans spectateur après laquelle la capture s'interrompt
+STREAM_TARGET_FPS = DEFAULT_FPS  # Cadence maximale de diffusion (la cadence d'un fichier la plafonne)
+
+# Paramètres d'encodage vidéo
+VIDEO_ENCODER = "ffmpeg"  # Options: 'ffmpeg' (audio conservé), 'opencv'
+FFMPEG_CODEC = "libx264"  # Codec vidéo utilisé par l'encodeur ffmpeg
+FFMPEG_PRESET = "veryfast"  # Compromis vitesse/compression du codec
+FFMPEG_CRF = 23  # Qualité constante (plus bas = meilleure qualité, fichiers plus gros)
+
+# Paramètres des traitements asynchrones
+PROCESSING_JOB_WORKERS = 2  # Nombre de vidéos traitées simultanément en arrière-plan
+JOB_RETENTION_SECONDS = 3600  # Durée de conservation des jobs terminés
+JOB_EVENTS_MIN_INTERVAL = 0.25  # Délai minimal (s) entre deux événements de progression SSE
+
+# Traitement par lots en ligne de commande (batch.py)
+BATCH_WORKERS = os.cpu_count() or 1  # Vidéos traitées simultanément (un processus chacune)
+BATCH_VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")  # Fichiers recherchés dans les dossiers
+
+# Paramètres de rendu parallèle
+# Processus de rendu par vidéo longue: les cœurs sont partagés entre les jobs simultanés
+# pour ne pas lancer PROCESSING_JOB_WORKERS × cpu_count détecteurs à côté des sessions en direct
+VIDEO_PROCESSING_WORKERS = max(1, (os.cpu_count() or 1) // PROCESSING_JOB_WORKERS)
+MIN_FRAMES_PER_SHARD = 300  # Taille minimale d'une plage d'images traitée par un processus
+VIDEO_PIPELINE_ENABLED = True  # Décodage, détection, floutage et encodage dans des threads séparés
+PIPELINE_QUEUE_SIZE = 8  # Nombre maximal d'images en attente entre deux étapes du pipeline
+FRAME_BUFFER_REUSE = True  # Décodage et floutage dans des tampons préalloués réutilisés d'une image à l'autre
+SESSION_FRAME_BUFFERS = 3  # Tampons d'images lues et d'images traitées par session de prévisualisation
+
+# Paramètres de suivi des visages entre deux détections
+DETECTION_INTERVAL = 1  # Détection complète toutes les N images (1 = chaque image)
+MIN_TRACKING_CONFIDENCE = 0.5  # Proportion minimale de points suivis avant une nouvelle détection
+
+# Cache des détections (réutilisé quand seul le floutage change entre deux rendus)
+DETECTION_CACHE_ENABLED = True
+DETECTION_CACHE_MAX_BYTES = 2 * 1024 ** 3  # Taille maximale du cache: les fichiers les moins récemment utilisés sont supprimés
+CONTENT_HASH_MEMO_SIZE = 1024  # Empreintes de fichiers (clés du cache de détection) gardées en mémoire
+
+# Accès aléatoire aux images (défilement de la timeline)
+CAPTURE_POOL_SIZE = 4  # Captures vidéo gardées ouvertes, tous fichiers confondus
+KEYFRAME_INDEX_CACHE_SIZE = 32  # Index d'images clés gardés en mémoire
+VIDEO_INFO_CACHE_SIZE = 256  # Informations de vidéos (get_video_info) gardées en mémoire
+
+# Registre des webcams
+CAMERA_DEVICE_DIR = "/dev"  # Dossier des nœuds de périphériques videoN
+CAMERA_SYSFS_DIR = "/sys/class/video4linux"  # Noms des périphériques (Linux)
+CAMERA_MAX_INDEX = 10  # Indices sondés si le système n'expose pas de nœuds videoN
+CAMERA_PROBE_TIMEOUT = 2.0  # Délai maximal d'un sondage des caméras (secondes)
+CAMERA_REFRESH_INTERVAL = 30.0  # Intervalle de rafraîchissement du registre (secondes)
+
+# Réutilisation des détections sur les images statiques
+# Écart maximal de luminance (0-255) par cellule d'une grille 32x18 en dessous duquel
+# une image réutilise les détections de la précédente (0 = désactivé)
+STATIC_FRAME_THRESHOLD = 0.0
+# Distance d'histogramme (0-1) au-delà de laquelle une image est une coupure de scène
+SCENE_CUT_THRESHOLD = 0.5
@@ -4,13 +4,25 @@ Module pour le floutage de visages dans les images.
 
 import cv2
 import numpy as np
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from core.detections import Detections
 
 class BlurProcessor:
     """
     Classe pour appliquer différents types de floutage sur les visages détectés.
     """
 
+    # Écart type du flou appliqué sur la région réduite (flou gaussien à grand noyau)
+    PYRAMID_SIGMA = 3.0
+    # Surface maximale du rectangle englobant un groupe de visages qui se chevauchent,
+    # relativement à la somme de leurs surfaces, pour le flouter en une seule fois
+    MAX_REGION_INFLATION = 1.2
+    # Nombre de visages à partir duquel les visages sont floutés par bandes horizontales
+    # et recopiés sous un masque d'union construit en une fois (coût lié à la surface
+    # couverte et non plus au nombre de visages)
+    BAND_COMPOSITE_MIN_FACES = 16
+
     def __init__(self, blur_method: str = "gaussian", blur_intensity: int = 35):
         """
         Initialise le processeur de floutage.
@@ -56,15 +68,22 @@ class BlurProcessor:
         """
         self.blur_intensity = max(1, intensity)  # Assurer une intensité minimale
     
-    def blur_faces(self, image: np.ndarray, faces_data: List[Dict[str, Any]], 
-               selected_faces: Optional[List[int]] = None) -> np.ndarray:
+    def blur_faces(self, image: np.ndarray, faces_data: Detections, 
+               selected_faces: Optional[List[int]] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Applique le floutage sur les visages détectés.
         
+        Les rectangles du lot sont traités en tableau NumPy; les visages qui se chevauchent
+        sont regroupés et leur zone floutée une seule fois puis recopiée sous le
+        masque de leur union. Au-delà de BAND_COMPOSITE_MIN_FACES visages, chaque bande
+        de lignes couverte est floutée une fois et recopiée sous l'union de ses visages.
+        
         Args:
             image: Image au format numpy array
-            faces_data: Liste des visages détectés avec leurs coordonnées et scores
+            faces_data: Lot des visages détectés
             selected_faces: Liste des indices des visages à flouter (None = tous)
+            out: Tampon préalloué recevant le résultat (image elle-même pour flouter
+                 sur place); une nouvelle image est allouée si None
                 
         Returns:
             Image avec les visages floutés
@@ -74,75 +93,199 @@ class BlurProcessor:
             print("Image vide reçue dans blur_faces")
             return np.zeros((480, 640, 3), dtype=np.uint8)
         
-        # Créer une copie de l'image pour ne pas modifier l'original
-        result_image = image.copy()
-        
-        # Déterminer quels visages flouter
-        if selected_faces is None:
-            # Flouter tous les visages
-            faces_to_blur = range(len(faces_data))
+        # Écrire dans le tampon fourni, sinon dans une copie pour ne pas modifier l'original
+        if out is None or out.shape != image.shape or out.dtype != image.dtype:
+            result_image = image.copy()
         else:
-            # Flouter uniquement les visages sélectionnés
-            faces_to_blur = selected_faces
-        
-        # Appliquer le floutage aux visages sélectionnés
-        for idx in faces_to_blur:
-            if idx < len(faces_data):
-                face = faces_data[idx]
-                bbox = face['bbox'].copy()  # Créer une copie pour éviter de modifier l'original
-                
-                # Ajuster les coordonnées si elles sont hors limites
-                if bbox['xmin'] < 0:
-                    bbox['width'] += bbox['xmin']  # Réduire la largeur
-                    bbox['xmin'] = 0
-                if bbox['ymin'] < 0:
-                    bbox['height'] += bbox['ymin']  # Réduire la hauteur
-                    bbox['ymin'] = 0
-                if bbox['xmax'] > result_image.shape[1]:
-                    bbox['xmax'] = result_image.shape[1]
-                    bbox['width'] = bbox['xmax'] - bbox['xmin']
-                if bbox['ymax'] > result_image.shape[0]:
-                    bbox['ymax'] = result_image.shape[0]
-                    bbox['height'] = bbox['ymax'] - bbox['ymin']
+            result_image = out
+            if out is not image:
+                np.copyto(result_image, image)
+        
+        # Déterminer quels visages flouter (tous si selected_faces est None)
+        faces_to_blur = faces_data.select(selected_faces)
+        
+        if not len(faces_to_blur):
+            return result_image
+        
+        boxes = self.face_boxes(faces_to_blur, result_image.shape[1], result_image.shape[0])
+        blur_method = self.blur_methods.get(self.blur_method, self._apply_gaussian_blur)
+        
+        if len(boxes) >= self.BAND_COMPOSITE_MIN_FACES:
+            self._blur_bands(image, result_image, boxes, blur_method)
+            return result_image
+        
+        # Chaque zone est floutée une seule fois, à partir de l'image d'origine: les
+        # visages qui se chevauchent ne sont jamais floutés deux fois. Toutes les zones
+        # sont floutées avant la première écriture, l'image d'origine pouvant être le
+        # tampon résultat.
+        blurred_regions = []
+        for (x1, y1, x2, y2), members in self._covering_regions(boxes):
+            try:
+                blurred_region = blur_method(image[y1:y2, x1:x2])
                 
-                # Vérifier à nouveau si la boîte est valide après ajustements
-                if bbox['width'] <= 0 or bbox['height'] <= 0:
-                    print(f"Boîte englobante trop petite après ajustement: {bbox}")
+                # Vérifier que la région floutée n'est pas vide
+                if blurred_region.size == 0:
+                    print("Échec du floutage de la région du visage")
                     continue
                 
-                try:
-                    # Extraire la région du visage
-                    face_region = result_image[
-                        bbox['ymin']:bbox['ymax'],
-                        bbox['xmin']:bbox['xmax']
-                    ]
-                    
-                    # Vérifier que la région du visage n'est pas vide
-                    if face_region.size == 0:
-                        print(f"Région de visage vide pour les coordonnées {bbox}")
-                        continue
-                    
-                    # Appliquer le floutage approprié
-                    blur_method = self.blur_methods.get(self.blur_method, self._apply_gaussian_blur)
-                    blurred_face = blur_method(face_region)
-                    
-                    # Vérifier que le visage flouté n'est pas vide
-                    if blurred_face.size == 0:
-                        print("Échec du floutage de la région du visage")
-                        continue
-                    
-                    # Appliquer la région floutée à l'image résultante
-                    result_image[
-                        bbox['ymin']:bbox['ymax'],
-                        bbox['xmin']:bbox['xmax']
-                    ] = blurred_face
-                
-                except Exception as e:
-                    print(f"Erreur lors du floutage du visage: {e}")
+                if np.may_share_memory(blurred_region, image):
+                    # Région rendue telle quelle (erreur de la méthode): rien à recopier
                     continue
+                
+                blurred_regions.append(((x1, y1, x2, y2), members, blurred_region))
+            
+            except Exception as e:
+                print(f"Erreur lors du floutage du visage: {e}")
+                continue
+        
+        for (x1, y1, x2, y2), members, blurred_region in blurred_regions:
+            region = result_image[y1:y2, x1:x2]
+            if len(members) == 1:
+                region[...] = blurred_region
+            else:
+                # Union des visages du groupe: seuls leurs pixels sont remplacés
+                mask = np.zeros(region.shape[:2], dtype=np.uint8)
+                for bx1, by1, bx2, by2 in members - (x1, y1, x1, y1):
+                    mask[by1:by2, bx1:bx2] = 1
+                # Copie masquée écrite directement dans la vue de l'image résultat
+                cv2.copyTo(blurred_region, mask, region)
         
         return result_image
 
+    def _blur_bands(self, image: np.ndarray, result_image: np.ndarray, boxes: np.ndarray, blur_method):
+        """
+        Floute de nombreux visages par bandes horizontales.
+        
+        Les visages dont les lignes se recouvrent forment une bande; chaque bande est
+        floutée une fois puis recopiée sous le masque de l'union de ses visages.
+        
+        Args:
+            image: Image d'origine
+            result_image: Image résultat (éventuellement image elle-même)
+            boxes: Tableau N x 4 (xmin, ymin, xmax, ymax) limité à l'image
+            blur_method: Méthode de floutage appliquée à une région
+        """
+        # Bandes: intervalles de lignes fusionnés (début de bande quand un visage
+        # commence sous la fin de toutes les lignes précédentes)
+        boxes = boxes[np.argsort(boxes[:, 1], kind="stable")]
+        rows_end = np.maximum.accumulate(boxes[:, 3])
+        band_starts = np.flatnonzero(boxes[1:, 1] >= rows_end[:-1]) + 1
+        
+        # Les bandes ne partagent aucune ligne: écrire une bande ne modifie jamais
+        # la source d'une autre, même lorsque l'image est floutée sur place
+        for members in np.split(boxes, band_starts):
+            x1, y1 = members[:, :2].min(axis=0)
+            x2, y2 = members[:, 2:].max(axis=0)
+            try:
+                blurred_band = blur_method(image[y1:y2, x1:x2])
+                if blurred_band.size == 0 or np.may_share_memory(blurred_band, image):
+                    print("Échec du floutage de la bande de visages")
+                    continue
+                mask = self._union_mask(members - (x1, y1, x1, y1), (y2 - y1, x2 - x1))
+                cv2.copyTo(blurred_band, mask, result_image[y1:y2, x1:x2])
+            except Exception as e:
+                print(f"Erreur lors du floutage des visages: {e}")
+    
+    @staticmethod
+    def _union_mask(boxes: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+        """
+        Masque de l'union de rectangles, construit sans boucle sur les rectangles.
+        
+        La couverture est calculée sur la grille des coordonnées distinctes des
+        rectangles (tableau des différences cumulé), puis chaque cellule est agrandie
+        à sa taille en pixels.
+        
+        Args:
+            boxes: Tableau N x 4 (xmin, ymin, xmax, ymax) relatif à la zone
+            shape: (hauteur, largeur) de la zone
+            
+        Returns:
+            Masque uint8 (1 dans l'union des rectangles)
+        """
+        height, width = shape
+        xs = np.unique(np.concatenate([[0, width], boxes[:, 0], boxes[:, 2]]))
+        ys = np.unique(np.concatenate([[0, height], boxes[:, 1], boxes[:, 3]]))
+        x1, x2 = np.searchsorted(xs, boxes[:, 0]), np.searchsorted(xs, boxes[:, 2])
+        y1, y2 = np.searchsorted(ys, boxes[:, 1]), np.searchsorted(ys, boxes[:, 3])
+        
+        diff = np.zeros((len(ys), len(xs)), dtype=np.int32)
+        np.add.at(
+            diff,
+            (np.concatenate([y1, y1, y2, y2]), np.concatenate([x1, x2, x1, x2])),
+            np.repeat(np.array([1, -1, -1, 1], dtype=np.int32), len(boxes))
+        )
+        covered = (diff.cumsum(axis=0).cumsum(axis=1)[:-1, :-1] > 0).astype(np.uint8)
+        return np.repeat(np.repeat(covered, np.diff(ys), axis=0), np.diff(xs), axis=1)
+
+    @staticmethod
+    def face_boxes(faces_data: Detections, image_width: int, image_height: int) -> np.ndarray:
+        """
+        Rectangles des visages, limités à l'image.
+        
+        Args:
+            faces_data: Lot des visages détectés
+            image_width: Largeur de l'image
+            image_height: Hauteur de l'image
+            
+        Returns:
+            Tableau N x 4 (xmin, ymin, xmax, ymax) sans les rectangles vides
+        """
+        # Copie: les tableaux du lot peuvent être partagés
+        boxes = faces_data.boxes.astype(np.int64)
+        boxes[:, 0::2] = np.clip(boxes[:, 0::2], 0, image_width)
+        boxes[:, 1::2] = np.clip(boxes[:, 1::2], 0, image_height)
+        return boxes[(boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])]
+
+    @classmethod
+    def _covering_regions(cls, boxes: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Regroupe les rectangles qui se chevauchent en zones floutées d'un seul tenant.
+        
+        Un groupe dont le rectangle englobant est bien plus grand que ses visages
+        (chaîne de visages dans une foule) reste découpé visage par visage, pour
+        que le coût suive la surface couverte.
+        
+        Args:
+            boxes: Tableau N x 4 (xmin, ymin, xmax, ymax)
+            
+        Returns:
+            Liste de tuples (rectangle de la zone, rectangles des visages de la zone)
+        """
+        if len(boxes) <= 1:
+            return [(box, boxes[i:i + 1]) for i, box in enumerate(boxes)]
+        
+        overlap = (
+            (boxes[:, None, 0] < boxes[None, :, 2]) & (boxes[None, :, 0] < boxes[:, None, 2]) &
+            (boxes[:, None, 1] < boxes[None, :, 3]) & (boxes[None, :, 1] < boxes[:, None, 3])
+        )
+        
+        # Composantes connexes: chaque rectangle prend la plus petite étiquette de ses
+        # voisins, puis celle de cette étiquette (saut de pointeurs, convergence rapide
+        # même pour une longue chaîne de visages)
+        labels = np.arange(len(boxes))
+        while True:
+            new_labels = np.where(overlap, labels[None, :], len(boxes)).min(axis=1)
+            new_labels = new_labels[new_labels]
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+        
+        # Découper les rectangles triés par groupe
+        order = np.argsort(labels, kind="stable")
+        groups = np.split(boxes[order], np.flatnonzero(np.diff(labels[order])) + 1)
+        
+        regions = []
+        for members in groups:
+            if len(members) > 1:
+                rect = np.concatenate([members[:, :2].min(axis=0), members[:, 2:].max(axis=0)])
+                rect_area = (rect[2] - rect[0]) * (rect[3] - rect[1])
+                members_area = ((members[:, 2] - members[:, 0]) * (members[:, 3] - members[:, 1])).sum()
+                if rect_area <= cls.MAX_REGION_INFLATION * members_area:
+                    regions.append((rect, members))
+                    continue
+            regions.extend((box, members[i:i + 1]) for i, box in enumerate(members))
+        return regions
+
     def _apply_gaussian_blur(self, face_region: np.ndarray) -> np.ndarray:
         """
         Applique un flou gaussien à la région du visage.
@@ -167,7 +310,26 @@ class BlurProcessor:
             if kernel_size % 2 == 0:
                 kernel_size += 1
             
-            return cv2.GaussianBlur(face_region, (kernel_size, kernel_size), 0)
+            # Écart type qu'OpenCV déduit de la taille du noyau (sigma = 0)
+            sigma = 0.3 * ((kernel_size - 1) * 0.5 - 1) + 0.8
+            factor = int(sigma / self.PYRAMID_SIGMA)
+            if factor < 2:
+                # Petit noyau: le flou direct est déjà peu coûteux
+                return cv2.GaussianBlur(face_region, (kernel_size, kernel_size), 0)
+            
+            # Grand noyau: réduire la région d'un facteur proportionnel à sigma, flouter
+            # avec un petit noyau puis agrandir. Le coût ne dépend plus de l'intensité.
+            # La réduction (moyenne sur factor pixels) et l'agrandissement (interpolation
+            # linéaire) apportent ensemble une variance d'environ factor²/4, retranchée du flou réduit.
+            height, width = face_region.shape[:2]
+            small = cv2.resize(
+                face_region,
+                (max(1, round(width / factor)), max(1, round(height / factor))),
+                interpolation=cv2.INTER_AREA
+            )
+            small_sigma = np.sqrt(max(sigma * sigma / (factor * factor) - 0.25, 0.25))
+            small = cv2.GaussianBlur(small, (0, 0), small_sigma)
+            return cv2.resize(small, (width, height), interpolation=cv2.INTER_LINEAR)
         
         except Exception as e:
             print(f"Erreur dans _apply_gaussian_blur: {e}")
@@ -223,16 +385,13 @@ class BlurProcessor:
                 print("Région de visage vide dans _apply_solid_mask")
                 return np.zeros_like(face_region)
             
-            # Créer un masque de couleur uniforme
-            mask = np.zeros_like(face_region)
-            
             # Couleur du masque (gris par défaut)
             color = 128  # Valeur entre 0 et 255
-            mask[:] = (color, color, color)
             
-            # Mélanger le masque avec la région du visage en fonction de l'intensité
+            # Mélanger la couleur avec la région du visage en fonction de l'intensité, en
+            # une passe (identique à addWeighted avec une image unie, sans l'allouer)
             alpha = min(1.0, self.blur_intensity / 100)
-            return cv2.addWeighted(face_region, 1 - alpha, mask, alpha, 0)
+            return cv2.convertScaleAbs(face_region, alpha=1 - alpha, beta=color * alpha)
         
         except Exception as e:
             print(f"Erreur dans _apply_solid_mask: {e}")
@@ -0,0 +1,185 @@
+"""
+Lot de visages détectés dans une image, stocké en tableaux NumPy.
+
+Le détecteur, le suivi, le floutage et les caches échangent des Detections;
+les dictionnaires imbriqués (bbox, keypoints, score) ne sont construits qu'aux
+frontières de l'API par to_dicts (et relus par from_dicts).
+"""
+
+import numpy as np
+from typing import Dict, List, Any, Optional, Sequence, Union
+
+# Nombre de points clés conservés par visage (MediaPipe en fournit 6)
+MAX_KEYPOINTS = 6
+
+
+class Detections:
+    """
+    Visages d'une image. Les tableaux ne sont jamais modifiés après construction:
+    un lot peut être partagé (cache, images statiques) ou être une vue d'un index.
+
+    Attributes:
+        boxes: Tableau N×4 int32 (xmin, ymin, xmax, ymax) en pixels
+        keypoints: Tableau N×6×2 int32 (x, y) en pixels, -1 pour un point absent
+        scores: Tableau N float32
+        track_ids: Tableau N int32 des identifiants de piste, ou None
+    """
+
+    __slots__ = ("boxes", "keypoints", "scores", "track_ids")
+
+    def __init__(self, boxes: np.ndarray, scores: np.ndarray,
+                 keypoints: Optional[np.ndarray] = None, track_ids: Optional[np.ndarray] = None):
+        """
+        Args:
+            boxes: Rectangles N×4 (xmin, ymin, xmax, ymax)
+            scores: Scores de confiance
+            keypoints: Points clés N×6×2 (None = aucun point)
+            track_ids: Identifiants de piste (None = visages non suivis)
+        """
+        self.boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        count = len(self.boxes)
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(count)
+        if keypoints is None:
+            self.keypoints = np.full((count, MAX_KEYPOINTS, 2), -1, dtype=np.int32)
+        else:
+            self.keypoints = np.asarray(keypoints, dtype=np.int32).reshape(count, MAX_KEYPOINTS, 2)
+        self.track_ids = None if track_ids is None else np.asarray(track_ids, dtype=np.int32).reshape(count)
+
+    @classmethod
+    def empty(cls) -> "Detections":
+        """Lot sans visage."""
+        return cls(np.empty((0, 4), dtype=np.int32), np.empty(0, dtype=np.float32))
+
+    @classmethod
+    def from_xywh(cls, boxes: np.ndarray, scores: np.ndarray, keypoints: Optional[np.ndarray] = None,
+                  track_ids: Optional[np.ndarray] = None) -> "Detections":
+        """Construit un lot à partir de rectangles (xmin, ymin, largeur, hauteur), format des caches."""
+        boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        return cls(np.concatenate([boxes[:, :2], boxes[:, :2] + boxes[:, 2:]], axis=1), scores, keypoints, track_ids)
+
+    @classmethod
+    def concatenate(cls, batches: Sequence["Detections"]) -> "Detections":
+        """Réunit plusieurs lots (zones analysées séparément d'une même image)."""
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        track_ids = None
+        if all(batch.track_ids is not None for batch in batches):
+            track_ids = np.concatenate([batch.track_ids for batch in batches])
+        return cls(
+            np.concatenate([batch.boxes for batch in batches]),
+            np.concatenate([batch.scores for batch in batches]),
+            np.concatenate([batch.keypoints for batch in batches]),
+            track_ids
+        )
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __repr__(self) -> str:
+        return f"Detections({len(self)} visage(s))"
+
+    @property
+    def xywh(self) -> np.ndarray:
+        """Rectangles N×4 (xmin, ymin, largeur, hauteur)."""
+        return np.concatenate([self.boxes[:, :2], self.boxes[:, 2:] - self.boxes[:, :2]], axis=1)
+
+    def take(self, indices: Union[np.ndarray, Sequence[int]]) -> "Detections":
+        """
+        Sous-ensemble du lot.
+
+        Args:
+            indices: Indices des visages conservés, ou masque booléen
+
+        Returns:
+            Nouveau lot
+        """
+        indices = np.asarray(indices)
+        if indices.dtype != bool:
+            indices = indices.astype(np.intp)
+        return Detections(
+            self.boxes[indices],
+            self.scores[indices],
+            self.keypoints[indices],
+            None if self.track_ids is None else self.track_ids[indices]
+        )
+
+    def select(self, selected_faces: Optional[Sequence[int]]) -> "Detections":
+        """
+        Visages choisis par l'utilisateur.
+
+        Args:
+            selected_faces: Indices des visages (None = tous); les indices hors du lot sont ignorés
+
+        Returns:
+            Lot des visages sélectionnés
+        """
+        if selected_faces is None:
+            return self
+        return self.take([idx for idx in selected_faces if 0 <= idx < len(self)])
+
+    @classmethod
+    def from_dicts(cls, faces_data: List[Dict[str, Any]]) -> "Detections":
+        """
+        Construit un lot à partir de visages au format JSON de l'API.
+
+        Args:
+            faces_data: Liste de dictionnaires {'bbox', 'keypoints', 'score'[, 'face_id']}
+
+        Returns:
+            Lot équivalent
+        """
+        keypoints = np.full((len(faces_data), MAX_KEYPOINTS, 2), -1, dtype=np.int32)
+        for face_idx, face in enumerate(faces_data):
+            for idx, point in (face.get('keypoints') or {}).items():
+                if 0 <= int(idx) < MAX_KEYPOINTS:
+                    keypoints[face_idx, int(idx)] = (point['x'], point['y'])
+
+        track_ids = None
+        if faces_data and all(face.get('face_id') is not None for face in faces_data):
+            track_ids = [face['face_id'] for face in faces_data]
+
+        return cls(
+            [(face['bbox']['xmin'], face['bbox']['ymin'], face['bbox']['xmax'], face['bbox']['ymax'])
+             for face in faces_data],
+            [face['score'] for face in faces_data],
+            keypoints,
+            track_ids
+        )
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """
+        Convertit le lot au format JSON de l'API (schemas.FaceData).
+
+        face_id est l'identifiant de piste si le lot en a, sinon la position du visage dans le lot.
+
+        Returns:
+            Liste de dictionnaires {'bbox', 'keypoints', 'score', 'face_id'}
+        """
+        boxes = self.boxes.tolist()
+        scores = self.scores.tolist()
+        keypoints = self.keypoints.tolist()
+        face_ids = self.track_ids.tolist() if self.track_ids is not None else range(len(boxes))
+
+        faces_data = []
+        for (xmin, ymin, xmax, ymax), score, points, face_id in zip(boxes, scores, keypoints, face_ids):
+            faces_data.append({
+                'bbox': {
+                    'xmin': xmin,
+                    'ymin': ymin,
+                    'width': xmax - xmin,
+                    'height': ymax - ymin,
+                    'score': score,
+                    'xmax': xmax,
+                    'ymax': ymax
+                },
+                'keypoints': {
+                    idx: {'x': x, 'y': y}
+                    for idx, (x, y) in enumerate(points)
+                    if x >= 0 and y >= 0
+                },
+                'score': score,
+                'face_id': face_id
+            })
+        return faces_data
@@ -0,0 +1,170 @@
+"""
+Moteurs de détection de visages utilisables par FaceDetector (MediaPipe,
+réseau DNN d'OpenCV, cascades de Haar).
+"""
+
+import os
+import cv2
+import numpy as np
+from typing import List, Tuple, Optional
+
+import config
+
+# Détection brute: (xmin, ymin, largeur, hauteur, score, points clés), coordonnées relatives (0-1)
+RawDetection = Tuple[float, float, float, float, float, List[Tuple[float, float]]]
+
+
+class DetectorBackend:
+    """
+    Interface commune des moteurs de détection.
+
+    Un moteur reçoit une image BGR et retourne des détections en coordonnées
+    relatives; FaceDetector se charge du redimensionnement, de la conversion
+    en pixels et du format des visages.
+    """
+
+    name = ""
+
+    def detect(self, image: np.ndarray) -> List[RawDetection]:
+        """
+        Détecte les visages d'une image.
+
+        Args:
+            image: Image au format numpy array (BGR)
+
+        Returns:
+            Liste des détections en coordonnées relatives
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Libère les ressources du moteur."""
+
+
+class MediaPipeBackend(DetectorBackend):
+    """Détecteur BlazeFace de MediaPipe (points clés des yeux, du nez, de la bouche et des oreilles)."""
+
+    name = "mediapipe"
+
+    def __init__(self, min_detection_confidence: float = 0.5, model_selection: int = 1):
+        # Import différé: le chargement de MediaPipe est long et se fait hors du démarrage du serveur
+        import mediapipe as mp
+
+        self.face_detection = mp.solutions.face_detection.FaceDetection(
+            min_detection_confidence=min_detection_confidence,
+            model_selection=model_selection
+        )
+        # Tampon RGB réutilisé d'une image à l'autre (MediaPipe attend du RGB)
+        self._rgb: Optional[np.ndarray] = None
+
+    def detect(self, image: np.ndarray) -> List[RawDetection]:
+        if self._rgb is None or self._rgb.shape != image.shape:
+            self._rgb = np.empty_like(image)
+        cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        results = self.face_detection.process(self._rgb)
+
+        detections = []
+        for detection in results.detections or []:
+            bbox = detection.location_data.relative_bounding_box
+            keypoints = [(kp.x, kp.y) for kp in detection.location_data.relative_keypoints or []]
+            detections.append((bbox.xmin, bbox.ymin, bbox.width, bbox.height, float(detection.score[0]), keypoints))
+        return detections
+
+    def close(self):
+        self.face_detection.close()
+
+
+class OpenCVDNNBackend(DetectorBackend):
+    """Détecteur SSD ResNet-10 (Caffe) exécuté par le module DNN d'OpenCV."""
+
+    name = "opencv"
+
+    # Entrée du réseau et moyennes BGR soustraites (valeurs d'entraînement du modèle)
+    INPUT_SIZE = (300, 300)
+    MEAN = (104.0, 177.0, 123.0)
+
+    def __init__(self, min_detection_confidence: float = 0.5,
+                 prototxt_path: Optional[str] = None, model_path: Optional[str] = None):
+        prototxt_path = prototxt_path or config.OPENCV_DNN_PROTOTXT
+        model_path = model_path or config.OPENCV_DNN_MODEL
+        for path in (prototxt_path, model_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Fichier du modèle DNN introuvable: {path}")
+
+        self.min_detection_confidence = min_detection_confidence
+        self.net = cv2.dnn.readNetFromCaffe(prototxt_path, model_path)
+
+    def detect(self, image: np.ndarray) -> List[RawDetection]:
+        blob = cv2.dnn.blobFromImage(cv2.resize(image, self.INPUT_SIZE), 1.0, self.INPUT_SIZE, self.MEAN)
+        self.net.setInput(blob)
+        output = self.net.forward()  # 1 x 1 x N x 7: (_, classe, score, x1, y1, x2, y2)
+
+        detections = []
+        for _, _, score, x1, y1, x2, y2 in output[0, 0]:
+            if score < self.min_detection_confidence:
+                continue
+            x1, y1 = max(0.0, float(x1)), max(0.0, float(y1))
+            x2, y2 = min(1.0, float(x2)), min(1.0, float(y2))
+            if x2 > x1 and y2 > y1:
+                detections.append((x1, y1, x2 - x1, y2 - y1, float(score), []))
+        return detections
+
+
+class HaarBackend(DetectorBackend):
+    """
+    Cascade de Haar d'OpenCV: la plus légère, mais limitée aux visages de face
+    et sans score de confiance (score fixé à 1.0).
+    """
+
+    name = "haar"
+
+    def __init__(self, cascade_path: Optional[str] = None, min_face_size: int = 24):
+        if not hasattr(cv2, "CascadeClassifier"):
+            raise ImportError("Cette version d'OpenCV ne fournit pas les cascades de Haar (cv2.CascadeClassifier)")
+        cascade_path = cascade_path or config.HAAR_CASCADE_PATH or os.path.join(
+            getattr(getattr(cv2, "data", None), "haarcascades", ""), "haarcascade_frontalface_default.xml"
+        )
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise FileNotFoundError(f"Cascade de Haar introuvable ou invalide: {cascade_path}")
+        self.min_face_size = min_face_size
+
+    def detect(self, image: np.ndarray) -> List[RawDetection]:
+        height, width = image.shape[:2]
+        gray = cv2.equalizeHist(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+        faces = self.cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(self.min_face_size, self.min_face_size)
+        )
+        return [(x / width, y / height, w / width, h / height, 1.0, []) for x, y, w, h in faces]
+
+
+# Moteurs disponibles, par nom (valeurs de config.FACE_DETECTION_MODEL)
+DETECTOR_BACKENDS = {
+    MediaPipeBackend.name: MediaPipeBackend,
+    OpenCVDNNBackend.name: OpenCVDNNBackend,
+    HaarBackend.name: HaarBackend
+}
+
+
+def create_backend(name: str, min_detection_confidence: float = 0.5, model_selection: int = 1) -> DetectorBackend:
+    """
+    Crée un moteur de détection.
+
+    Args:
+        name: Nom du moteur ('mediapipe', 'opencv', 'haar')
+        min_detection_confidence: Seuil de confiance minimum (ignoré par 'haar')
+        model_selection: Modèle MediaPipe (0 = courte distance, 1 = longue distance)
+
+    Returns:
+        Moteur prêt à l'emploi
+    """
+    if name == MediaPipeBackend.name:
+        return MediaPipeBackend(min_detection_confidence, model_selection)
+    if name == OpenCVDNNBackend.name:
+        return OpenCVDNNBackend(min_detection_confidence)
+    if name == HaarBackend.name:
+        return HaarBackend()
+    raise ValueError(f"Moteur de détection '{name}' non supporté.")
@@ -0,0 +1,193 @@
+"""
+Pool de moteurs de détection initialisés à l'avance, partagés par les sessions
+et les jobs du processus.
+
+Créer un graphe MediaPipe coûte plusieurs dizaines de millisecondes et de la
+mémoire: les moteurs sont prêtés puis rendus au pool au lieu d'être recréés.
+"""
+
+import threading
+import numpy as np
+from typing import Dict, List, Tuple, Optional
+
+import config
+from core.detector_backends import DetectorBackend, HaarBackend, create_backend
+
+# (moteur, modèle, seuil de confiance du graphe)
+PoolKey = Tuple[str, int, Optional[float]]
+
+
+class DetectorPool:
+    """
+    Moteurs de détection inactifs, regroupés par paramètres de construction.
+
+    Le seuil de confiance demandé n'est pas une clé du pool: le graphe est créé
+    avec un seuil plancher (config.DETECTOR_POOL_BASE_CONFIDENCE) et FaceDetector
+    filtre les détections au seuil demandé. Seul un seuil inférieur au plancher
+    nécessite un graphe dédié.
+    """
+
+    def __init__(self, max_idle_per_key: int = 4, base_confidence: float = 0.1):
+        """
+        Args:
+            max_idle_per_key: Nombre maximal de moteurs inactifs conservés par clé
+            base_confidence: Seuil de confiance plancher des graphes
+        """
+        self.max_idle_per_key = max_idle_per_key
+        self.base_confidence = base_confidence
+
+        self._idle: Dict[PoolKey, List[DetectorBackend]] = {}
+        self._leased: Dict[int, PoolKey] = {}
+        self._lock = threading.Lock()
+
+        # Prêt dès qu'un moteur a été créé et a exécuté une première détection
+        self.ready = threading.Event()
+        self.warmup_error: Optional[str] = None
+        self._warmup_thread: Optional[threading.Thread] = None
+
+        # Statistiques
+        self.created = 0
+        self.reused = 0
+
+    def key(self, name: str, model_selection: int, min_detection_confidence: float) -> PoolKey:
+        """
+        Clé du pool pour des paramètres de détection.
+
+        Args:
+            name: Nom du moteur
+            model_selection: Modèle MediaPipe
+            min_detection_confidence: Seuil de confiance demandé
+
+        Returns:
+            Clé regroupant les moteurs interchangeables
+        """
+        if name == HaarBackend.name:
+            # Ni modèle ni seuil de confiance
+            return (name, 0, None)
+        return (name, model_selection, min(float(min_detection_confidence), self.base_confidence))
+
+    def acquire(self, name: str, model_selection: int = 1,
+                min_detection_confidence: float = 0.5) -> Tuple[DetectorBackend, PoolKey]:
+        """
+        Prête un moteur (inactif s'il en existe un, sinon nouvellement créé).
+
+        Returns:
+            Tuple (moteur, clé du pool)
+        """
+        key = self.key(name, model_selection, min_detection_confidence)
+        with self._lock:
+            idle = self._idle.get(key)
+            backend = idle.pop() if idle else None
+            if backend is not None:
+                self.reused += 1
+                self._leased[id(backend)] = key
+                return backend, key
+
+        # Création hors du verrou: les autres clés restent disponibles pendant l'initialisation
+        _, graph_model_selection, graph_confidence = key
+        backend = create_backend(
+            name,
+            min_detection_confidence=graph_confidence if graph_confidence is not None else 0.5,
+            model_selection=graph_model_selection
+        )
+        with self._lock:
+            self.created += 1
+            self._leased[id(backend)] = key
+        return backend, key
+
+    def release(self, backend: DetectorBackend):
+        """
+        Rend un moteur au pool (fermé si le pool en conserve déjà assez).
+
+        Args:
+            backend: Moteur obtenu par acquire
+        """
+        with self._lock:
+            key = self._leased.pop(id(backend), None)
+            if key is not None:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_key:
+                    idle.append(backend)
+                    return
+        backend.close()
+
+    def warm(self, name: str, model_selection: int = 1, min_detection_confidence: float = 0.5, count: int = 1):
+        """
+        Crée des moteurs inactifs à l'avance et exécute une première détection sur
+        chacun (MediaPipe termine l'initialisation de son graphe au premier appel).
+
+        Args:
+            name: Nom du moteur
+            model_selection: Modèle MediaPipe
+            min_detection_confidence: Seuil de confiance demandé
+            count: Nombre de moteurs inactifs souhaités pour cette clé
+        """
+        key = self.key(name, model_selection, min_detection_confidence)
+        with self._lock:
+            missing = min(count, self.max_idle_per_key) - len(self._idle.get(key, []))
+        backends = [self.acquire(name, model_selection, min_detection_confidence)[0] for _ in range(max(0, missing))]
+        try:
+            for backend in backends:
+                backend.detect(np.zeros((64, 64, 3), dtype=np.uint8))
+        finally:
+            for backend in backends:
+                self.release(backend)
+        self.ready.set()
+
+    def start_warmup(self, name: str, model_selection: int = 1, min_detection_confidence: float = 0.5,
+                     count: int = 1) -> threading.Thread:
+        """
+        Lance warm() dans un thread de fond pour ne pas retarder le démarrage du serveur.
+
+        Returns:
+            Thread de préparation
+        """
+        def run():
+            try:
+                self.warm(name, model_selection, min_detection_confidence, count)
+                self.warmup_error = None
+            except Exception as e:
+                self.warmup_error = str(e)
+                print(f"Impossible de préparer les détecteurs: {e}")
+
+        with self._lock:
+            if self._warmup_thread is None or not self._warmup_thread.is_alive():
+                self._warmup_thread = threading.Thread(target=run, name="detector-warmup", daemon=True)
+                self._warmup_thread.start()
+            return self._warmup_thread
+
+    def is_warming_up(self) -> bool:
+        return self._warmup_thread is not None and self._warmup_thread.is_alive()
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(idle) for idle in self._idle.values())
+
+    def leased_count(self) -> int:
+        with self._lock:
+            return len(self._leased)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Nombre de moteurs inactifs, prêtés, créés et réutilisés."""
+        with self._lock:
+            return {
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "leased": len(self._leased),
+                "created": self.created,
+                "reused": self.reused
+            }
+
+    def close_all(self):
+        """Ferme tous les moteurs inactifs."""
+        with self._lock:
+            backends = [backend for idle in self._idle.values() for backend in idle]
+            self._idle.clear()
+        for backend in backends:
+            backend.close()
+
+
+# Pool partagé par les sessions et les jobs du processus
+DETECTOR_POOL = DetectorPool(
+    max_idle_per_key=config.DETECTOR_POOL_MAX_IDLE,
+    base_confidence=config.DETECTOR_POOL_BASE_CONFIDENCE
+)
@@ -1,146 +1,311 @@
 """
-Module pour la détection de visages utilisant MediaPipe.
+Module pour la détection de visages (MediaPipe, OpenCV DNN ou cascades de Haar).
 """
 
 import cv2
 import numpy as np
-import mediapipe as mp
-from typing import List, Dict, Any, Tuple
+from typing import Tuple, Optional
+
+from core.detector_pool import DETECTOR_POOL
+from core.detections import Detections, MAX_KEYPOINTS
+from utils.frame_buffers import FrameRing
 
 class FaceDetector:
     """
     Classe pour détecter les visages dans les images ou les flux vidéo 
-    en utilisant MediaPipe.
+    à l'aide d'un moteur de détection interchangeable (MediaPipe par défaut).
     """
 
-    def __init__(self, min_detection_confidence: float = 0.5, model_selection: int = 1):
+    def __init__(self, min_detection_confidence: float = 0.5, model_selection: int = 1,
+                 detection_size: Optional[int] = None, detection_scale: float = 1.0,
+                 roi_tracking: bool = False, full_scan_interval: int = 10, roi_padding: float = 0.5,
+                 backend: str = "mediapipe"):
         """
         Initialise le détecteur de visages.
         
         Args:
             min_detection_confidence: Seuil de confiance minimum pour la détection
             model_selection: 0 pour les visages à courte distance (<2m), 1 pour les visages à longue distance (<5m)
+            detection_size: Longueur maximale (en pixels) du grand côté de l'image analysée (None = pas de limite)
+            detection_scale: Facteur de réduction appliqué à l'image analysée (1.0 = pleine résolution)
+            roi_tracking: Si True, n'analyse que les zones autour des visages de l'image précédente
+            full_scan_interval: Analyse de l'image entière toutes les N images en mode suivi
+            roi_padding: Marge ajoutée autour de chaque visage, en proportion de sa taille
+            backend: Moteur de détection ('mediapipe', 'opencv' pour le réseau DNN, 'haar')
         """
-        self.mp_face_detection = mp.solutions.face_detection
-        self.mp_drawing = mp.solutions.drawing_utils
+        self.backend_name = backend
         self.min_detection_confidence = min_detection_confidence
         self.model_selection = model_selection
+        self.detection_size = detection_size
+        self.detection_scale = detection_scale
+        self.roi_tracking = roi_tracking
+        self.full_scan_interval = max(1, full_scan_interval)
+        self.roi_padding = roi_padding
+        
+        # Statistiques du mode suivi
+        self.full_scans = 0
+        self.roi_scans = 0
+        self.reset()
         
-        # Initialise le détecteur de visages
-        self.face_detection = self.mp_face_detection.FaceDetection(
-            min_detection_confidence=self.min_detection_confidence,
-            model_selection=self.model_selection
+        # Tampon de l'image entière réduite, réutilisé d'une image à l'autre
+        self._detection_buffers = FrameRing(1)
+        
+        # Moteur de détection prêté par le pool partagé
+        self.backend = None
+        self._acquire_backend()
+
+    def _acquire_backend(self):
+        """Emprunte au pool un moteur correspondant aux paramètres actuels."""
+        self.backend, self._pool_key = DETECTOR_POOL.acquire(
+            self.backend_name,
+            model_selection=self.model_selection,
+            min_detection_confidence=self.min_detection_confidence
         )
 
-    def detect_faces(self, image: np.ndarray) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    def reconfigure(self, min_detection_confidence: Optional[float] = None,
+                    model_selection: Optional[int] = None, backend: Optional[str] = None):
+        """
+        Modifie les paramètres du moteur de détection.
+        
+        Le moteur n'est remplacé que si la clé du pool change: un nouveau seuil de
+        confiance est en général appliqué comme simple filtre des détections.
+        Si le nouveau moteur ne peut pas être créé, le détecteur reste inchangé.
+        
+        Args:
+            min_detection_confidence: Nouveau seuil de confiance (None = inchangé)
+            model_selection: Nouveau modèle MediaPipe (None = inchangé)
+            backend: Nouveau moteur de détection (None = inchangé)
+        """
+        min_detection_confidence = self.min_detection_confidence if min_detection_confidence is None else min_detection_confidence
+        model_selection = self.model_selection if model_selection is None else model_selection
+        backend = self.backend_name if backend is None else backend
+        
+        if self.backend is not None and DETECTOR_POOL.key(backend, model_selection, min_detection_confidence) != self._pool_key:
+            new_backend, new_key = DETECTOR_POOL.acquire(backend, model_selection, min_detection_confidence)
+            DETECTOR_POOL.release(self.backend)
+            self.backend, self._pool_key = new_backend, new_key
+        
+        self.min_detection_confidence = min_detection_confidence
+        self.model_selection = model_selection
+        self.backend_name = backend
+        self.reset()
+
+    def reset(self):
+        """Oublie les visages de l'image précédente: la prochaine image sera analysée en entier."""
+        self.previous_faces = Detections.empty()
+        self.frames_since_full_scan = 0
+
+    def detect_faces(self, image: np.ndarray) -> Tuple[np.ndarray, Detections]:
         """
         Détecte les visages dans une image.
         
+        En mode suivi (roi_tracking), seules des zones élargies autour des visages de
+        l'image précédente sont analysées; l'image entière l'est toutes les
+        full_scan_interval images ou dès qu'un visage est perdu.
+        
         Args:
             image: Image au format numpy array (BGR)
             
         Returns:
             Tuple contenant:
                 - L'image annotée avec les détections (si draw est True)
-                - Liste des visages détectés avec leurs coordonnées et scores
+                - Lot des visages détectés avec leurs coordonnées et scores
         """
         try:
             # Vérifier que l'image est valide
             if image is None or image.size == 0:
                 print("Image vide reçue dans detect_faces")
-                return image, []
-            
-            # Convertir l'image BGR en RGB
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            image_height, image_width, _ = image.shape
-            
-            # Traiter l'image avec MediaPipe
-            results = self.face_detection.process(image_rgb)
+                return image, Detections.empty()
             
-            # Préparer les données à retourner
-            faces_data = []
+            if not self.roi_tracking:
+                return image, self._detect_region(image)
             
-            # Traiter les résultats
-            if results.detections:
-                for detection in results.detections:
-                    try:
-                        # Obtenir le rectangle englobant (bounding box)
-                        bboxC = detection.location_data.relative_bounding_box
-                        
-                        # Calculer les coordonnées absolues
-                        xmin = max(0, int(bboxC.xmin * image_width))
-                        ymin = max(0, int(bboxC.ymin * image_height))
-                        width = min(int(bboxC.width * image_width), image_width - xmin)
-                        height = min(int(bboxC.height * image_height), image_height - ymin)
-                        
-                        # Vérifier que les dimensions sont valides
-                        if width <= 0 or height <= 0:
-                            print(f"Dimensions invalides détectées : {width}x{height}")
-                            continue
-                        
-                        bbox = {
-                            'xmin': xmin,
-                            'ymin': ymin,
-                            'width': width,
-                            'height': height,
-                            'score': float(detection.score[0])
-                        }
-                        
-                        # Calculer les coordonnées maximales pour faciliter l'utilisation
-                        bbox['xmax'] = bbox['xmin'] + bbox['width']
-                        bbox['ymax'] = bbox['ymin'] + bbox['height']
-                        
-                        # Extraire les points clés du visage (yeux, nez, bouche)
-                        keypoints = {}
-                        
-                        # Vérifier si les points clés sont disponibles
-                        if detection.location_data.relative_keypoints:
-                            for idx, kp in enumerate(detection.location_data.relative_keypoints):
-                                # Convertir les coordonnées relatives en coordonnées absolues
-                                keypoints[idx] = {
-                                    'x': int(kp.x * image_width),
-                                    'y': int(kp.y * image_height)
-                                }
-                        
-                        # Ajouter les données du visage à la liste
-                        faces_data.append({
-                            'bbox': bbox,
-                            'keypoints': keypoints,
-                            'score': float(detection.score[0])
-                        })
-                    
-                    except Exception as e:
-                        print(f"Erreur lors du traitement d'une détection : {e}")
-                        continue
+            faces_data = None
+            if len(self.previous_faces) and self.frames_since_full_scan < self.full_scan_interval - 1:
+                faces_data = self._detect_around_previous_faces(image)
+                
+            if faces_data is None:
+                # Analyse complète: image clé ou visage perdu
+                faces_data = self._detect_region(image)
+                self.frames_since_full_scan = 0
+                self.full_scans += 1
+            else:
+                self.frames_since_full_scan += 1
+                self.roi_scans += 1
             
+            self.previous_faces = faces_data
             return image, faces_data
         
         except Exception as e:
             print(f"Erreur globale dans detect_faces : {e}")
-            return image, []
+            return image, Detections.empty()
     
-    def draw_detections(self, image: np.ndarray, faces_data: List[Dict[str, Any]]) -> np.ndarray:
+    def _detect_around_previous_faces(self, image: np.ndarray) -> Optional[Detections]:
+        """
+        Recherche les visages dans des zones élargies autour de ceux de l'image précédente.
+        
+        Args:
+            image: Image complète (BGR)
+            
+        Returns:
+            Visages en coordonnées de l'image complète, ou None si un visage a été perdu
+        """
+        image_height, image_width = image.shape[:2]
+        
+        # Zones de recherche, fusionnées lorsqu'elles se chevauchent
+        regions = []
+        for xmin, ymin, xmax, ymax in self.previous_faces.boxes.tolist():
+            pad_x = int((xmax - xmin) * self.roi_padding)
+            pad_y = int((ymax - ymin) * self.roi_padding)
+            region = [
+                max(0, xmin - pad_x),
+                max(0, ymin - pad_y),
+                min(image_width, xmax + pad_x),
+                min(image_height, ymax + pad_y)
+            ]
+            # Absorber les zones chevauchées jusqu'à ce que plus aucune ne chevauche la zone
+            # agrandie: les zones restent disjointes et aucun visage n'est détecté deux fois
+            merged = True
+            while merged:
+                merged = False
+                for other in regions:
+                    if (region[0] < other[2] and other[0] < region[2]
+                            and region[1] < other[3] and other[1] < region[3]):
+                        region = [min(region[0], other[0]), min(region[1], other[1]),
+                                  max(region[2], other[2]), max(region[3], other[3])]
+                        regions.remove(other)
+                        merged = True
+                        break
+            regions.append(region)
+        
+        batches = []
+        for x1, y1, x2, y2 in regions:
+            if x2 - x1 < 2 or y2 - y1 < 2:
+                return None
+            batches.append(self._detect_region(image[y1:y2, x1:x2], offset=(x1, y1)))
+        faces_data = Detections.concatenate(batches)
+        
+        # Moins de visages qu'avant: un visage est sorti de sa zone, tout réanalyser
+        if len(faces_data) < len(self.previous_faces):
+            return None
+        return faces_data
+    
+    def _detect_region(self, image: np.ndarray, offset: Tuple[int, int] = (0, 0)) -> Detections:
+        """
+        Exécute le moteur de détection sur une image (ou une zone d'image).
+        
+        Args:
+            image: Image ou zone d'image (BGR)
+            offset: Position (x, y) de la zone dans l'image complète
+            
+        Returns:
+            Lot des visages en coordonnées de l'image complète
+        """
+        image_height, image_width = image.shape[:2]
+        offset_x, offset_y = offset
+        
+        # Réduire l'image une seule fois avant la détection.
+        # Les moteurs renvoient des coordonnées relatives: elles sont ensuite
+        # rapportées directement aux dimensions de l'image source.
+        scale = self.get_detection_scale(image_width, image_height)
+        if scale < 1.0:
+            detection_width, detection_height = max(1, round(image_width * scale)), max(1, round(image_height * scale))
+            # Les zones du mode suivi changent de taille à chaque image: seule l'image
+            # entière est réduite dans le tampon réutilisé
+            dst = self._detection_buffers.next((detection_height, detection_width) + image.shape[2:], image.dtype) \
+                if offset == (0, 0) else None
+            detection_image = cv2.resize(
+                image,
+                (detection_width, detection_height),
+                dst=dst,
+                interpolation=cv2.INTER_AREA
+            )
+        else:
+            detection_image = image
+        
+        # Moteur rendu au pool (session arrêtée puis relancée): en emprunter un autre
+        if self.backend is None:
+            self._acquire_backend()
+        
+        # Le graphe partagé détecte à partir du seuil plancher du pool
+        raw_detections = [
+            detection for detection in self.backend.detect(detection_image)
+            if detection[4] >= self.min_detection_confidence
+        ]
+        if not raw_detections:
+            return Detections.empty()
+        
+        # Coordonnées relatives -> pixels de l'image source, pour tous les visages à la fois
+        # (troncature vers zéro, comme int())
+        relative = np.array([detection[:5] for detection in raw_detections], dtype=np.float64)
+        xmin = np.maximum(0, (relative[:, 0] * image_width).astype(np.int64))
+        ymin = np.maximum(0, (relative[:, 1] * image_height).astype(np.int64))
+        width = np.minimum((relative[:, 2] * image_width).astype(np.int64), image_width - xmin)
+        height = np.minimum((relative[:, 3] * image_height).astype(np.int64), image_height - ymin)
+        
+        # Écarter les dimensions invalides
+        valid = (width > 0) & (height > 0)
+        if not valid.all():
+            print(f"Dimensions invalides détectées : {np.count_nonzero(~valid)} visage(s)")
+        
+        # Points clés du visage (yeux, nez, bouche), fournis par MediaPipe uniquement
+        keypoints = np.full((len(raw_detections), MAX_KEYPOINTS, 2), -1, dtype=np.int64)
+        for face_idx, detection in enumerate(raw_detections):
+            rel_keypoints = detection[5][:MAX_KEYPOINTS]
+            if rel_keypoints:
+                points = np.array(rel_keypoints, dtype=np.float64) * (image_width, image_height)
+                keypoints[face_idx, :len(rel_keypoints)] = points.astype(np.int64) + offset
+        
+        xmin += offset_x
+        ymin += offset_y
+        return Detections(
+            np.stack([xmin, ymin, xmin + width, ymin + height], axis=1)[valid],
+            relative[valid, 4],
+            keypoints[valid]
+        )
+    
+    def get_detection_scale(self, image_width: int, image_height: int) -> float:
+        """
+        Calcule le facteur de réduction de l'image analysée par le détecteur.
+        
+        Args:
+            image_width: Largeur de l'image source
+            image_height: Hauteur de l'image source
+            
+        Returns:
+            Facteur entre 0 et 1 (1.0 = pleine résolution)
+        """
+        scale = self.detection_scale if self.detection_scale and self.detection_scale > 0 else 1.0
+        
+        if self.detection_size:
+            long_side = max(image_width, image_height)
+            if long_side > 0:
+                scale = min(scale, self.detection_size / long_side)
+        
+        return min(1.0, scale)
+    
+    def draw_detections(self, image: np.ndarray, faces_data: Detections,
+                        in_place: bool = False) -> np.ndarray:
         """
         Dessine les détections de visages sur l'image.
         
         Args:
             image: Image au format numpy array
-            faces_data: Liste des visages détectés (retournée par detect_faces)
+            faces_data: Lot des visages détectés (retourné par detect_faces)
+            in_place: Si True, dessine directement sur image au lieu d'une copie
             
         Returns:
             Image avec les annotations dessinées
         """
-        annotated_image = image.copy()
+        annotated_image = image if in_place else image.copy()
         
-        for face in faces_data:
-            bbox = face['bbox']
-            score = face['score']
-            
+        for (xmin, ymin, xmax, ymax), score, points in zip(
+                faces_data.boxes.tolist(), faces_data.scores.tolist(), faces_data.keypoints.tolist()):
             # Dessiner le rectangle englobant
             cv2.rectangle(
                 annotated_image,
-                (bbox['xmin'], bbox['ymin']),
-                (bbox['xmax'], bbox['ymax']),
+                (xmin, ymin),
+                (xmax, ymax),
                 (0, 255, 0),  # Couleur verte
                 2              # Épaisseur
             )
@@ -149,18 +314,20 @@ class FaceDetector:
             cv2.putText(
                 annotated_image,
                 f"Score: {score:.2f}",
-                (bbox['xmin'], bbox['ymin'] - 10),
+                (xmin, ymin - 10),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 0.5,
                 (0, 255, 0),
                 1
             )
             
-            # Dessiner les points clés
-            for _, point in face['keypoints'].items():
+            # Dessiner les points clés (-1 = point absent)
+            for x, y in points:
+                if x < 0 or y < 0:
+                    continue
                 cv2.circle(
                     annotated_image,
-                    (point['x'], point['y']),
+                    (x, y),
                     2,
                     (255, 0, 0),  # Couleur bleue
                     2              # Épaisseur
@@ -169,5 +336,7 @@ class FaceDetector:
         return annotated_image
 
     def release(self):
-        """Libère les ressources utilisées par le détecteur."""
-        self.face_detection.close()
\ No newline at end of file
+        """Rend le moteur de détection au pool partagé."""
+        if self.backend is not None:
+            DETECTOR_POOL.release(self.backend)
+            self.backend = None
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Module pour le suivi des visages entre deux détections complètes.
+"""
+
+import cv2
+import numpy as np
+from typing import Tuple, Optional
+
+from core.detections import Detections
+
+class FaceTracker:
+    """
+    Classe qui n'exécute le détecteur que sur les images clés (toutes les N images)
+    et propage les rectangles englobants entre deux détections par flux optique.
+
+    Expose la même méthode detect_faces que FaceDetector et peut donc le remplacer
+    directement dans VideoProcessor et VideoSession.
+    """
+
+    def __init__(self, face_detector, detection_interval: int = 5,
+                 min_tracking_confidence: float = 0.5, max_points_per_face: int = 30):
+        """
+        Initialise le suivi des visages.
+
+        Args:
+            face_detector: Instance de FaceDetector utilisée sur les images clés
+            detection_interval: Nombre d'images entre deux détections complètes
+            min_tracking_confidence: Proportion minimale de points suivis avec succès
+                                     en dessous de laquelle une détection est relancée
+            max_points_per_face: Nombre maximal de points suivis par visage
+        """
+        self.face_detector = face_detector
+        self.detection_interval = max(1, detection_interval)
+        self.min_tracking_confidence = min_tracking_confidence
+        self.max_points_per_face = max_points_per_face
+
+        # Statistiques d'utilisation du détecteur
+        self.detector_calls = 0
+        self.tracked_frames = 0
+
+        self.reset()
+
+    def reset(self):
+        """Oublie l'état du suivi: la prochaine image déclenchera une détection."""
+        self.previous_gray = None
+        self.faces_data = Detections.empty()
+        self.frames_since_detection = 0
+        if hasattr(self.face_detector, 'reset'):
+            self.face_detector.reset()
+
+    def detect_faces(self, image: np.ndarray) -> Tuple[np.ndarray, Detections]:
+        """
+        Détecte ou suit les visages dans une image.
+
+        Args:
+            image: Image au format numpy array (BGR)
+
+        Returns:
+            Tuple contenant l'image et le lot des visages (même format que FaceDetector)
+        """
+        if image is None or image.size == 0:
+            return image, Detections.empty()
+
+        # Sans intervalle, se comporter exactement comme le détecteur
+        if self.detection_interval <= 1:
+            self.detector_calls += 1
+            return self.face_detector.detect_faces(image)
+
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        faces_data = None
+
+        # Suivre les visages tant que l'image clé suivante n'est pas atteinte
+        if (self.previous_gray is not None
+                and self.previous_gray.shape == gray.shape
+                and self.frames_since_detection < self.detection_interval - 1):
+            faces_data = self._track(self.previous_gray, gray, self.faces_data)
+
+        if faces_data is None:
+            # Image clé ou suivi peu fiable: détection complète
+            _, faces_data = self.face_detector.detect_faces(image)
+            self.detector_calls += 1
+            self.frames_since_detection = 0
+        else:
+            self.tracked_frames += 1
+            self.frames_since_detection += 1
+
+        self.previous_gray = gray
+        self.faces_data = faces_data
+        return image, faces_data
+
+    def _track(self, previous_gray: np.ndarray, gray: np.ndarray,
+               faces_data: Detections) -> Optional[Detections]:
+        """
+        Propage les visages de l'image précédente vers l'image courante.
+
+        Args:
+            previous_gray: Image précédente en niveaux de gris
+            gray: Image courante en niveaux de gris
+            faces_data: Visages de l'image précédente
+
+        Returns:
+            Lot des visages déplacés, ou None si le suivi n'est pas assez fiable
+        """
+        if not len(faces_data):
+            return faces_data
+
+        image_height, image_width = gray.shape[:2]
+
+        # Sélectionner des points caractéristiques dans chaque visage
+        all_points = []
+        point_ranges = []
+        for xmin, ymin, xmax, ymax in faces_data.boxes.tolist():
+            roi = previous_gray[ymin:ymax, xmin:xmax]
+            if roi.size == 0:
+                return None
+
+            points = cv2.goodFeaturesToTrack(
+                roi, maxCorners=self.max_points_per_face, qualityLevel=0.01, minDistance=3
+            )
+            if points is None or len(points) < 3:
+                return None
+
+            points = points.reshape(-1, 2) + (xmin, ymin)
+            point_ranges.append((len(all_points), len(all_points) + len(points)))
+            all_points.extend(points)
+
+        previous_points = np.float32(all_points).reshape(-1, 1, 2)
+
+        # Flux optique aller puis retour pour écarter les points mal suivis
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(
+            previous_gray, gray, previous_points, None, winSize=(15, 15), maxLevel=2
+        )
+        back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(
+            gray, previous_gray, next_points, None, winSize=(15, 15), maxLevel=2
+        )
+        forward_backward_error = np.linalg.norm(
+            (previous_points - back_points).reshape(-1, 2), axis=1
+        )
+        valid = (status.ravel() == 1) & (back_status.ravel() == 1) & (forward_backward_error < 1.0)
+
+        previous_points = previous_points.reshape(-1, 2)
+        next_points = next_points.reshape(-1, 2)
+
+        # Déplacement (dx, dy) et changement d'échelle de chaque visage
+        moves = np.empty((len(faces_data), 3), dtype=np.float64)
+        for face_idx, (start, end) in enumerate(point_ranges):
+            face_valid = valid[start:end]
+
+            # Confiance: proportion de points suivis de façon cohérente
+            if face_valid.mean() < self.min_tracking_confidence:
+                return None
+
+            old = previous_points[start:end][face_valid]
+            new = next_points[start:end][face_valid]
+
+            # Déplacement et changement d'échelle médians
+            dx, dy = np.median(new - old, axis=0)
+            old_spread = np.linalg.norm(old - np.median(old, axis=0), axis=1)
+            new_spread = np.linalg.norm(new - np.median(new, axis=0), axis=1)
+            spread_mask = old_spread > 1e-3
+            scale = float(np.median(new_spread[spread_mask] / old_spread[spread_mask])) if spread_mask.any() else 1.0
+            moves[face_idx] = (dx, dy, min(1.25, max(0.8, scale)))
+
+        return self._move_faces(faces_data, moves, image_width, image_height)
+
+    @staticmethod
+    def _move_faces(faces_data: Detections, moves: np.ndarray,
+                    image_width: int, image_height: int) -> Optional[Detections]:
+        """
+        Translate et met à l'échelle chaque visage autour de son centre.
+
+        Args:
+            faces_data: Visages de l'image précédente
+            moves: Tableau N×3 (dx, dy, échelle)
+            image_width: Largeur de l'image
+            image_height: Hauteur de l'image
+
+        Returns:
+            Lot des visages déplacés, ou None si un visage est sorti de l'image
+        """
+        boxes = faces_data.boxes.astype(np.float64)
+        shift, scale = moves[:, :2], moves[:, 2:]
+        center = (boxes[:, :2] + boxes[:, 2:]) / 2
+        new_center = center + shift
+        half_size = (boxes[:, 2:] - boxes[:, :2]) * scale / 2
+
+        new_boxes = np.rint(np.concatenate([new_center - half_size, new_center + half_size], axis=1))
+        new_boxes[:, 0::2] = np.clip(new_boxes[:, 0::2], 0, image_width)
+        new_boxes[:, 1::2] = np.clip(new_boxes[:, 1::2], 0, image_height)
+
+        # Un visage est sorti de l'image
+        if ((new_boxes[:, 2] <= new_boxes[:, 0]) | (new_boxes[:, 3] <= new_boxes[:, 1])).any():
+            return None
+
+        # Les points absents (-1) le restent
+        keypoints = faces_data.keypoints
+        present = (keypoints >= 0).all(axis=2, keepdims=True)
+        new_keypoints = np.rint(new_center[:, None] + (keypoints - center[:, None]) * scale[:, None])
+        new_keypoints = np.where(present, new_keypoints, -1)
+
+        return Detections(new_boxes, faces_data.scores, new_keypoints, faces_data.track_ids)
@@ -0,0 +1,94 @@
+"""
+Module pour réutiliser les détections sur les images quasi identiques.
+"""
+
+import cv2
+import numpy as np
+from typing import Tuple
+
+from core.detections import Detections
+
+class StaticFrameGate:
+    """
+    Classe qui compare chaque image à la dernière image réellement analysée
+    (luminance sous-échantillonnée) et réutilise ses détections tant que
+    l'écart reste sous un seuil. Une coupure de scène force une nouvelle détection.
+
+    Expose la même méthode detect_faces que FaceDetector et FaceTracker.
+    """
+
+    def __init__(self, detector, threshold: float = 0.0, scene_cut_threshold: float = 0.5,
+                 grid_size: Tuple[int, int] = (32, 18)):
+        """
+        Initialise le filtre d'images statiques.
+
+        Args:
+            detector: Objet fournissant detect_faces (FaceDetector ou FaceTracker)
+            threshold: Écart maximal de luminance (0-255) entre deux cellules de la grille
+                       en dessous duquel les détections sont réutilisées (0 = désactivé)
+            scene_cut_threshold: Distance d'histogramme (Bhattacharyya, 0-1) au-delà de
+                                 laquelle l'image est considérée comme une coupure de scène
+            grid_size: (largeur, hauteur) de l'image sous-échantillonnée comparée
+        """
+        self.detector = detector
+        self.threshold = threshold
+        self.scene_cut_threshold = scene_cut_threshold
+        self.grid_size = grid_size
+
+        # Statistiques d'utilisation
+        self.reused_frames = 0
+        self.fresh_detections = 0
+        self.scene_cuts = 0
+
+        self.reset()
+
+    def reset(self):
+        """Oublie l'image de référence: la prochaine image sera analysée."""
+        self.reference = None
+        self.reference_histogram = None
+        self.faces_data = Detections.empty()
+        if hasattr(self.detector, 'reset'):
+            self.detector.reset()
+
+    def detect_faces(self, image: np.ndarray) -> Tuple[np.ndarray, Detections]:
+        """
+        Détecte les visages, ou réutilise les détections précédentes si l'image n'a pas changé.
+
+        Args:
+            image: Image au format numpy array (BGR)
+
+        Returns:
+            Tuple contenant l'image et le lot des visages
+        """
+        if self.threshold <= 0 or image is None or image.size == 0:
+            self.fresh_detections += 1
+            return self.detector.detect_faces(image)
+
+        # Réduire avant la conversion pour ne pas convertir l'image entière
+        small = cv2.cvtColor(
+            cv2.resize(image, self.grid_size, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY
+        )
+        histogram = cv2.calcHist([small], [0], None, [32], [0, 256])
+
+        if self.reference is not None:
+            # Écart maximal par cellule: un petit visage qui bouge suffit à déclencher la détection
+            difference = float(cv2.absdiff(small, self.reference).max())
+            if difference < self.threshold:
+                self.reused_frames += 1
+                return image, self.faces_data
+
+            distance = cv2.compareHist(self.reference_histogram, histogram, cv2.HISTCMP_BHATTACHARYYA)
+            if distance > self.scene_cut_threshold:
+                # Coupure de scène: le suivi éventuel n'a plus de sens
+                self.scene_cuts += 1
+                if hasattr(self.detector, 'reset'):
+                    self.detector.reset()
+
+        _, faces_data = self.detector.detect_faces(image)
+        self.fresh_detections += 1
+
+        self.reference = small
+        self.reference_histogram = histogram
+        self.faces_data = faces_data
+        return image, faces_data
@@ -11,6 +11,7 @@ from flask_cors import CORS
 
 import config
 from api.routes import configure_routes
+from core.detector_pool import DETECTOR_POOL
 
 # Configuration du logging
 logging.basicConfig(
@@ -55,6 +56,14 @@ def create_app():
     # Configurer les routes
     configure_routes(app, api)
     
+    # Préparer les détecteurs des premières sessions en arrière-plan
+    # (import de MediaPipe et initialisation des graphes); /status/ready l'attend
+    DETECTOR_POOL.start_warmup(
+        config.FACE_DETECTION_MODEL,
+        min_detection_confidence=config.FACE_DETECTION_CONFIDENCE,
+        count=config.DETECTOR_POOL_WARM_SIZE
+    )
+    
     # Route pour la page d'accueil (frontend)
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
@@ -0,0 +1,6 @@
+"""Configuration commune des tests: le dossier backend est la racine des imports."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,186 @@
+"""
+Tests du registre des caméras, sur des nœuds de périphériques factices
+(/dev/videoN et /sys/class/video4linux) et une fonction de sondage simulée.
+"""
+
+import threading
+import time
+
+import pytest
+
+from utils.camera_registry import CameraRegistry
+
+
+class FakeCapture:
+    """Capture OpenCV déjà ouverte par une session."""
+
+    def __init__(self, width=1280, height=720, fps=25.0):
+        self.values = {3: width, 4: height, 5: fps}  # CAP_PROP_FRAME_WIDTH, _HEIGHT, _FPS
+
+    def isOpened(self):
+        return True
+
+    def get(self, prop):
+        return self.values[prop]
+
+
+class FakeProbe:
+    """Sondage simulé: enregistre les ouvertures et peut bloquer sur certains indices."""
+
+    def __init__(self, blocked=()):
+        self.calls = []
+        self.blocked = set(blocked)
+        self.started = threading.Event()
+        self.unblock = threading.Event()
+
+    def __call__(self, device_id):
+        self.calls.append(device_id)
+        if device_id in self.blocked:
+            self.started.set()
+            self.unblock.wait(10)
+        return {"device_id": device_id, "name": f"Caméra {device_id}", "width": 640, "height": 480, "fps": 30.0}
+
+
+@pytest.fixture
+def devices(tmp_path):
+    """Dossiers /dev et sysfs factices avec video0 et video2 (nommée)."""
+    dev = tmp_path / "dev"
+    sysfs = tmp_path / "video4linux"
+    dev.mkdir()
+    sysfs.mkdir()
+    for name in ("video0", "video2", "video", "videoX", "sda", "null"):
+        (dev / name).touch()
+    (sysfs / "video2").mkdir()
+    (sysfs / "video2" / "name").write_text("USB Camera\n")
+    return str(dev), str(sysfs)
+
+
+def make_registry(devices, probe, **kwargs):
+    dev, sysfs = devices
+    return CameraRegistry(device_dir=dev, sysfs_dir=sysfs, probe=probe, **kwargs)
+
+
+def test_enumerates_device_nodes(devices):
+    probe = FakeProbe()
+    registry = make_registry(devices, probe)
+
+    assert registry.list_devices() == [0, 2]
+    cameras = registry.refresh()
+
+    assert sorted(probe.calls) == [0, 2]
+    assert [camera["device_id"] for camera in cameras] == [0, 2]
+    assert cameras[0]["name"] == "Caméra 0"
+    assert cameras[1]["name"] == "USB Camera"
+
+
+def test_probes_first_indices_without_device_nodes(tmp_path):
+    registry = CameraRegistry(
+        device_dir=str(tmp_path / "missing"), sysfs_dir=str(tmp_path / "missing-sysfs"),
+        max_index=3, probe=FakeProbe()
+    )
+    assert registry.list_devices() == [0, 1, 2]
+
+
+def test_blocked_probe_times_out(devices):
+    probe = FakeProbe(blocked={2})
+    registry = make_registry(devices, probe, probe_timeout=0.3)
+    try:
+        start = time.monotonic()
+        cameras = registry.refresh()
+        assert time.monotonic() - start < 2.0
+        assert [camera["device_id"] for camera in cameras] == [0]
+
+        # Le sondage toujours bloqué n'est pas relancé
+        registry.refresh()
+        assert probe.calls.count(2) == 1
+    finally:
+        probe.unblock.set()
+
+
+def test_owned_device_is_never_reopened(devices):
+    probe = FakeProbe()
+    registry = make_registry(devices, probe)
+    registry.set_owned_devices_provider(lambda: {2: FakeCapture()})
+
+    cameras = {camera["device_id"]: camera for camera in registry.refresh()}
+
+    assert probe.calls == [0]
+    assert cameras[2]["width"] == 1280
+    assert cameras[2]["fps"] == 25.0
+    assert cameras[2]["name"] == "USB Camera"
+
+
+def test_active_session_device_is_never_reopened(devices, monkeypatch):
+    from types import SimpleNamespace
+    from api.routes import ACTIVE_SESSIONS, owned_webcams
+
+    session = SimpleNamespace(source_type="webcam", device_id=0, cap=FakeCapture(), is_running=True)
+    monkeypatch.setitem(ACTIVE_SESSIONS, "session-test", session)
+    probe = FakeProbe()
+    registry = make_registry(devices, probe)
+    registry.set_owned_devices_provider(owned_webcams)
+
+    cameras = {camera["device_id"]: camera for camera in registry.refresh()}
+
+    assert 0 not in probe.calls
+    assert cameras[0]["width"] == 1280
+
+
+def test_reserve_waits_for_running_probe(devices):
+    probe = FakeProbe(blocked={0})
+    registry = make_registry(devices, probe, probe_timeout=5.0)
+    owned = {}
+    registry.set_owned_devices_provider(lambda: dict(owned))
+    refreshed = []
+    refresh_thread = threading.Thread(target=lambda: refreshed.append(registry.refresh()))
+    refresh_thread.start()
+    assert probe.started.wait(2)
+
+    # Une session qui ouvre la caméra pendant le sondage attend qu'il se termine
+    reserved = []
+    def open_session():
+        reserved.append(registry.reserve(0))
+        owned[0] = FakeCapture()
+
+    reserve_thread = threading.Thread(target=open_session)
+    reserve_thread.start()
+    time.sleep(0.2)
+    assert not reserved
+
+    probe.unblock.set()
+    reserve_thread.join(2)
+    refresh_thread.join(2)
+    assert reserved == [True]
+
+    assert 0 in {camera["device_id"] for camera in refreshed[0]}
+
+    # Tant qu'elle est réservée, la caméra n'est plus sondée et est décrite par sa capture
+    cameras = {camera["device_id"]: camera for camera in registry.refresh()}
+    assert probe.calls.count(0) == 1
+    assert cameras[0]["width"] == 1280
+
+    owned.clear()
+    registry.release(0)
+    registry.refresh()
+    assert probe.calls.count(0) == 2
+
+
+def test_reserve_refuses_device_held_by_another_session(devices):
+    registry = make_registry(devices, FakeProbe())
+
+    assert registry.reserve(0) is True
+    assert registry.reserve(0) is False
+
+    registry.release(0)
+    assert registry.reserve(0) is True
+
+
+def test_reserve_times_out_on_stuck_probe(devices):
+    probe = FakeProbe(blocked={0})
+    registry = make_registry(devices, probe, probe_timeout=0.2)
+    try:
+        registry.refresh()
+        assert registry.reserve(0, timeout=0.1) is False
+    finally:
+        probe.unblock.set()
+        registry.release(0)
@@ -0,0 +1,63 @@
+"""
+Tests de l'oubli des jobs terminés et de la suppression de leurs sorties.
+"""
+
+import os
+import time
+
+import config
+from api.jobs import JobManager, ProcessingJob, remove_job_output
+
+
+def make_job(output_path, status="completed", age=0.0, **kwargs):
+    job = ProcessingJob(output_path, {}, {}, **kwargs)
+    job.status["status"] = status
+    job.created_at = time.time() - age
+    return job
+
+
+def test_pruned_jobs_return_their_outputs(tmp_path):
+    manager = JobManager(max_workers=1)
+    expired = config.JOB_RETENTION_SECONDS + 60
+
+    video = tmp_path / "job.mp4"
+    video.write_bytes(b"video")
+    index = tmp_path / "index"
+    index.mkdir()
+    (index / "tracks.json").write_text("{}")
+
+    old_render = make_job(str(video), age=expired)
+    old_analysis = make_job(str(index), age=expired, action="analyze")
+    recent = make_job(str(tmp_path / "recent.mp4"))
+    running = make_job(str(tmp_path / "running.mp4"), status="processing", age=expired)
+    for job in (old_render, old_analysis, recent, running):
+        manager._jobs[job.job_id] = job
+
+    outputs = manager._prune_finished_jobs()
+
+    assert sorted(outputs) == sorted([str(video), str(index)])
+    assert set(manager._jobs) == {recent.job_id, running.job_id}
+
+    for output_path in outputs:
+        remove_job_output(output_path)
+    assert not video.exists()
+    assert not index.exists()
+
+
+def test_index_still_used_by_a_retained_job_is_kept(tmp_path):
+    manager = JobManager(max_workers=1)
+    index = str(tmp_path / "index")
+
+    old_analysis = make_job(index, age=config.JOB_RETENTION_SECONDS + 60, action="analyze")
+    render = make_job(str(tmp_path / "render.mp4"), status="processing",
+                      processor_options={"face_index_path": index})
+    for job in (old_analysis, render):
+        manager._jobs[job.job_id] = job
+
+    assert manager._prune_finished_jobs() == []
+    assert set(manager._jobs) == {render.job_id}
+
+
+def test_remove_job_output_ignores_missing_paths(tmp_path):
+    remove_job_output(str(tmp_path / "missing.mp4"))
+    assert not os.path.exists(tmp_path / "missing.mp4")
@@ -0,0 +1,305 @@
+"""
+Registre des caméras disponibles, tenu à jour en arrière-plan pour que la liste
+des webcams soit servie sans ouvrir de périphérique pendant la requête.
+"""
+
+import os
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import cv2
+from typing import Dict, List, Any, Optional, Callable
+
+import config
+
+# Nœuds de périphériques vidéo Linux (/dev/video0, /dev/video1...)
+_DEVICE_NODE_PATTERN = re.compile(r"^video(\d+)$")
+
+
+def probe_camera(device_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Ouvre une caméra pour lire ses caractéristiques.
+
+    Args:
+        device_id: Indice OpenCV de la caméra
+
+    Returns:
+        Informations de la caméra, ou None si elle ne peut pas être ouverte
+    """
+    cap = cv2.VideoCapture(device_id)
+    try:
+        if not cap.isOpened():
+            return None
+        return {
+            "device_id": device_id,
+            "name": f"Caméra {device_id}",
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": cap.get(cv2.CAP_PROP_FPS)
+        }
+    finally:
+        cap.release()
+
+
+class CameraRegistry:
+    """
+    Liste des caméras, énumérées depuis les nœuds de périphériques du système et
+    sondées en parallèle avec un délai maximal. Les caméras déjà ouvertes par une
+    session ne sont jamais rouvertes: leurs informations sont lues sur la capture existante.
+    Une session réserve sa caméra (reserve) avant de l'ouvrir, pour qu'aucun sondage
+    ne l'ouvre en même temps qu'elle.
+    """
+
+    def __init__(self,
+                 device_dir: str = "/dev",
+                 sysfs_dir: str = "/sys/class/video4linux",
+                 max_index: int = 10,
+                 probe_timeout: float = 2.0,
+                 refresh_interval: float = 30.0,
+                 probe: Callable[[int], Optional[Dict[str, Any]]] = probe_camera):
+        """
+        Args:
+            device_dir: Dossier des nœuds de périphériques (videoN)
+            sysfs_dir: Dossier video4linux où lire le nom des périphériques
+            max_index: Nombre d'indices sondés lorsque le système n'expose pas de nœuds
+            probe_timeout: Délai maximal d'un cycle de sondage en secondes
+            refresh_interval: Intervalle entre deux rafraîchissements en arrière-plan
+            probe: Fonction qui ouvre une caméra et retourne ses informations
+        """
+        self.device_dir = device_dir
+        self.sysfs_dir = sysfs_dir
+        self.max_index = max_index
+        self.probe_timeout = probe_timeout
+        self.refresh_interval = refresh_interval
+        self.probe = probe
+
+        self._owned_devices: Callable[[], Dict[int, Any]] = dict
+        self._cameras: List[Dict[str, Any]] = []
+        self._updated_at: Optional[float] = None
+        self._probing: set = set()  # Sondages en cours (éventuellement bloqués)
+        self._reserved: set = set()  # Caméras réservées par une session (une seule à la fois)
+        self._lock = threading.Lock()
+        self._probe_done = threading.Condition(self._lock)
+        self._refresh_lock = threading.Lock()
+        self._refreshed = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_owned_devices_provider(self, provider: Callable[[], Dict[int, Any]]):
+        """
+        Définit la fonction qui retourne les caméras ouvertes par les sessions.
+
+        Args:
+            provider: Fonction retournant {indice: capture OpenCV ouverte}
+        """
+        self._owned_devices = provider
+
+    def reserve(self, device_id: int, timeout: Optional[float] = None) -> bool:
+        """
+        Réserve une caméra avant son ouverture par une session: elle n'est plus sondée,
+        et un sondage déjà en cours est attendu (à libérer avec release).
+
+        Args:
+            device_id: Indice de la caméra
+            timeout: Délai d'attente du sondage en cours (None = délai de sondage du registre)
+
+        Returns:
+            False (sans réservation) si la caméra est déjà réservée par une autre session
+            ou si un sondage bloqué la tient encore à l'expiration du délai
+        """
+        with self._probe_done:
+            if device_id in self._reserved:
+                return False
+            self._reserved.add(device_id)
+            probe_finished = self._probe_done.wait_for(
+                lambda: device_id not in self._probing,
+                self.probe_timeout if timeout is None else timeout
+            )
+            if not probe_finished:
+                self._reserved.discard(device_id)
+            return probe_finished
+
+    def release(self, device_id: int):
+        """Libère une réservation faite avec reserve."""
+        with self._lock:
+            self._reserved.discard(device_id)
+
+    def _owned(self) -> Dict[int, Any]:
+        """Caméras ouvertes ou réservées par les sessions (indice -> capture, None si réservée)."""
+        owned = dict(self._owned_devices())
+        with self._lock:
+            for device_id in self._reserved:
+                owned.setdefault(device_id, None)
+        return owned
+
+    def list_devices(self) -> List[int]:
+        """Indices des caméras d'après les nœuds de périphériques (ou 0..max_index-1 à défaut)."""
+        try:
+            device_ids = sorted(
+                int(match.group(1))
+                for match in map(_DEVICE_NODE_PATTERN.match, os.listdir(self.device_dir))
+                if match
+            )
+        except OSError:
+            device_ids = []
+
+        # Systèmes sans nœuds videoN (Windows, macOS): sonder les premiers indices
+        if not device_ids and not os.path.isdir(self.sysfs_dir):
+            device_ids = list(range(self.max_index))
+        return device_ids
+
+    def _device_name(self, device_id: int) -> Optional[str]:
+        """Nom du périphérique exposé par video4linux, s'il existe."""
+        try:
+            with open(os.path.join(self.sysfs_dir, f"video{device_id}", "name")) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _probe_device(self, device_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            with self._lock:
+                if device_id in self._reserved:
+                    # Réservée entre-temps par une session qui attend ce sondage pour l'ouvrir
+                    return None
+            return self.probe(device_id)
+        except Exception as e:
+            print(f"Erreur lors du sondage de la caméra {device_id}: {e}")
+            return None
+        finally:
+            with self._probe_done:
+                self._probing.discard(device_id)
+                self._probe_done.notify_all()
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """
+        Énumère et sonde les caméras, puis met à jour le registre.
+
+        Returns:
+            Liste des caméras disponibles
+        """
+        with self._refresh_lock:
+            owned = self._owned()
+            with self._lock:
+                previous = {camera["device_id"]: camera for camera in self._cameras}
+
+            cameras: Dict[int, Dict[str, Any]] = {}
+            to_probe = []
+            device_ids = self.list_devices()
+            for device_id in device_ids:
+                if device_id in owned:
+                    # Ne pas rouvrir une caméra utilisée par une session
+                    cameras[device_id] = self._describe_owned(device_id, owned[device_id], previous.get(device_id))
+                    continue
+                with self._lock:
+                    if device_id in self._reserved:
+                        # Réservée depuis la lecture des caméras possédées: traitée plus bas
+                        continue
+                    if device_id in self._probing:
+                        # Sondage précédent toujours bloqué: garder la dernière information connue
+                        if device_id in previous:
+                            cameras[device_id] = previous[device_id]
+                        continue
+                    self._probing.add(device_id)
+                to_probe.append(device_id)
+
+            if to_probe:
+                executor = ThreadPoolExecutor(max_workers=len(to_probe), thread_name_prefix="camera-probe")
+                futures = {executor.submit(self._probe_device, device_id): device_id for device_id in to_probe}
+                done, _ = wait(futures, timeout=self.probe_timeout)
+                # Ne pas attendre les sondages bloqués: ils se terminent en arrière-plan
+                executor.shutdown(wait=False)
+
+                for future in done:
+                    camera = future.result()
+                    if camera is not None:
+                        cameras[futures[future]] = camera
+
+            # Caméras ouvertes ou réservées par une session pendant le sondage:
+            # décrites par leur capture plutôt que par le résultat d'un sondage concurrent
+            for device_id, cap in self._owned().items():
+                if device_id in device_ids and device_id not in owned:
+                    cameras[device_id] = self._describe_owned(
+                        device_id, cap, cameras.get(device_id) or previous.get(device_id)
+                    )
+
+            # Nom lisible fourni par video4linux
+            for device_id, camera in cameras.items():
+                name = self._device_name(device_id)
+                if name:
+                    camera["name"] = name
+
+            with self._lock:
+                self._cameras = [cameras[device_id] for device_id in sorted(cameras)]
+                self._updated_at = time.time()
+                self._refreshed.set()
+                return list(self._cameras)
+
+    def _describe_owned(self, device_id: int, cap: Any, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Informations d'une caméra ouverte par une session, lues sur sa capture."""
+        camera = dict(previous) if previous else {"device_id": device_id, "name": f"Caméra {device_id}"}
+        if cap is not None and cap.isOpened():
+            camera.update({
+                "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                "fps": cap.get(cv2.CAP_PROP_FPS)
+            })
+        camera.setdefault("width", 0)
+        camera.setdefault("height", 0)
+        camera.setdefault("fps", 0.0)
+        return camera
+
+    def get_cameras(self, wait_timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Retourne la liste des caméras connue du registre.
+
+        Args:
+            wait_timeout: Délai d'attente du premier sondage s'il n'est pas terminé
+                          (None = délai de sondage du registre, plus une marge)
+
+        Returns:
+            Liste des caméras disponibles
+        """
+        if self._thread is None:
+            self.start()
+
+        if not self._refreshed.is_set():
+            # Laisser au premier sondage le temps d'expirer et de publier son résultat
+            self._refreshed.wait(self.probe_timeout + 0.5 if wait_timeout is None else wait_timeout)
+
+        with self._lock:
+            return [dict(camera) for camera in self._cameras]
+
+    def start(self):
+        """Démarre le rafraîchissement périodique en arrière-plan."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="camera-registry", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Arrête le rafraîchissement en arrière-plan."""
+        self._stop_event.set()
+        with self._lock:
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Erreur lors du rafraîchissement des caméras: {e}")
+            self._stop_event.wait(self.refresh_interval)
+
+
+# Registre partagé par les routes
+CAMERA_REGISTRY = CameraRegistry(
+    device_dir=config.CAMERA_DEVICE_DIR,
+    sysfs_dir=config.CAMERA_SYSFS_DIR,
+    max_index=config.CAMERA_MAX_INDEX,
+    probe_timeout=config.CAMERA_PROBE_TIMEOUT,
+    refresh_interval=config.CAMERA_REFRESH_INTERVAL
+)
@@ -0,0 +1,249 @@
+"""
+Cache des détections de visages par image, enregistré dans un fichier annexe (sidecar)
+pour que les rendus successifs d'une même vidéo n'exécutent plus le détecteur.
+"""
+
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Any, Tuple, Optional
+
+import config
+from core.detections import Detections
+
+# Incrémenter pour invalider les caches écrits dans un format précédent
+CACHE_FORMAT_VERSION = 1
+
+# Empreintes déjà calculées, indexées par (chemin, taille, date de modification),
+# les moins récemment utilisées étant oubliées au-delà de config.CONTENT_HASH_MEMO_SIZE
+_hash_memo: "OrderedDict[Tuple[str, int, float], str]" = OrderedDict()
+_hash_lock = threading.Lock()
+
+
+def file_content_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcule l'empreinte SHA-256 du contenu d'un fichier.
+
+    Args:
+        path: Chemin du fichier
+        chunk_size: Taille des blocs lus
+
+    Returns:
+        Empreinte hexadécimale
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+
+    with _hash_lock:
+        if memo_key in _hash_memo:
+            _hash_memo.move_to_end(memo_key)
+            return _hash_memo[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    content_hash = digest.hexdigest()
+    with _hash_lock:
+        _hash_memo[memo_key] = content_hash
+        while len(_hash_memo) > config.CONTENT_HASH_MEMO_SIZE:
+            _hash_memo.popitem(last=False)
+    return content_hash
+
+
+def detection_cache_path(input_path: str, detector_settings: Dict[str, Any]) -> str:
+    """
+    Chemin du fichier de cache pour une vidéo et des paramètres de détection.
+
+    Args:
+        input_path: Chemin de la vidéo
+        detector_settings: Paramètres qui influencent les détections
+
+    Returns:
+        Chemin du fichier .npz dans config.DETECTION_CACHE_DIR
+    """
+    key_source = json.dumps({
+        "version": CACHE_FORMAT_VERSION,
+        "content": file_content_hash(input_path),
+        "settings": detector_settings
+    }, sort_keys=True)
+    key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(config.DETECTION_CACHE_DIR, f"{key}.npz")
+
+
+def prune_detection_cache(cache_dir: str, max_bytes: int, keep: Optional[str] = None) -> int:
+    """
+    Supprime les fichiers de cache les moins récemment utilisés au-delà d'une taille totale.
+
+    La date de modification sert de date de dernière utilisation: CachedDetections.load
+    la met à jour à chaque lecture (la date d'accès n'est pas fiable, montages noatime).
+
+    Args:
+        cache_dir: Dossier du cache
+        max_bytes: Taille totale maximale (0 ou moins = illimitée)
+        keep: Fichier à conserver quoi qu'il arrive (celui qui vient d'être écrit)
+
+    Returns:
+        Nombre de fichiers supprimés
+    """
+    if max_bytes <= 0:
+        return 0
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".npz") and entry.is_file():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            # Déjà supprimé par un autre processus
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+class DetectionRecorder:
+    """Accumule les détections image par image sous forme de tableaux compacts."""
+
+    def __init__(self):
+        self.face_counts: List[int] = []
+        self.batches: List[Detections] = []
+
+    def add(self, faces_data: Detections):
+        """Ajoute les visages détectés pour l'image suivante."""
+        self.face_counts.append(len(faces_data))
+        if len(faces_data):
+            self.batches.append(faces_data)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Retourne les détections sous forme de tableaux NumPy (rectangles en xmin, ymin, largeur, hauteur)."""
+        faces = Detections.concatenate(self.batches)
+        return {
+            "face_counts": np.asarray(self.face_counts, dtype=np.int32),
+            "boxes": faces.xywh,
+            "scores": faces.scores,
+            "keypoints": faces.keypoints
+        }
+
+    @staticmethod
+    def save(path: str, parts: List[Dict[str, np.ndarray]]):
+        """
+        Écrit des détections (éventuellement produites par plusieurs segments consécutifs).
+
+        Args:
+            path: Chemin du fichier .npz
+            parts: Tableaux retournés par to_arrays, dans l'ordre des images
+        """
+        arrays = {
+            name: np.concatenate([part[name] for part in parts])
+            for name in ("face_counts", "boxes", "scores", "keypoints")
+        }
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Écriture atomique: un rendu concurrent ne lit jamais un fichier partiel
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(temp_path, path)
+
+        prune_detection_cache(os.path.dirname(path), config.DETECTION_CACHE_MAX_BYTES, keep=path)
+
+
+class CachedDetections:
+    """Détections relues depuis un fichier de cache."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        # Toutes les images du cache en un seul lot, découpé image par image sans copie
+        self.faces = Detections.from_xywh(arrays["boxes"], arrays["scores"], arrays["keypoints"])
+        self.face_counts = arrays["face_counts"]
+        self.offsets = np.concatenate([[0], np.cumsum(self.face_counts)]).astype(np.int64)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CachedDetections"]:
+        """Charge un fichier de cache, ou retourne None s'il est absent ou illisible."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                detections = cls({name: data[name] for name in data.files})
+        except Exception as e:
+            print(f"Cache de détection illisible {path}: {e}")
+            return None
+
+        try:
+            # Marquer le fichier comme récemment utilisé (éviction du moins récent)
+            os.utime(path)
+        except OSError:
+            pass
+        return detections
+
+    def __len__(self) -> int:
+        return len(self.face_counts)
+
+    def get_faces(self, frame_index: int) -> Detections:
+        """
+        Visages d'une image, au format de FaceDetector.detect_faces.
+
+        Args:
+            frame_index: Numéro de l'image (les images au-delà de la fin reprennent la dernière)
+
+        Returns:
+            Lot des visages (vues des tableaux du cache)
+        """
+        if len(self) == 0:
+            return Detections.empty()
+        frame_index = min(max(0, frame_index), len(self) - 1)
+
+        start, end = self.offsets[frame_index], self.offsets[frame_index + 1]
+        return Detections(
+            self.faces.boxes[start:end],
+            self.faces.scores[start:end],
+            self.faces.keypoints[start:end]
+        )
+
+
+class CachedDetector:
+    """Remplace le détecteur en relisant les détections du cache image par image."""
+
+    def __init__(self, detections: CachedDetections, start_frame: int = 0):
+        self.detections = detections
+        self.frame_index = start_frame
+        # Images servies par le cache (le détecteur n'a pas été exécuté)
+        self.frames_served = 0
+
+    def detect_faces(self, image: np.ndarray) -> Tuple[np.ndarray, Detections]:
+        faces_data = self.detections.get_faces(self.frame_index)
+        self.frame_index += 1
+        self.frames_served += 1
+        return image, faces_data
+
+
+class RecordingDetector:
+    """Enveloppe un détecteur et enregistre chacun de ses résultats."""
+
+    def __init__(self, detector, recorder: DetectionRecorder):
+        self.detector = detector
+        self.recorder = recorder
+
+    def detect_faces(self, image: np.ndarray) -> Tuple[np.ndarray, Detections]:
+        image, faces_data = self.detector.detect_faces(image)
+        self.recorder.add(faces_data)
+        return image, faces_data
@@ -0,0 +1,274 @@
+"""
+Index des pistes de visages d'une vidéo (passe d'analyse), stocké en colonnes
+NumPy mappables en mémoire pour être interrogé sans décoder la vidéo.
+"""
+
+import os
+import json
+import math
+import shutil
+import hashlib
+import numpy as np
+from typing import Dict, List, Any, Tuple, Optional
+
+import config
+from core.detections import Detections
+from utils.detection_cache import file_content_hash
+
+# Incrémenter pour invalider les index écrits dans un format précédent
+INDEX_FORMAT_VERSION = 1
+
+# Colonnes de l'index (un fichier .npy par colonne)
+INDEX_COLUMNS = ("frame", "track_id", "box", "score")
+
+
+def face_index_path(input_path: str, detection_settings: Dict[str, Any]) -> str:
+    """
+    Dossier de l'index pour une vidéo et des paramètres de détection.
+
+    Args:
+        input_path: Chemin de la vidéo
+        detection_settings: Paramètres qui influencent les détections
+
+    Returns:
+        Chemin du dossier dans config.FACE_INDEX_DIR
+    """
+    key_source = json.dumps({
+        "version": INDEX_FORMAT_VERSION,
+        "content": file_content_hash(input_path),
+        "settings": detection_settings
+    }, sort_keys=True)
+    key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(config.FACE_INDEX_DIR, key)
+
+
+def _iou(box: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Intersection sur union entre une boîte et un ensemble de boîtes (xmin, ymin, width, height)."""
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[0] + box[2], boxes[:, 0] + boxes[:, 2])
+    y2 = np.minimum(box[1] + box[3], boxes[:, 1] + boxes[:, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    union = box[2] * box[3] + boxes[:, 2] * boxes[:, 3] - intersection
+    return intersection / np.maximum(union, 1)
+
+
+class TrackAssigner:
+    """
+    Attribue un identifiant de piste stable aux visages d'une image à l'autre
+    par association gloutonne sur le recouvrement (IoU) des rectangles.
+    """
+
+    def __init__(self, min_iou: float = 0.3, max_missed_frames: int = 15):
+        """
+        Args:
+            min_iou: Recouvrement minimal pour prolonger une piste
+            max_missed_frames: Nombre d'images sans visage après lequel une piste est abandonnée
+        """
+        self.min_iou = min_iou
+        self.max_missed_frames = max_missed_frames
+        self.next_track_id = 0
+        self.tracks: Dict[int, Tuple[np.ndarray, int]] = {}  # id -> (boîte, dernière image)
+
+    def assign(self, frame_number: int, boxes: np.ndarray) -> List[int]:
+        """
+        Associe les boîtes d'une image aux pistes existantes.
+
+        Args:
+            frame_number: Numéro de l'image
+            boxes: Tableau N×4 (xmin, ymin, width, height)
+
+        Returns:
+            Identifiant de piste de chaque boîte
+        """
+        # Abandonner les pistes perdues depuis trop longtemps
+        self.tracks = {
+            track_id: track for track_id, track in self.tracks.items()
+            if frame_number - track[1] <= self.max_missed_frames
+        }
+
+        track_ids = list(self.tracks.keys())
+        track_boxes = np.array([self.tracks[t][0] for t in track_ids], dtype=np.float32).reshape(-1, 4)
+
+        candidates = []
+        for face_idx, box in enumerate(boxes):
+            if len(track_ids):
+                for track_idx, overlap in enumerate(_iou(box.astype(np.float32), track_boxes)):
+                    if overlap >= self.min_iou:
+                        candidates.append((overlap, face_idx, track_idx))
+
+        # Meilleurs recouvrements d'abord, chaque piste et chaque visage au plus une fois
+        assigned = [-1] * len(boxes)
+        used_tracks = set()
+        for _, face_idx, track_idx in sorted(candidates, reverse=True):
+            if assigned[face_idx] == -1 and track_idx not in used_tracks:
+                assigned[face_idx] = track_ids[track_idx]
+                used_tracks.add(track_idx)
+
+        for face_idx, box in enumerate(boxes):
+            if assigned[face_idx] == -1:
+                assigned[face_idx] = self.next_track_id
+                self.next_track_id += 1
+            self.tracks[assigned[face_idx]] = (box, frame_number)
+
+        return assigned
+
+
+class FaceIndexWriter:
+    """Construit l'index des pistes pendant la passe d'analyse."""
+
+    def __init__(self, fps: float):
+        self.fps = fps if fps and fps > 0 else config.DEFAULT_FPS
+        self.assigner = TrackAssigner()
+        self.frames: List[np.ndarray] = []
+        self.track_ids: List[np.ndarray] = []
+        self.boxes: List[np.ndarray] = []
+        self.scores: List[np.ndarray] = []
+        self.frame_count = 0
+
+    def add(self, frame_number: int, faces_data: Detections):
+        """Ajoute les visages détectés dans une image."""
+        self.frame_count = max(self.frame_count, frame_number + 1)
+        if not len(faces_data):
+            return
+
+        boxes = faces_data.xywh
+        self.frames.append(np.full(len(boxes), frame_number, dtype=np.int32))
+        self.track_ids.append(np.asarray(self.assigner.assign(frame_number, boxes), dtype=np.int32))
+        self.boxes.append(boxes)
+        self.scores.append(faces_data.scores)
+
+    def save(self, index_path: str, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Écrit l'index (une colonne .npy par champ, plus la table des décalages par seconde).
+
+        Args:
+            index_path: Dossier de destination (remplacé s'il existe)
+            metadata: Informations supplémentaires enregistrées dans meta.json
+        """
+        frames = np.concatenate(self.frames) if self.frames else np.empty(0, dtype=np.int32)
+        columns = {
+            "frame": frames,
+            "track_id": np.concatenate(self.track_ids) if self.track_ids else np.empty(0, dtype=np.int32),
+            "box": np.concatenate(self.boxes) if self.boxes else np.empty((0, 4), dtype=np.int32),
+            "score": np.concatenate(self.scores) if self.scores else np.empty(0, dtype=np.float32)
+        }
+
+        # second_offsets[s] = première ligne dont l'image est dans la seconde s ou après
+        seconds = int(math.ceil(self.frame_count / self.fps))
+        second_starts = np.ceil(np.arange(seconds + 1) * self.fps)
+        columns["second_offsets"] = np.searchsorted(frames, second_starts, side="left").astype(np.int64)
+
+        # Écrire dans un dossier temporaire puis le renommer: jamais d'index partiel
+        parent_dir = os.path.dirname(index_path)
+        os.makedirs(parent_dir, exist_ok=True)
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        shutil.rmtree(temp_path, ignore_errors=True)
+        os.makedirs(temp_path)
+
+        for name, values in columns.items():
+            np.save(os.path.join(temp_path, f"{name}.npy"), values)
+
+        with open(os.path.join(temp_path, "meta.json"), "w") as f:
+            json.dump({
+                "version": INDEX_FORMAT_VERSION,
+                "fps": self.fps,
+                "frame_count": self.frame_count,
+                "face_count": len(frames),
+                "track_count": self.assigner.next_track_id,
+                **(metadata or {})
+            }, f)
+
+        shutil.rmtree(index_path, ignore_errors=True)
+        os.replace(temp_path, index_path)
+
+
+class FaceIndex:
+    """Index des pistes relu en mémoire mappée (seules les pages consultées sont chargées)."""
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        with open(os.path.join(index_path, "meta.json")) as f:
+            self.metadata = json.load(f)
+        self.fps = self.metadata["fps"]
+        self.frame_count = self.metadata["frame_count"]
+
+        for name in INDEX_COLUMNS + ("second_offsets",):
+            setattr(self, name, np.load(os.path.join(index_path, f"{name}.npy"), mmap_mode="r"))
+
+    @staticmethod
+    def exists(index_path: str) -> bool:
+        """Indique si un index complet existe à cet emplacement."""
+        return os.path.exists(os.path.join(index_path, "meta.json"))
+
+    def _rows_to_faces(self, start: int, end: int) -> Detections:
+        """Lot des visages des lignes [start, end), identifiants de piste compris."""
+        return Detections.from_xywh(self.box[start:end], self.score[start:end], track_ids=self.track_id[start:end])
+
+    def get_faces(self, frame_number: int) -> Detections:
+        """Retourne les visages d'une image (recherche dichotomique dans la colonne frame)."""
+        start = int(np.searchsorted(self.frame, frame_number, side="left"))
+        end = int(np.searchsorted(self.frame, frame_number, side="right"))
+        return self._rows_to_faces(start, end)
+
+    def query(self, start_time: float, end_time: float) -> List[Dict[str, Any]]:
+        """
+        Retourne les détections dont l'horodatage est dans [start_time, end_time).
+
+        Args:
+            start_time: Début de l'intervalle en secondes
+            end_time: Fin de l'intervalle en secondes
+
+        Returns:
+            Liste de détections (image, temps, piste, rectangle, score)
+        """
+        seconds = len(self.second_offsets) - 1
+        first_second = min(max(0, int(math.floor(start_time))), seconds)
+        last_second = min(max(0, int(math.ceil(end_time))), seconds)
+        row_start = int(self.second_offsets[first_second])
+        row_end = int(self.second_offsets[last_second])
+
+        frames = np.asarray(self.frame[row_start:row_end])
+        timestamps = frames / self.fps
+        rows = np.flatnonzero((timestamps >= start_time) & (timestamps < end_time))
+
+        faces = self._rows_to_faces(row_start, row_end).take(rows)
+        return [
+            {
+                "frame": frame,
+                "time": timestamp,
+                "track_id": face['face_id'],
+                "bbox": face['bbox'],
+                "score": face['score']
+            }
+            for frame, timestamp, face in zip(frames[rows].tolist(), timestamps[rows].tolist(), faces.to_dicts())
+        ]
+
+
+class IndexedDetector:
+    """Remplace le détecteur en lisant les visages de l'index, image par image."""
+
+    def __init__(self, face_index: FaceIndex, start_frame: int = 0,
+                 selected_tracks: Optional[List[int]] = None):
+        """
+        Args:
+            face_index: Index des pistes de la vidéo
+            start_frame: Numéro de la première image lue
+            selected_tracks: Pistes à conserver (None = toutes)
+        """
+        self.face_index = face_index
+        self.frame_number = start_frame
+        self.selected_tracks = np.asarray(selected_tracks, dtype=np.int32) if selected_tracks is not None else None
+        # Images servies par l'index (le détecteur n'a pas été exécuté)
+        self.frames_served = 0
+
+    def detect_faces(self, image: np.ndarray) -> Tuple[np.ndarray, Detections]:
+        # Les images répétées après la fin (échecs de lecture) reprennent la dernière image indexée
+        frame_number = min(self.frame_number, max(0, self.face_index.frame_count - 1))
+        faces_data = self.face_index.get_faces(frame_number)
+        self.frame_number += 1
+        self.frames_served += 1
+
+        if self.selected_tracks is not None:
+            faces_data = faces_data.take(np.isin(faces_data.track_ids, self.selected_tracks))
+        return image, faces_data
@@ -0,0 +1,253 @@
+"""
+Accès aléatoire rapide aux images d'une vidéo: index des images clés par fichier
+et réserve de captures OpenCV ouvertes, réutilisées d'une requête à l'autre.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+import cv2
+import ffmpeg
+import numpy as np
+from typing import Dict, List, Tuple, Optional
+
+import config
+
+
+def get_keyframe_indices(video_path: str) -> List[int]:
+    """
+    Liste les numéros des images clés du premier flux vidéo sans décoder les images.
+
+    Args:
+        video_path: Chemin du fichier vidéo
+
+    Returns:
+        Numéros d'images (ordre d'affichage) des images clés, liste vide si ffprobe est indisponible
+    """
+    try:
+        probe = ffmpeg.probe(video_path, select_streams="v:0", show_entries="packet=pts,flags")
+    except (ffmpeg.Error, FileNotFoundError, OSError) as e:
+        print(f"Impossible de lister les images clés de {video_path}: {e}")
+        return []
+
+    packets = [p for p in probe.get("packets", []) if p.get("pts") is not None]
+    packets.sort(key=lambda p: int(p["pts"]))
+    return [idx for idx, packet in enumerate(packets) if "K" in packet.get("flags", "")]
+
+
+def _file_key(path: str) -> Tuple[str, int, float]:
+    """Identifie une version d'un fichier par (chemin absolu, taille, date de modification)."""
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime)
+
+
+# Index des images clés déjà calculés, indexés par version de fichier
+_keyframe_indexes: "OrderedDict[Tuple[str, int, float], np.ndarray]" = OrderedDict()
+_keyframe_lock = threading.Lock()
+
+
+def get_keyframe_index(video_path: str) -> np.ndarray:
+    """
+    Retourne l'index des images clés d'un fichier, calculé une seule fois par version du fichier.
+
+    Args:
+        video_path: Chemin du fichier vidéo
+
+    Returns:
+        Tableau trié des numéros d'images clés (vide si ffprobe est indisponible)
+    """
+    memo_key = _file_key(video_path)
+
+    with _keyframe_lock:
+        if memo_key in _keyframe_indexes:
+            _keyframe_indexes.move_to_end(memo_key)
+            return _keyframe_indexes[memo_key]
+
+    keyframes = np.asarray(get_keyframe_indices(video_path), dtype=np.int64)
+
+    with _keyframe_lock:
+        _keyframe_indexes[memo_key] = keyframes
+        while len(_keyframe_indexes) > config.KEYFRAME_INDEX_CACHE_SIZE:
+            _keyframe_indexes.popitem(last=False)
+    return keyframes
+
+
+def keyframe_before(keyframes: np.ndarray, frame_number: int) -> int:
+    """Numéro de la dernière image clé précédant (ou égale à) l'image donnée."""
+    if not len(keyframes):
+        return frame_number
+    return int(keyframes[max(0, np.searchsorted(keyframes, frame_number, side="right") - 1)])
+
+
+def build_keyframe_index_async(video_path: str) -> threading.Thread:
+    """Calcule l'index des images clés en arrière-plan (après un téléversement)."""
+    thread = threading.Thread(
+        target=get_keyframe_index,
+        args=(video_path,),
+        name="keyframe-index",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+class PooledCapture:
+    """Capture OpenCV ouverte sur un fichier, avec la position de la prochaine image lue."""
+
+    def __init__(self, video_path: str, file_key: Tuple[str, int, float]):
+        self.video_path = video_path
+        self.file_key = file_key
+        self.cap = cv2.VideoCapture(video_path)
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.position = 0
+        self.last_used = time.time()
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def read_frame(self, frame_number: int, keyframes: np.ndarray) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Lit une image en décodant le moins d'images possible.
+
+        Le décodeur avance simplement s'il est déjà placé entre l'image clé
+        précédant la cible et la cible; sinon il est repositionné sur cette image clé.
+
+        Args:
+            frame_number: Numéro de l'image à lire
+            keyframes: Index trié des images clés du fichier (vide = repositionnement par OpenCV)
+
+        Returns:
+            Tuple (succès, image)
+        """
+        if len(keyframes):
+            keyframe = keyframe_before(keyframes, frame_number)
+            if not keyframe <= self.position <= frame_number:
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+                self.position = keyframe
+
+            # Décoder sans convertir les images intermédiaires
+            while self.position < frame_number:
+                if not self.cap.grab():
+                    self.position = self.frame_count
+                    return False, None
+                self.position += 1
+        elif self.position != frame_number:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            self.position = frame_number
+
+        ret, frame = self.cap.read()
+        self.position += 1
+        self.last_used = time.time()
+        return ret, frame if ret else None
+
+    def release(self):
+        self.cap.release()
+
+
+class CapturePool:
+    """
+    Réserve de captures ouvertes, indexées par version de fichier (un fichier
+    remplacé sous le même nom n'est jamais lu avec une capture périmée).
+
+    Une capture est empruntée le temps d'une lecture; la capture la mieux placée
+    (la plus proche en amont de l'image demandée) est choisie pour que les requêtes
+    voisines, comme le défilement d'une timeline, réutilisent un décodeur déjà positionné.
+    """
+
+    def __init__(self, max_captures: int = 4):
+        """
+        Args:
+            max_captures: Nombre maximal de captures ouvertes (tous fichiers confondus)
+        """
+        self.max_captures = max(1, max_captures)
+        self._idle: Dict[Tuple[str, int, float], List[PooledCapture]] = {}
+        self._lock = threading.Lock()
+
+    def _acquire(self, video_path: str, frame_number: int, keyframes: np.ndarray) -> PooledCapture:
+        """Emprunte la capture la mieux placée pour lire l'image, ou en ouvre une nouvelle."""
+        file_key = _file_key(video_path)
+        with self._lock:
+            captures = self._idle.get(file_key, [])
+
+            # Les captures situées après l'image clé de la cible n'ont qu'à avancer
+            keyframe = keyframe_before(keyframes, frame_number)
+            warm = [c for c in captures if keyframe <= c.position <= frame_number]
+
+            if warm:
+                capture = max(warm, key=lambda c: c.position)
+            elif captures:
+                capture = max(captures, key=lambda c: c.last_used)
+            else:
+                capture = None
+
+            if capture is not None:
+                captures.remove(capture)
+                return capture
+
+        return PooledCapture(video_path, file_key)
+
+    def _release(self, capture: PooledCapture):
+        """Rend une capture à la réserve en fermant les plus anciennes au-delà de la limite."""
+        to_close = []
+        with self._lock:
+            self._idle.setdefault(capture.file_key, []).append(capture)
+
+            idle = [c for captures in self._idle.values() for c in captures]
+            for oldest in sorted(idle, key=lambda c: c.last_used)[:max(0, len(idle) - self.max_captures)]:
+                self._idle[oldest.file_key].remove(oldest)
+                to_close.append(oldest)
+            self._idle = {key: captures for key, captures in self._idle.items() if captures}
+
+        for oldest in to_close:
+            oldest.release()
+
+    def read_frame(self, video_path: str, frame_number: int) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Lit une image d'un fichier vidéo.
+
+        Args:
+            video_path: Chemin du fichier vidéo
+            frame_number: Numéro de l'image
+
+        Returns:
+            Tuple (succès, image)
+        """
+        keyframes = get_keyframe_index(video_path)
+        capture = self._acquire(video_path, frame_number, keyframes)
+
+        try:
+            if not capture.isOpened():
+                capture.release()
+                return False, None
+
+            if frame_number < 0 or frame_number >= capture.frame_count:
+                self._release(capture)
+                return False, None
+
+            ret, frame = capture.read_frame(frame_number, keyframes)
+
+        except Exception:
+            capture.release()
+            raise
+
+        self._release(capture)
+        return ret, frame
+
+    def close(self, video_path: Optional[str] = None):
+        """Ferme les captures d'un fichier (ou toutes si aucun chemin n'est donné)."""
+        with self._lock:
+            if video_path is None:
+                to_close = [c for captures in self._idle.values() for c in captures]
+                self._idle = {}
+            else:
+                video_path = os.path.abspath(video_path)
+                to_close = [c for key, captures in self._idle.items() if key[0] == video_path for c in captures]
+                self._idle = {key: captures for key, captures in self._idle.items() if key[0] != video_path}
+
+        for capture in to_close:
+            capture.release()
+
+
+# Réserve partagée par extract_frame
+CAPTURE_POOL = CapturePool(max_captures=config.CAPTURE_POOL_SIZE)
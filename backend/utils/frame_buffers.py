@@ -0,0 +1,55 @@
+"""
+Tampons d'images préalloués, réutilisés à tour de rôle pour éviter d'allouer une
+image complète à chaque lecture ou traitement (environ 25 Mo par image en 4K).
+"""
+
+import threading
+import numpy as np
+from typing import List, Tuple
+
+
+class FrameRing:
+    """
+    Anneau de tampons d'images.
+
+    Un tampon est rendu à nouveau après size appels à next(): le consommateur doit
+    avoir fini d'utiliser une image avant que size autres images soient produites.
+    """
+
+    def __init__(self, size: int = 2):
+        """
+        Args:
+            size: Nombre de tampons de l'anneau
+        """
+        self.size = max(1, size)
+        self._buffers: List[np.ndarray] = []
+        self._index = 0
+        self._lock = threading.Lock()
+
+        # Nombre d'images allouées (constant une fois l'anneau rempli)
+        self.allocations = 0
+
+    def next(self, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """
+        Retourne le tampon suivant, réalloué si les dimensions ont changé.
+
+        Args:
+            shape: Dimensions de l'image
+            dtype: Type des pixels
+
+        Returns:
+            Tampon au contenu indéfini
+        """
+        with self._lock:
+            if self._index < len(self._buffers):
+                buffer = self._buffers[self._index]
+                if buffer.shape != tuple(shape) or buffer.dtype != dtype:
+                    buffer = self._buffers[self._index] = np.empty(shape, dtype=dtype)
+                    self.allocations += 1
+            else:
+                buffer = np.empty(shape, dtype=dtype)
+                self._buffers.append(buffer)
+                self.allocations += 1
+
+            self._index = (self._index + 1) % self.size
+            return buffer
@@ -0,0 +1,113 @@
+"""
+Cadencement des images d'un flux en direct sur une horloge murale.
+
+L'image n est due à t0 + n / fps: le producteur attend l'échéance suivante
+lorsqu'il est en avance et ne dort jamais lorsqu'il est en retard. Les échéances
+déjà dépassées sont abandonnées (images sautées) au lieu d'être rattrapées une à
+une, et un fichier vidéo saute les images correspondantes pour rester en temps réel.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Any
+
+
+class FramePacer:
+    """Horloge de diffusion d'une session."""
+
+    def __init__(self, fps: float = 30.0, window: float = 2.0, max_catch_up: float = 1.0):
+        """
+        Args:
+            fps: Cadence de diffusion visée (images par seconde)
+            window: Durée (s) sur laquelle la cadence atteinte est mesurée
+            max_catch_up: Retard (s) au-delà duquel l'horloge repart de l'instant présent
+                au lieu de sauter les images en retard (source bloquée, pause)
+        """
+        self.window = window
+        self.max_catch_up = max_catch_up
+
+        # Échéances abandonnées depuis la création de la session
+        self.frames_dropped = 0
+        self._published: Deque[float] = deque()
+        self.configure(fps)
+
+    def configure(self, fps: float, source_fps: float = 0.0):
+        """
+        Fixe la cadence et repart d'une nouvelle horloge (démarrage du thread de diffusion).
+
+        Args:
+            fps: Cadence de diffusion visée
+            source_fps: Cadence du fichier lu (0 pour une source en direct, qui ne saute
+                aucune image: la caméra fournit toujours la plus récente)
+        """
+        self.fps = max(float(fps), 1.0)
+        self.interval = 1.0 / self.fps
+        # Images de la source par échéance (0 = source en direct)
+        self.source_step = source_fps / self.fps if source_fps > 0 else 0.0
+
+        self._start = None
+        self._slot = 0
+        self._source_position = 0
+        self._published.clear()
+
+    def next_frame(self) -> int:
+        """
+        Avance l'horloge jusqu'à l'échéance courante, avant la lecture d'une image.
+
+        Returns:
+            Nombre d'images du fichier à sauter avant la lecture (0 pour une source en direct)
+        """
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+
+        missed = int((now - self._start) / self.interval) - self._slot
+        if missed > 0:
+            if missed * self.interval > self.max_catch_up:
+                # Retard trop important: l'échéance courante devient l'instant présent,
+                # sans sauter d'image (ni en compter comme abandonnée)
+                self._start = now - self._slot * self.interval
+            else:
+                self._slot += missed
+                self.frames_dropped += missed
+
+        if not self.source_step:
+            return 0
+
+        # Position de la source due à cette échéance, relative au démarrage de l'horloge
+        position = round(self._slot * self.source_step)
+        skip = max(0, position - self._source_position)
+        self._source_position = max(position, self._source_position) + 1
+        return skip
+
+    def frame_published(self) -> float:
+        """
+        Enregistre la publication de l'image de l'échéance courante.
+
+        Returns:
+            Délai (s) jusqu'à l'échéance suivante, 0 si elle est déjà dépassée
+        """
+        now = time.monotonic()
+        self._published.append(now)
+        while now - self._published[0] > self.window:
+            self._published.popleft()
+
+        self._slot += 1
+        if self._start is None:
+            return 0.0
+        return max(0.0, self._start + self._slot * self.interval - now)
+
+    def achieved_fps(self) -> float:
+        """Cadence réellement atteinte sur la fenêtre de mesure (0 si le flux est arrêté)."""
+        published = list(self._published)
+        if len(published) < 2 or time.monotonic() - published[-1] > self.window:
+            return 0.0
+        return (len(published) - 1) / max(published[-1] - published[0], 1e-6)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cadence visée, cadence atteinte et échéances abandonnées."""
+        return {
+            "target_fps": round(self.fps, 2),
+            "achieved_fps": round(self.achieved_fps(), 2),
+            "frames_dropped": self.frames_dropped
+        }
@@ -0,0 +1,263 @@
+"""
+Métriques de fonctionnement (compteurs, jauges, histogrammes) exportées au
+format texte de Prometheus.
+
+Implémentation minimale sans dépendance: chaque observation coûte un verrou et
+une recherche dichotomique, ce qui reste négligeable devant le traitement d'une image.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Tuple, Optional, Callable, Iterator, Sequence
+
+# Limites des histogrammes de durée (secondes)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Sequence[str], extra: str = "") -> str:
+    """Formate les étiquettes d'une série ({nom="valeur",...})."""
+    pairs = [
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(labelnames, labelvalues)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base commune: nom, description et séries indexées par valeurs d'étiquettes."""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.extend(self._render_series(labelvalues, value))
+        return lines
+
+    def _render_series(self, labelvalues: Tuple[str, ...], value: Any) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """Valeur croissante (nombre d'événements)."""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, values: Dict[Tuple[str, ...], float]):
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = self._values.get(key, 0.0) + value
+
+
+class Gauge(_Metric):
+    """Valeur instantanée, fixée directement ou calculée au moment de l'export."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]):
+        """Calcule la valeur (sans étiquettes) à chaque export."""
+        self._function = function
+
+    def render(self) -> List[str]:
+        if self._function is not None:
+            try:
+                self.set(self._function())
+            except Exception as e:
+                print(f"Erreur lors du calcul de la métrique {self.name}: {e}")
+        return super().render()
+
+
+class Histogram(_Metric):
+    """Distribution d'observations réparties dans des intervalles cumulatifs."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # [comptes par intervalle (+Inf compris), somme]
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Mesure la durée du bloc."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Any]:
+        with self._lock:
+            return {key: [list(counts), total] for key, (counts, total) in self._values.items()}
+
+    def merge(self, values: Dict[Tuple[str, ...], Any]):
+        with self._lock:
+            for key, (counts, total) in values.items():
+                series = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+
+    def _render_series(self, labelvalues: Tuple[str, ...], value: Any) -> List[str]:
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, labelvalues)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ensemble des métriques exportées."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Export au format texte de Prometheus."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Compteurs et histogrammes (sérialisables) pour les transmettre à un autre processus."""
+        return {
+            name: metric.snapshot()
+            for name, metric in self._metrics.items()
+            if isinstance(metric, (Counter, Histogram))
+        }
+
+    def reset(self):
+        """Vide les compteurs et histogrammes (processus de rendu, avant chaque segment)."""
+        for metric in self._metrics.values():
+            if isinstance(metric, (Counter, Histogram)):
+                with metric._lock:
+                    metric._values.clear()
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Ajoute les observations d'un autre processus (rendu fragmenté)."""
+        for name, values in snapshot.items():
+            metric = self._metrics.get(name)
+            if isinstance(metric, (Counter, Histogram)):
+                metric.merge(values)
+
+
+REGISTRY = MetricsRegistry()
+
+# Durée de chaque étape par image: detect, blur, jpeg_encode, video_encode
+# source: 'live' (sessions) ou 'render' (traitement de vidéos)
+STAGE_DURATION = REGISTRY.register(Histogram(
+    "blurface_stage_duration_seconds",
+    "Durée d'une étape du traitement d'une image",
+    ["stage", "source"]
+))
+
+FACES_PER_FRAME = REGISTRY.register(Histogram(
+    "blurface_faces_per_frame",
+    "Nombre de visages détectés par image",
+    ["source"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50)
+))
+
+FRAMES_SERVED = REGISTRY.register(Counter(
+    "blurface_frames_served_total",
+    "Images envoyées aux clients, par type de source et rendu (jeu d'étiquettes borné)",
+    ["endpoint", "source", "variant"]
+))
+
+STREAM_FRAMES_DROPPED = REGISTRY.register(Counter(
+    "blurface_stream_frames_dropped_total",
+    "Images des sessions en direct sautées faute de temps de traitement"
+))
+
+ACTIVE_STREAMS = REGISTRY.register(Gauge(
+    "blurface_active_streams",
+    "Flux MJPEG en cours"
+))
+
+ACTIVE_SESSIONS_GAUGE = REGISTRY.register(Gauge(
+    "blurface_active_sessions",
+    "Sessions vidéo actives"
+))
+
+JOB_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "blurface_job_queue_depth",
+    "Jobs de traitement en attente d'exécution"
+))
+
+DETECTOR_POOL_IDLE = REGISTRY.register(Gauge(
+    "blurface_detector_pool_idle",
+    "Moteurs de détection inactifs dans le pool"
+))
+
+DETECTOR_POOL_LEASED = REGISTRY.register(Gauge(
+    "blurface_detector_pool_leased",
+    "Moteurs de détection prêtés aux sessions et aux jobs"
+))
@@ -4,11 +4,35 @@ Utilitaires pour la gestion des fichiers vidéo.
 
 import os
 import time
+import queue
+import shutil
+import threading
 import tempfile
 import subprocess
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
 import cv2
+import ffmpeg
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any, Callable
+from typing import Dict, List, Tuple, Optional, Any, Callable, Iterator
+
+import config
+from utils.video_writer import create_video_writer
+from utils.frame_buffers import FrameRing
+from utils.detection_cache import (
+    CachedDetections,
+    CachedDetector,
+    DetectionRecorder,
+    RecordingDetector,
+    detection_cache_path
+)
+from utils.face_index import FaceIndex, FaceIndexWriter, IndexedDetector
+from utils.camera_registry import CAMERA_REGISTRY
+from utils.frame_access import CAPTURE_POOL, get_keyframe_index
+from utils.metrics import REGISTRY, STAGE_DURATION, FACES_PER_FRAME
+from core.frame_gate import StaticFrameGate
+from core.detections import Detections
 
 class VideoProcessor:
     """Classe pour traiter les fichiers vidéo complets."""
@@ -18,7 +42,16 @@ class VideoProcessor:
                  output_path: str, 
                  face_detector, 
                  blur_processor,
-                 progress_callback: Optional[Callable[[float, int, int, float, float], None]] = None):
+                 progress_callback: Optional[Callable[[float, int, int, float, float], None]] = None,
+                 num_workers: int = 1,
+                 pipelined: bool = False,
+                 detection_interval: int = 1,
+                 encoder: str = "opencv",
+                 encoder_options: Optional[Dict[str, Any]] = None,
+                 detection_cache: bool = False,
+                 face_index_path: Optional[str] = None,
+                 selected_tracks: Optional[List[int]] = None,
+                 static_frame_threshold: float = 0.0):
         """
         Initialise le processeur vidéo.
         
@@ -29,12 +62,45 @@ class VideoProcessor:
             blur_processor: Instance de BlurProcessor
             progress_callback: Fonction de rappel pour le suivi de la progression
                               (progress, frames_processed, total_frames, elapsed_time, estimated_time_remaining)
+            num_workers: Nombre de processus de rendu (mode fragmenté si > 1)
+            pipelined: Si True, décodage, détection, floutage et encodage s'exécutent
+                       dans des threads reliés par des files bornées
+            detection_interval: Nombre d'images entre deux détections complètes,
+                                les visages étant suivis par flux optique entre les deux
+            encoder: 'opencv' (cv2.VideoWriter mp4v) ou 'ffmpeg' (tube vers ffmpeg, audio conservé)
+            encoder_options: Options de l'encodeur ffmpeg (codec, preset, crf)
+            detection_cache: Si True, les détections sont enregistrées dans un fichier annexe
+                             (clé: contenu de la vidéo + paramètres de détection) et
+                             réutilisées lors des rendus suivants
+            face_index_path: Index des pistes produit par analyze_video; s'il est fourni,
+                             les visages sont lus dans l'index au lieu d'exécuter le détecteur
+            selected_tracks: Pistes de l'index à flouter (None = toutes)
+            static_frame_threshold: Écart de luminance sous lequel une image est jugée
+                                    identique à la précédente et réutilise ses détections (0 = désactivé)
         """
         self.input_path = input_path
         self.output_path = output_path
         self.face_detector = face_detector
         self.blur_processor = blur_processor
         self.progress_callback = progress_callback
+        self.num_workers = max(1, int(num_workers or 1))
+        self.pipelined = pipelined
+        self.detection_interval = max(1, int(detection_interval or 1))
+        self.encoder = encoder
+        self.encoder_options = dict(encoder_options or {})
+        self.detection_cache = detection_cache
+        self.face_index_path = face_index_path
+        self.face_index = FaceIndex(face_index_path) if face_index_path else None
+        self.selected_tracks = selected_tracks
+        self.static_frame_threshold = static_frame_threshold
+        
+        # Filtres d'images statiques créés pour les plages traitées dans ce processus
+        self._frame_gates: List[StaticFrameGate] = []
+        # Lecteurs du cache de détections ou de l'index créés pour ces plages
+        self._stored_detectors: List[Any] = []
+        # Détections réutilisées et relues signalées par les processus de rendu (mode fragmenté)
+        self._worker_reused_frames = 0
+        self._worker_cached_frames = 0
         
         self.processing_status = {
             "status": "idle",
@@ -43,7 +109,11 @@ class VideoProcessor:
             "total_frames": 0,
             "elapsed_time": 0.0,
             "estimated_time_remaining": 0.0,
-            "error_message": None
+            "error_message": None,
+            "static_frame_threshold": static_frame_threshold,
+            "detections_reused": 0,
+            "detections_cached": 0,
+            "detections_fresh": 0
         }
         
         # Tenter d'obtenir les informations sur la vidéo
@@ -66,6 +136,10 @@ class VideoProcessor:
         """
         Traite la vidéo complète en détectant et floutant les visages.
         
+        Si num_workers > 1 et que la vidéo est assez longue, la vidéo est découpée
+        en plages d'images alignées sur les images clés, traitées en parallèle
+        puis recollées dans le fichier de sortie.
+        
         Args:
             selected_faces: Liste des indices des visages à flouter (None = tous)
             draw_detections: Si True, dessine les rectangles de détection
@@ -79,96 +153,58 @@ class VideoProcessor:
         self.processing_status["frames_processed"] = 0
         self.processing_status["elapsed_time"] = 0.0
         self.processing_status["estimated_time_remaining"] = 0.0
+        self._frame_gates = []
+        self._stored_detectors = []
+        self._worker_reused_frames = 0
+        self._worker_cached_frames = 0
         
         start_time = time.time()
         
         try:
-            # Ouvrir la vidéo d'entrée
-            cap = cv2.VideoCapture(self.input_path)
-            
-            if not cap.isOpened():
-                raise ValueError(f"Impossible d'ouvrir la vidéo: {self.input_path}")
-            
             # Créer le dossier de sortie si nécessaire
             output_dir = os.path.dirname(self.output_path)
             if output_dir and not os.path.exists(output_dir):
                 os.makedirs(output_dir)
             
-            # Configurer l'encodeur vidéo
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec MP4
-            out = cv2.VideoWriter(
-                self.output_path, 
-                fourcc, 
-                self.fps, 
-                (self.width, self.height)
-            )
+            # Réutiliser les détections d'un rendu précédent si elles existent
+            cache_path = None
+            cached_detections = None
+            if self.detection_cache and self.face_index is None:
+                cache_path = detection_cache_path(self.input_path, self._detection_settings())
+                cached_detections = CachedDetections.load(cache_path)
+                if cached_detections is not None:
+                    print(f"Détections relues depuis le cache: {cache_path}")
             
-            # Garde la dernière image valide
-            previous_frame = None
-            frames_failed = 0
-            max_failures = 5  # Nombre maximal d'échecs consécutifs tolérés
+            shards = self._plan_shards()
             
-            # Traiter chaque image
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    # Si nous avons une image précédente et que c'est un échec temporaire
-                    if previous_frame is not None and frames_failed < max_failures:
-                        frame = previous_frame.copy()
-                        frames_failed += 1
-                        print(f"Frame read failed, using previous frame. Failures: {frames_failed}/{max_failures}")
-                    else:
-                        # Trop d'échecs consécutifs ou pas d'image précédente
-                        if frames_failed >= max_failures:
-                            print(f"Too many consecutive frame failures ({frames_failed}), stopping processing")
-                        break
-                else:
-                    # Réinitialiser le compteur d'échecs si on a lu une image avec succès
-                    frames_failed = 0
-                    # Sauvegarder l'image valide
-                    if frame is not None and frame.size > 0:
-                        previous_frame = frame.copy()
-                
-                # Détecter les visages
-                _, faces_data = self.face_detector.detect_faces(frame)
-                
-                # Appliquer le floutage
-                processed_frame = self.blur_processor.blur_faces(frame, faces_data, selected_faces)
-                
-                # Dessiner les détections si demandé
-                if draw_detections:
-                    processed_frame = self.face_detector.draw_detections(processed_frame, faces_data)
-                
-                # Écrire l'image traitée
-                out.write(processed_frame)
-                
-                # Mise à jour du statut
-                self.processing_status["frames_processed"] += 1
-                current_progress = self.processing_status["frames_processed"] / self.total_frames
-                self.processing_status["progress"] = current_progress
-                
-                # Calcul du temps restant
-                elapsed_time = time.time() - start_time
-                self.processing_status["elapsed_time"] = elapsed_time
-                
-                if current_progress > 0:
-                    estimated_total_time = elapsed_time / current_progress
-                    estimated_time_remaining = estimated_total_time - elapsed_time
-                    self.processing_status["estimated_time_remaining"] = estimated_time_remaining
-                
-                # Appel de la fonction de rappel si elle existe
-                if self.progress_callback:
-                    self.progress_callback(
-                        current_progress,
-                        self.processing_status["frames_processed"],
-                        self.total_frames,
-                        elapsed_time,
-                        self.processing_status["estimated_time_remaining"]
-                    )
+            if len(shards) > 1:
+                detection_parts = self._process_sharded(
+                    shards, selected_faces, draw_detections, start_time,
+                    cache_path=cache_path if cached_detections is not None else None,
+                    record_detections=cache_path is not None and cached_detections is None
+                )
+            else:
+                recorder = DetectionRecorder() if cache_path and cached_detections is None else None
+                self._render_segment(
+                    self.output_path,
+                    0,
+                    None,
+                    selected_faces,
+                    draw_detections,
+                    lambda count: self._update_progress(
+                        self.processing_status["frames_processed"] + count, start_time
+                    ),
+                    cached_detections=cached_detections,
+                    recorder=recorder
+                )
+                detection_parts = [recorder.to_arrays()] if recorder else None
             
-            # Libérer les ressources
-            cap.release()
-            out.release()
+            # Enregistrer les détections pour les prochains rendus
+            if cache_path and detection_parts:
+                try:
+                    DetectionRecorder.save(cache_path, detection_parts)
+                except Exception as e:
+                    print(f"Impossible d'écrire le cache de détection {cache_path}: {e}")
             
             # Finaliser le statut
             self.processing_status["status"] = "completed"
@@ -178,24 +214,751 @@ class VideoProcessor:
             # En cas d'erreur, mettre à jour le statut
             self.processing_status["status"] = "error"
             self.processing_status["error_message"] = str(e)
+        
+        return self.processing_status
+
+    def analyze_video(self, index_path: str) -> Dict[str, Any]:
+        """
+        Passe d'analyse: détecte les visages de toute la vidéo, leur attribue un
+        identifiant de piste et écrit l'index en colonnes (sans produire de vidéo).
+        
+        Args:
+            index_path: Dossier de l'index à écrire
+            
+        Returns:
+            Dictionnaire avec le statut final de l'analyse
+        """
+        # Mise à jour du statut
+        self.processing_status["status"] = "processing"
+        self.processing_status["progress"] = 0.0
+        self.processing_status["frames_processed"] = 0
+        self.processing_status["elapsed_time"] = 0.0
+        self.processing_status["estimated_time_remaining"] = 0.0
+        self._frame_gates = []
+        self._stored_detectors = []
+        self._worker_reused_frames = 0
+        self._worker_cached_frames = 0
+        
+        start_time = time.time()
+        cap = None
+        
+        try:
+            cap = cv2.VideoCapture(self.input_path)
+            if not cap.isOpened():
+                raise ValueError(f"Impossible d'ouvrir la vidéo: {self.input_path}")
+            
+            detector = self._make_frame_detector()
+            writer = FaceIndexWriter(self.fps)
+            
+            frames = self._read_frames(cap, 0, None, FrameRing(2) if config.FRAME_BUFFER_REUSE else None)
+            for frame_number, frame in enumerate(frames):
+                _, faces_data = detector.detect_faces(frame)
+                writer.add(frame_number, faces_data)
+                self._update_progress(frame_number + 1, start_time)
+            
+            writer.save(index_path, {
+                "width": self.width,
+                "height": self.height,
+                "detection_settings": self._detection_settings()
+            })
+            
+            # Finaliser le statut
+            self.processing_status["status"] = "completed"
+            self.processing_status["progress"] = 1.0
             
-            # Libérer les ressources en cas d'erreur
-            if 'cap' in locals() and cap is not None:
+        except Exception as e:
+            # En cas d'erreur, mettre à jour le statut
+            self.processing_status["status"] = "error"
+            self.processing_status["error_message"] = str(e)
+        
+        finally:
+            if cap is not None:
                 cap.release()
-            if 'out' in locals() and out is not None:
-                out.release()
         
         return self.processing_status
 
+    def _render_segment(self,
+                        output_path: str,
+                        start_frame: int,
+                        end_frame: Optional[int],
+                        selected_faces: Optional[List[int]],
+                        draw_detections: bool,
+                        on_progress: Optional[Callable[[int], None]] = None,
+                        cached_detections: Optional[CachedDetections] = None,
+                        recorder: Optional[DetectionRecorder] = None) -> int:
+        """
+        Traite une plage d'images [start_frame, end_frame) et l'écrit dans output_path.
+        
+        Args:
+            output_path: Chemin du fichier vidéo à écrire
+            start_frame: Première image de la plage
+            end_frame: Fin (exclue) de la plage, None pour aller jusqu'à la fin de la vidéo
+            selected_faces: Liste des indices des visages à flouter (None = tous)
+            draw_detections: Si True, dessine les rectangles de détection
+            on_progress: Fonction appelée avec le nombre d'images traitées depuis le dernier appel
+            cached_detections: Détections à relire au lieu d'exécuter le détecteur
+            recorder: Enregistreur des détections produites sur cette plage
+            
+        Returns:
+            Nombre d'images écrites
+        """
+        cap = None
+        out = None
+        frames_written = 0
+        
+        try:
+            # Ouvrir la vidéo d'entrée
+            cap = cv2.VideoCapture(self.input_path)
+            
+            if not cap.isOpened():
+                raise ValueError(f"Impossible d'ouvrir la vidéo: {self.input_path}")
+            
+            # Se positionner au début de la plage
+            if start_frame > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+            
+            # Configurer l'encodeur vidéo (l'audio n'est copié que pour une vidéo complète,
+            # les segments du mode fragmenté le récupèrent lors de l'assemblage)
+            full_video = start_frame == 0 and end_frame is None
+            out = create_video_writer(
+                output_path,
+                self.fps,
+                (self.width, self.height),
+                self.encoder,
+                audio_source=self.input_path if full_video else None,
+                **self.encoder_options
+            )
+            
+            detector = self._make_frame_detector(start_frame, cached_detections, recorder)
+            
+            if self.pipelined:
+                # Tampons en nombre suffisant pour toutes les images en cours dans les files
+                queue_size = max(1, config.PIPELINE_QUEUE_SIZE)
+                input_buffers = FrameRing(2 * queue_size + 4) if config.FRAME_BUFFER_REUSE else None
+                output_buffers = FrameRing(queue_size + 3) if config.FRAME_BUFFER_REUSE else None
+                frames = self._read_frames(cap, start_frame, end_frame, input_buffers)
+                frames_written = self._run_pipeline(
+                    frames, out, detector, selected_faces, draw_detections, on_progress, output_buffers
+                )
+            else:
+                # Une image lue et une image traitée, réutilisées d'une image à l'autre
+                input_buffers = FrameRing(2) if config.FRAME_BUFFER_REUSE else None
+                output_buffers = FrameRing(1) if config.FRAME_BUFFER_REUSE else None
+                frames = self._read_frames(cap, start_frame, end_frame, input_buffers)
+                
+                # Traiter chaque image
+                for frame in frames:
+                    # Détecter les visages
+                    with STAGE_DURATION.time(stage="detect", source="render"):
+                        _, faces_data = detector.detect_faces(frame)
+                    FACES_PER_FRAME.observe(len(faces_data), source="render")
+                    
+                    # Appliquer le floutage
+                    with STAGE_DURATION.time(stage="blur", source="render"):
+                        processed_frame = self._blur_frame(
+                            frame, faces_data, selected_faces, draw_detections, output_buffers
+                        )
+                    
+                    # Écrire l'image traitée
+                    with STAGE_DURATION.time(stage="video_encode", source="render"):
+                        out.write(processed_frame)
+                    frames_written += 1
+                    
+                    if on_progress:
+                        on_progress(1)
+        finally:
+            # Libérer les ressources
+            if cap is not None:
+                cap.release()
+            if out is not None:
+                out.release()
+        
+        return frames_written
+
+    def _read_frames(self, cap, start_frame: int, end_frame: Optional[int],
+                     buffers: Optional[FrameRing] = None) -> Iterator[np.ndarray]:
+        """
+        Lit les images de la plage [start_frame, end_frame) en tolérant quelques échecs de lecture.
+        
+        Args:
+            cap: Capture OpenCV déjà positionnée sur start_frame
+            start_frame: Première image de la plage
+            end_frame: Fin (exclue) de la plage, None pour aller jusqu'à la fin de la vidéo
+            buffers: Tampons dans lesquels décoder les images (None = une image allouée par lecture).
+                     Une image n'est valide que jusqu'à ce que buffers.size autres images soient lues.
+            
+        Yields:
+            Images lues (ou dernière image valide en cas d'échec temporaire)
+        """
+        # Garde la dernière image valide
+        previous_frame = None
+        frames_failed = 0
+        max_failures = 5  # Nombre maximal d'échecs consécutifs tolérés
+        frames_read = 0
+        frame_shape = (self.height, self.width, 3)
+        
+        while cap.isOpened():
+            if end_frame is not None and start_frame + frames_read >= end_frame:
+                break
+            
+            if buffers is not None:
+                # OpenCV décode dans le tampon s'il a les bonnes dimensions
+                ret, frame = cap.read(buffers.next(frame_shape))
+            else:
+                ret, frame = cap.read()
+            if not ret:
+                # Si nous avons une image précédente et que c'est un échec temporaire
+                if previous_frame is not None and frames_failed < max_failures:
+                    if buffers is not None:
+                        frame = buffers.next(previous_frame.shape, previous_frame.dtype)
+                        np.copyto(frame, previous_frame)
+                    else:
+                        frame = previous_frame.copy()
+                    previous_frame = frame
+                    frames_failed += 1
+                    print(f"Frame read failed, using previous frame. Failures: {frames_failed}/{max_failures}")
+                else:
+                    # Trop d'échecs consécutifs ou pas d'image précédente
+                    if frames_failed >= max_failures:
+                        print(f"Too many consecutive frame failures ({frames_failed}), stopping processing")
+                    break
+            else:
+                # Réinitialiser le compteur d'échecs si on a lu une image avec succès
+                frames_failed = 0
+                # Sauvegarder l'image valide (sans copie: les images produites ne sont jamais modifiées)
+                if frame is not None and frame.size > 0:
+                    previous_frame = frame
+                    frame_shape = frame.shape
+            
+            frames_read += 1
+            yield frame
+
+    def _make_frame_detector(self,
+                             start_frame: int = 0,
+                             cached_detections: Optional[CachedDetections] = None,
+                             recorder: Optional[DetectionRecorder] = None):
+        """
+        Retourne l'objet utilisé pour détecter les visages image par image: l'index
+        des pistes, le cache de détections, le détecteur lui-même, ou un FaceTracker
+        s'il y a un intervalle de détection.
+        
+        Args:
+            start_frame: Première image de la plage traitée
+            cached_detections: Détections à relire au lieu d'exécuter le détecteur
+            recorder: Enregistreur des détections produites
+        """
+        if self.face_index is not None:
+            detector = IndexedDetector(self.face_index, start_frame, self.selected_tracks)
+            self._stored_detectors.append(detector)
+            return detector
+        
+        if cached_detections is not None:
+            detector = CachedDetector(cached_detections, start_frame)
+            self._stored_detectors.append(detector)
+            return detector
+        
+        if self.detection_interval <= 1:
+            detector = self.face_detector
+        else:
+            from core.face_tracker import FaceTracker
+            detector = FaceTracker(
+                self.face_detector,
+                detection_interval=self.detection_interval,
+                min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE
+            )
+        
+        if self.static_frame_threshold > 0:
+            detector = StaticFrameGate(
+                detector,
+                threshold=self.static_frame_threshold,
+                scene_cut_threshold=config.SCENE_CUT_THRESHOLD
+            )
+            self._frame_gates.append(detector)
+        
+        # L'enregistreur doit voir toutes les images, y compris celles réutilisées
+        if recorder is not None:
+            detector = RecordingDetector(detector, recorder)
+        return detector
+
+    def _blur_frame(self,
+                    frame: np.ndarray,
+                    faces_data: Detections,
+                    selected_faces: Optional[List[int]],
+                    draw_detections: bool,
+                    output_buffers: Optional[FrameRing] = None) -> np.ndarray:
+        """
+        Applique le floutage (et éventuellement les annotations) sur une image.
+        
+        L'image source n'est jamais modifiée; le résultat est écrit dans le tampon
+        suivant de output_buffers, ou dans une nouvelle image si output_buffers est None.
+        """
+        out = output_buffers.next(frame.shape, frame.dtype) if output_buffers is not None else None
+        processed_frame = self.blur_processor.blur_faces(frame, faces_data, selected_faces, out=out)
+        
+        # Dessiner les détections si demandé (sur le résultat, qui n'appartient qu'à cette image)
+        if draw_detections:
+            processed_frame = self.face_detector.draw_detections(processed_frame, faces_data, in_place=True)
+        
+        return processed_frame
+
+    def _run_pipeline(self,
+                      frames: Iterator[np.ndarray],
+                      out,
+                      detector,
+                      selected_faces: Optional[List[int]],
+                      draw_detections: bool,
+                      on_progress: Optional[Callable[[int], None]] = None,
+                      output_buffers: Optional[FrameRing] = None) -> int:
+        """
+        Exécute décodage, détection, floutage et encodage dans quatre threads
+        reliés par des files bornées, afin de recouvrir le travail du codec et l'inférence.
+        
+        Chaque étape est un unique thread consommant sa file dans l'ordre,
+        ce qui préserve l'ordre des images. Une file pleine bloque l'étape
+        précédente (contre-pression) et limite la mémoire utilisée.
+        
+        Args:
+            frames: Itérateur des images décodées
+            out: VideoWriter de sortie
+            detector: Objet fournissant detect_faces (FaceDetector ou FaceTracker)
+            selected_faces: Liste des indices des visages à flouter (None = tous)
+            draw_detections: Si True, dessine les rectangles de détection
+            on_progress: Fonction appelée avec le nombre d'images écrites depuis le dernier appel
+            output_buffers: Tampons des images floutées, assez nombreux pour la file
+                            d'encodage et les deux étapes qui l'entourent
+            
+        Returns:
+            Nombre d'images écrites
+        """
+        queue_size = max(1, config.PIPELINE_QUEUE_SIZE)
+        decoded = queue.Queue(maxsize=queue_size)
+        detected = queue.Queue(maxsize=queue_size)
+        blurred = queue.Queue(maxsize=queue_size)
+        stop_event = threading.Event()
+        errors = []
+        frames_written = [0]
+        
+        def decode():
+            for frame in frames:
+                if not _pipeline_put(decoded, frame, stop_event):
+                    return
+            _pipeline_put(decoded, _PIPELINE_END, stop_event)
+        
+        def detect():
+            for frame in _pipeline_items(decoded, stop_event):
+                with STAGE_DURATION.time(stage="detect", source="render"):
+                    _, faces_data = detector.detect_faces(frame)
+                FACES_PER_FRAME.observe(len(faces_data), source="render")
+                if not _pipeline_put(detected, (frame, faces_data), stop_event):
+                    return
+            _pipeline_put(detected, _PIPELINE_END, stop_event)
+        
+        def blur():
+            for frame, faces_data in _pipeline_items(detected, stop_event):
+                with STAGE_DURATION.time(stage="blur", source="render"):
+                    processed_frame = self._blur_frame(frame, faces_data, selected_faces, draw_detections, output_buffers)
+                if not _pipeline_put(blurred, processed_frame, stop_event):
+                    return
+            _pipeline_put(blurred, _PIPELINE_END, stop_event)
+        
+        def encode():
+            for processed_frame in _pipeline_items(blurred, stop_event):
+                with STAGE_DURATION.time(stage="video_encode", source="render"):
+                    out.write(processed_frame)
+                frames_written[0] += 1
+                if on_progress:
+                    on_progress(1)
+        
+        def run_stage(stage: Callable[[], None]):
+            try:
+                stage()
+            except Exception as e:
+                # Arrêter toutes les étapes à la première erreur
+                errors.append(e)
+                stop_event.set()
+        
+        threads = [
+            threading.Thread(target=run_stage, args=(stage,), name=f"pipeline-{stage.__name__}", daemon=True)
+            for stage in (decode, detect, blur, encode)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        if errors:
+            raise errors[0]
+        
+        return frames_written[0]
+
+    def _update_progress(self, frames_processed: int, start_time: float):
+        """
+        Met à jour le statut de progression et appelle la fonction de rappel.
+        
+        Args:
+            frames_processed: Nombre total d'images traitées
+            start_time: Horodatage du début du traitement
+        """
+        self.processing_status["frames_processed"] = frames_processed
+        
+        # Détections réutilisées (images statiques), relues (cache, index) et effectivement calculées
+        reused_frames = self._worker_reused_frames + sum(gate.reused_frames for gate in self._frame_gates)
+        cached_frames = self._worker_cached_frames + sum(
+            detector.frames_served for detector in self._stored_detectors
+        )
+        self.processing_status["detections_reused"] = reused_frames
+        self.processing_status["detections_cached"] = cached_frames
+        self.processing_status["detections_fresh"] = max(0, frames_processed - reused_frames - cached_frames)
+        
+        current_progress = min(1.0, frames_processed / max(1, self.total_frames))
+        self.processing_status["progress"] = current_progress
+        
+        # Calcul du temps restant
+        elapsed_time = time.time() - start_time
+        self.processing_status["elapsed_time"] = elapsed_time
+        
+        if current_progress > 0:
+            estimated_total_time = elapsed_time / current_progress
+            estimated_time_remaining = estimated_total_time - elapsed_time
+            self.processing_status["estimated_time_remaining"] = estimated_time_remaining
+        
+        # Appel de la fonction de rappel si elle existe
+        if self.progress_callback:
+            self.progress_callback(
+                current_progress,
+                frames_processed,
+                self.total_frames,
+                elapsed_time,
+                self.processing_status["estimated_time_remaining"]
+            )
+
+    def _plan_shards(self) -> List[Tuple[int, Optional[int]]]:
+        """
+        Découpe la vidéo en plages d'images alignées sur les images clés.
+        
+        Returns:
+            Liste de plages (start_frame, end_frame), end_frame à None pour la dernière
+        """
+        shard_count = min(self.num_workers, self.total_frames // max(1, config.MIN_FRAMES_PER_SHARD))
+        if shard_count <= 1:
+            return [(0, None)]
+        
+        keyframes = get_keyframe_index(self.input_path).tolist()
+        
+        boundaries = [0]
+        for i in range(1, shard_count):
+            target = i * self.total_frames // shard_count
+            if keyframes:
+                # Première image clé à partir de la frontière idéale
+                candidates = [k for k in keyframes if k >= target]
+                if not candidates:
+                    break
+                target = candidates[0]
+            if target - boundaries[-1] >= config.MIN_FRAMES_PER_SHARD // 2:
+                boundaries.append(target)
+        
+        return [
+            (start, boundaries[i + 1] if i + 1 < len(boundaries) else None)
+            for i, start in enumerate(boundaries)
+        ]
+
+    def _detector_settings(self) -> Dict[str, Any]:
+        """Paramètres nécessaires pour recréer le détecteur dans un autre processus."""
+        return {
+            "min_detection_confidence": self.face_detector.min_detection_confidence,
+            "model_selection": self.face_detector.model_selection,
+            "detection_size": self.face_detector.detection_size,
+            "detection_scale": self.face_detector.detection_scale,
+            "roi_tracking": self.face_detector.roi_tracking,
+            "full_scan_interval": self.face_detector.full_scan_interval,
+            "roi_padding": self.face_detector.roi_padding,
+            "backend": self.face_detector.backend_name
+        }
+
+    def _detection_settings(self) -> Dict[str, Any]:
+        """Paramètres qui déterminent les détections produites (clé du cache de détection)."""
+        return {
+            **self._detector_settings(),
+            "detection_interval": self.detection_interval,
+            "static_frame_threshold": self.static_frame_threshold
+        }
+
+    def _shard_settings(self) -> Dict[str, Any]:
+        """Paramètres nécessaires pour recréer le détecteur et le flou dans un processus de rendu."""
+        return {
+            "detector": self._detector_settings(),
+            "blur": {
+                "blur_method": self.blur_processor.blur_method,
+                "blur_intensity": self.blur_processor.blur_intensity
+            },
+            "processor": {
+                "pipelined": self.pipelined,
+                "detection_interval": self.detection_interval,
+                "encoder": self.encoder,
+                "encoder_options": self.encoder_options,
+                "face_index_path": self.face_index_path,
+                "selected_tracks": self.selected_tracks,
+                "static_frame_threshold": self.static_frame_threshold
+            }
+        }
+
+    def _process_sharded(self,
+                         shards: List[Tuple[int, Optional[int]]],
+                         selected_faces: Optional[List[int]],
+                         draw_detections: bool,
+                         start_time: float,
+                         cache_path: Optional[str] = None,
+                         record_detections: bool = False) -> Optional[List[Dict[str, np.ndarray]]]:
+        """
+        Traite les plages d'images dans des processus séparés puis assemble les segments.
+        
+        Args:
+            shards: Plages d'images retournées par _plan_shards
+            selected_faces: Liste des indices des visages à flouter (None = tous)
+            draw_detections: Si True, dessine les rectangles de détection
+            start_time: Horodatage du début du traitement
+            cache_path: Fichier de détections à relire au lieu d'exécuter le détecteur
+            record_detections: Si True, les processus renvoient leurs détections
+            
+        Returns:
+            Détections de chaque plage dans l'ordre (si record_detections), sinon None
+        """
+        segment_dir = tempfile.mkdtemp(prefix="shards_", dir=os.path.dirname(self.output_path) or None)
+        segment_paths = [os.path.join(segment_dir, f"segment_{i:04d}.mp4") for i in range(len(shards))]
+        settings = self._shard_settings()
+        
+        # 'spawn' évite de dupliquer les threads internes de MediaPipe/OpenCV
+        ctx = multiprocessing.get_context("spawn")
+        
+        try:
+            with ctx.Manager() as manager, \
+                    ProcessPoolExecutor(max_workers=len(shards), mp_context=ctx) as executor:
+                progress_queue = manager.Queue()
+                futures = [
+                    executor.submit(
+                        _render_shard,
+                        self.input_path,
+                        segment_paths[i],
+                        start,
+                        end,
+                        settings,
+                        selected_faces,
+                        draw_detections,
+                        progress_queue,
+                        cache_path,
+                        record_detections
+                    )
+                    for i, (start, end) in enumerate(shards)
+                ]
+                
+                # Agréger la progression des processus de rendu
+                frames_processed = 0
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=0.25, return_when=FIRST_EXCEPTION)
+                    while not progress_queue.empty():
+                        frames_delta, reused_delta, cached_delta = progress_queue.get()
+                        frames_processed += frames_delta
+                        self._worker_reused_frames += reused_delta
+                        self._worker_cached_frames += cached_delta
+                    self._update_progress(frames_processed, start_time)
+                    
+                    # Propager une éventuelle erreur d'un processus
+                    for future in done:
+                        if future.exception() is not None:
+                            for other in pending:
+                                other.cancel()
+                            raise future.exception()
+                
+                results = [future.result() for future in futures]
+            
+            # Rapatrier les mesures des processus de rendu
+            for result in results:
+                REGISTRY.merge(result["metrics"])
+            
+            concat_segments(
+                segment_paths,
+                self.output_path,
+                self.fps,
+                (self.width, self.height),
+                audio_source=self.input_path if self.encoder == "ffmpeg" else None
+            )
+        finally:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+        
+        if record_detections:
+            return [result["detections"] for result in results]
+        return None
+
     def get_status(self) -> Dict[str, Any]:
         """Retourne le statut actuel du traitement."""
         return self.processing_status
 
 
+# Marqueur de fin de flux entre les étapes du pipeline
+_PIPELINE_END = object()
+
+
+def _pipeline_put(target: queue.Queue, item: Any, stop_event: threading.Event) -> bool:
+    """
+    Dépose un élément dans une file bornée en attendant qu'une place se libère.
+    
+    Returns:
+        False si le pipeline a été arrêté avant que l'élément soit déposé
+    """
+    while not stop_event.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pipeline_items(source: queue.Queue, stop_event: threading.Event) -> Iterator[Any]:
+    """Itère sur les éléments d'une file jusqu'au marqueur de fin ou à l'arrêt du pipeline."""
+    while not stop_event.is_set():
+        try:
+            item = source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _PIPELINE_END:
+            return
+        yield item
+
+
+def _render_shard(input_path: str,
+                  output_path: str,
+                  start_frame: int,
+                  end_frame: Optional[int],
+                  settings: Dict[str, Any],
+                  selected_faces: Optional[List[int]],
+                  draw_detections: bool,
+                  progress_queue,
+                  cache_path: Optional[str] = None,
+                  record_detections: bool = False) -> Dict[str, Any]:
+    """
+    Point d'entrée d'un processus de rendu: traite une plage d'images avec
+    son propre FaceDetector et BlurProcessor.
+    
+    Returns:
+        Dictionnaire avec le nombre d'images écrites, les mesures du segment et,
+        si record_detections, les détections de la plage
+    """
+    from core.face_detector import FaceDetector
+    from core.blur_processor import BlurProcessor
+    
+    # Un seul thread OpenCV par processus pour que le parallélisme vienne des processus
+    cv2.setNumThreads(1)
+    
+    # Les mesures de ce segment sont renvoyées au processus principal
+    REGISTRY.reset()
+    
+    face_detector = FaceDetector(**settings["detector"])
+    blur_processor = BlurProcessor(**settings["blur"])
+    processor = VideoProcessor(input_path, output_path, face_detector, blur_processor, **settings["processor"])
+    
+    cached_detections = CachedDetections.load(cache_path) if cache_path else None
+    recorder = DetectionRecorder() if record_detections else None
+    
+    # Regrouper les notifications pour limiter les échanges entre processus
+    pending = [0]
+    reported_reuse = [0]
+    reported_cached = [0]
+    
+    def flush_progress():
+        reused_frames = sum(gate.reused_frames for gate in processor._frame_gates)
+        cached_frames = sum(detector.frames_served for detector in processor._stored_detectors)
+        progress_queue.put((pending[0], reused_frames - reported_reuse[0], cached_frames - reported_cached[0]))
+        pending[0] = 0
+        reported_reuse[0] = reused_frames
+        reported_cached[0] = cached_frames
+    
+    def on_progress(count: int):
+        pending[0] += count
+        if pending[0] >= 10:
+            flush_progress()
+    
+    try:
+        frames_written = processor._render_segment(
+            output_path, start_frame, end_frame, selected_faces, draw_detections, on_progress,
+            cached_detections=cached_detections, recorder=recorder
+        )
+        return {
+            "frames_written": frames_written,
+            "detections": recorder.to_arrays() if recorder else None,
+            "metrics": REGISTRY.snapshot()
+        }
+    finally:
+        if pending[0]:
+            flush_progress()
+        face_detector.release()
+
+
+def concat_segments(segment_paths: List[str],
+                    output_path: str,
+                    fps: float,
+                    size: Tuple[int, int],
+                    audio_source: Optional[str] = None):
+    """
+    Assemble des segments vidéo consécutifs dans un seul fichier.
+    
+    Utilise le démultiplexeur concat de ffmpeg (sans réencodage) et se replie
+    sur une copie image par image avec OpenCV si ffmpeg n'est pas disponible.
+    
+    Args:
+        segment_paths: Chemins des segments dans l'ordre
+        output_path: Chemin du fichier de sortie
+        fps: Images par seconde de la sortie (repli OpenCV)
+        size: (largeur, hauteur) de la sortie (repli OpenCV)
+        audio_source: Fichier dont la piste audio est copiée dans la sortie (ffmpeg uniquement)
+    """
+    list_path = os.path.join(os.path.dirname(segment_paths[0]), "segments.txt")
+    with open(list_path, "w") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+    
+    try:
+        streams = [ffmpeg.input(list_path, format="concat", safe=0).video]
+        if audio_source:
+            # 'a?' : la piste audio est facultative dans la source
+            streams.append(ffmpeg.input(audio_source)["a?"])
+        (
+            ffmpeg
+            .output(*streams, output_path, c="copy", movflags="+faststart")
+            .overwrite_output()
+            .run(quiet=True)
+        )
+        return
+    except (ffmpeg.Error, FileNotFoundError, OSError) as e:
+        print(f"Concaténation ffmpeg impossible, repli sur OpenCV: {e}")
+    
+    out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    try:
+        for path in segment_paths:
+            cap = cv2.VideoCapture(path)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                out.write(frame)
+            cap.release()
+    finally:
+        out.release()
+
+
+# Informations déjà lues, indexées par (chemin, taille, date de modification), de la plus ancienne à la plus récente
+_video_info_cache: "OrderedDict[Tuple[str, int, float], Dict[str, Any]]" = OrderedDict()
+_video_info_lock = threading.Lock()
+
+
 def get_video_info(video_path: str) -> Dict[str, Any]:
     """
     Récupère les informations sur une vidéo.
     
+    Les informations sont lues dans les en-têtes du conteneur par ffprobe (sans
+    initialiser de décodeur) puis gardées en mémoire tant que le fichier ne change pas.
+    
     Args:
         video_path: Chemin du fichier vidéo
         
@@ -203,24 +966,20 @@ def get_video_info(video_path: str) -> Dict[str, Any]:
         Dictionnaire contenant les informations de la vidéo
     """
     try:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            return {
-                "success": False,
-                "error": f"Impossible d'ouvrir la vidéo: {video_path}"
-            }
+        stat = os.stat(video_path)
+        cache_key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime)
         
-        info = {
-            "success": True,
-            "path": video_path,
-            "filename": os.path.basename(video_path),
-            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-            "fps": cap.get(cv2.CAP_PROP_FPS),
-            "frame_count": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
-            "duration": int(cap.get(cv2.CAP_PROP_FRAME_COUNT) / cap.get(cv2.CAP_PROP_FPS)),
-            "format": os.path.splitext(video_path)[1][1:].upper()
-        }
+        with _video_info_lock:
+            if cache_key in _video_info_cache:
+                _video_info_cache.move_to_end(cache_key)
+                return {**_video_info_cache[cache_key], "path": video_path}
+        
+        info = _probe_video_info(video_path)
+        if info is None:
+            # ffprobe indisponible ou en échec: ouvrir la vidéo avec OpenCV
+            info = _read_video_info_opencv(video_path)
+        if not info["success"]:
+            return info
         
         # Calculer la durée au format hh:mm:ss
         total_seconds = info["duration"]
@@ -229,8 +988,11 @@ def get_video_info(video_path: str) -> Dict[str, Any]:
         seconds = total_seconds % 60
         info["duration_str"] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
         
-        cap.release()
-        return info
+        with _video_info_lock:
+            _video_info_cache[cache_key] = info
+            while len(_video_info_cache) > config.VIDEO_INFO_CACHE_SIZE:
+                _video_info_cache.popitem(last=False)
+        return dict(info)
         
     except Exception as e:
         return {
@@ -239,6 +1001,111 @@ def get_video_info(video_path: str) -> Dict[str, Any]:
         }
 
 
+def _parse_rate(rate: Optional[str]) -> float:
+    """Convertit une fréquence ffprobe ('30000/1001') en nombre d'images par seconde."""
+    try:
+        numerator, _, denominator = (rate or "0").partition("/")
+        return float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _probe_video_info(video_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Lit les informations d'une vidéo dans les en-têtes du conteneur avec ffprobe.
+    
+    Returns:
+        Dictionnaire des informations, ou None si ffprobe est indisponible ou échoue
+    """
+    try:
+        probe = ffmpeg.probe(video_path)
+    except (ffmpeg.Error, FileNotFoundError, OSError):
+        return None
+    
+    streams = probe.get("streams", [])
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+    if video is None:
+        return {
+            "success": False,
+            "error": f"Aucun flux vidéo dans le fichier: {video_path}"
+        }
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), None)
+    container = probe.get("format", {})
+    
+    fps = _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate"))
+    duration = float(video.get("duration") or container.get("duration") or 0.0)
+    frame_count = int(video.get("nb_frames") or 0) or int(round(duration * fps))
+    
+    # Rotation: étiquette 'rotate' (anciens fichiers) ou matrice d'affichage
+    rotation = int(float(video.get("tags", {}).get("rotate", 0)))
+    for side_data in video.get("side_data_list", []):
+        if "rotation" in side_data:
+            rotation = int(float(side_data["rotation"]))
+    rotation %= 360
+    
+    # OpenCV applique la rotation: les images lues ont les dimensions affichées
+    width, height = int(video.get("width", 0)), int(video.get("height", 0))
+    if rotation in (90, 270):
+        width, height = height, width
+    
+    bit_rate = video.get("bit_rate") or container.get("bit_rate")
+    
+    return {
+        "success": True,
+        "path": video_path,
+        "filename": os.path.basename(video_path),
+        "width": width,
+        "height": height,
+        "fps": fps,
+        "frame_count": frame_count,
+        "duration": int(duration),
+        "format": os.path.splitext(video_path)[1][1:].upper(),
+        "container": container.get("format_name"),
+        "codec": video.get("codec_name"),
+        "bit_rate": int(bit_rate) if bit_rate else None,
+        "rotation": rotation,
+        "has_audio": audio is not None,
+        "audio_codec": audio.get("codec_name") if audio else None
+    }
+
+
+def _read_video_info_opencv(video_path: str) -> Dict[str, Any]:
+    """Lit les informations d'une vidéo en l'ouvrant avec OpenCV (repli sans ffprobe)."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return {
+            "success": False,
+            "error": f"Impossible d'ouvrir la vidéo: {video_path}"
+        }
+    
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        codec = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ") or None
+        
+        return {
+            "success": True,
+            "path": video_path,
+            "filename": os.path.basename(video_path),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": fps,
+            # Certains conteneurs annoncent 0 image par seconde
+            "duration": int(frame_count / fps) if fps > 0 else 0,
+            "frame_count": frame_count,
+            "format": os.path.splitext(video_path)[1][1:].upper(),
+            "container": None,
+            "codec": codec,
+            "bit_rate": None,
+            "rotation": int(cap.get(cv2.CAP_PROP_ORIENTATION_META)) % 360,
+            "has_audio": None,
+            "audio_codec": None
+        }
+    finally:
+        cap.release()
+
+
 def extract_frame(video_path: str, frame_number: int) -> Tuple[bool, Optional[np.ndarray]]:
     """
     Extrait une image spécifique d'une vidéo.
@@ -251,27 +1118,8 @@ def extract_frame(video_path: str, frame_number: int) -> Tuple[bool, Optional[np
         Tuple (succès, image)
     """
     try:
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            return False, None
-        
-        # Vérifier que le numéro d'image est valide
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        if frame_number < 0 or frame_number >= total_frames:
-            cap.release()
-            return False, None
-        
-        # Positionner le curseur à l'image souhaitée
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-        
-        # Lire l'image
-        ret, frame = cap.read()
-        cap.release()
-        
-        if not ret:
-            return False, None
-        
-        return True, frame
+        # Capture déjà ouverte et positionnée si possible, décodage depuis l'image clé précédente sinon
+        return CAPTURE_POOL.read_frame(video_path, frame_number)
         
     except Exception:
         return False, None
@@ -284,26 +1132,5 @@ def get_available_webcams() -> List[Dict[str, Any]]:
     Returns:
         Liste des webcams disponibles avec leurs informations
     """
-    available_cameras = []
-    
-    # Tester les 10 premiers indices de caméra (0-9)
-    for i in range(10):
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            # Récupérer les informations de la caméra
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            
-            available_cameras.append({
-                "device_id": i,
-                "name": f"Caméra {i}",
-                "width": width,
-                "height": height,
-                "fps": fps
-            })
-            
-            # Libérer la caméra
-            cap.release()
-    
-    return available_cameras
\ No newline at end of file
+    # Registre tenu à jour en arrière-plan: aucune caméra n'est ouverte pendant l'appel
+    return CAMERA_REGISTRY.get_cameras()
\ No newline at end of file
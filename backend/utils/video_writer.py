@@ -0,0 +1,177 @@
+"""
+Encodeurs vidéo utilisés pour écrire les vidéos traitées.
+"""
+
+import threading
+import cv2
+import ffmpeg
+import numpy as np
+from typing import Optional, Tuple
+
+import config
+
+# Taille maximale (octets) des messages d'erreur de ffmpeg conservés pour le rapport d'échec
+FFMPEG_STDERR_LIMIT = 64 * 1024
+
+class FFmpegVideoWriter:
+    """
+    Encodeur qui envoie les images brutes (BGR) à un sous-processus ffmpeg
+    par un tube, avec copie de la piste audio de la vidéo source.
+
+    Expose les mêmes méthodes write/release que cv2.VideoWriter.
+    """
+
+    def __init__(self,
+                 output_path: str,
+                 fps: float,
+                 size: Tuple[int, int],
+                 codec: str = "libx264",
+                 preset: str = "veryfast",
+                 crf: int = 23,
+                 audio_source: Optional[str] = None):
+        """
+        Démarre le sous-processus ffmpeg.
+
+        Args:
+            output_path: Chemin du fichier vidéo de sortie
+            fps: Images par seconde
+            size: (largeur, hauteur) des images écrites
+            codec: Codec vidéo ffmpeg (libx264, libx265, libvpx-vp9...)
+            preset: Préréglage vitesse/compression du codec
+            crf: Facteur de qualité constante (plus bas = meilleure qualité)
+            audio_source: Fichier dont la piste audio est copiée sans réencodage (None = pas d'audio)
+        """
+        self.output_path = output_path
+        self.size = size
+        width, height = size
+
+        video = ffmpeg.input(
+            "pipe:",
+            format="rawvideo",
+            pix_fmt="bgr24",
+            s=f"{width}x{height}",
+            framerate=fps or config.DEFAULT_FPS
+        )
+
+        output_kwargs = {
+            "vcodec": codec,
+            "preset": preset,
+            "crf": crf,
+            "pix_fmt": "yuv420p",
+            "movflags": "+faststart"
+        }
+
+        # yuv420p impose des dimensions paires
+        if width % 2 or height % 2:
+            output_kwargs["vf"] = "pad=ceil(iw/2)*2:ceil(ih/2)*2"
+
+        if audio_source:
+            # 'a?' : la piste audio est facultative dans la source
+            audio = ffmpeg.input(audio_source)["a?"]
+            stream = ffmpeg.output(video, audio, output_path, acodec="copy", **output_kwargs)
+        else:
+            stream = ffmpeg.output(video, output_path, **output_kwargs)
+
+        self.process = (
+            stream
+            .global_args("-loglevel", "error")
+            .overwrite_output()
+            .run_async(pipe_stdin=True, pipe_stderr=True)
+        )
+
+        # Vider stderr en continu: un tube plein bloquerait ffmpeg, puis write() sur stdin
+        self._error_output = bytearray()
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr, args=(self.process.stderr,), name="ffmpeg-stderr", daemon=True
+        )
+        self._stderr_thread.start()
+
+        if self.process.poll() is not None:
+            # ffmpeg s'est déjà arrêté (codec absent, option invalide)
+            process = self.process
+            self.process = None
+            raise self._encoding_error(process)
+
+    def _encoding_error(self, process) -> RuntimeError:
+        """Attend la fin de ffmpeg et construit l'erreur à partir de ses messages."""
+        try:
+            process.stdin.close()
+        except OSError:
+            # Tube déjà rompu par l'arrêt de ffmpeg
+            pass
+        process.wait()
+        self._stderr_thread.join()
+        error_output = bytes(self._error_output).decode('utf-8', errors='replace').strip()
+        return RuntimeError(f"Échec de l'encodage ffmpeg ({process.returncode}): {error_output}")
+
+    def _drain_stderr(self, stderr):
+        """Lit les messages de ffmpeg au fil de l'eau en ne gardant que les plus récents."""
+        for chunk in iter(lambda: stderr.read1(4096), b""):
+            self._error_output += chunk
+            if len(self._error_output) > FFMPEG_STDERR_LIMIT:
+                del self._error_output[:-FFMPEG_STDERR_LIMIT]
+
+    def isOpened(self) -> bool:
+        """Indique si le sous-processus ffmpeg accepte encore des images."""
+        return self.process is not None and self.process.poll() is None
+
+    def write(self, frame: np.ndarray):
+        """
+        Envoie une image à ffmpeg.
+
+        Args:
+            frame: Image BGR aux dimensions annoncées à la création
+        """
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            frame = cv2.resize(frame, self.size)
+        try:
+            self.process.stdin.write(np.ascontiguousarray(frame).data)
+        except OSError:
+            # Tube rompu (BrokenPipeError): ffmpeg s'est arrêté, rapporter ses messages
+            process = self.process
+            self.process = None
+            raise self._encoding_error(process)
+
+    def release(self):
+        """Termine l'encodage et attend la fin du sous-processus ffmpeg."""
+        if self.process is None:
+            return
+
+        process = self.process
+        self.process = None
+        error = self._encoding_error(process)
+        if process.returncode != 0:
+            raise error
+
+
+def create_video_writer(output_path: str,
+                        fps: float,
+                        size: Tuple[int, int],
+                        encoder: str = "opencv",
+                        audio_source: Optional[str] = None,
+                        **encoder_options):
+    """
+    Crée l'encodeur vidéo demandé.
+
+    Args:
+        output_path: Chemin du fichier vidéo de sortie
+        fps: Images par seconde
+        size: (largeur, hauteur) des images écrites
+        encoder: 'ffmpeg' (tube vers ffmpeg, audio conservé) ou 'opencv' (cv2.VideoWriter mp4v)
+        audio_source: Fichier dont la piste audio est copiée (encodeur ffmpeg uniquement)
+        **encoder_options: Options de FFmpegVideoWriter (codec, preset, crf)
+
+    Returns:
+        Objet exposant write(frame) et release()
+    """
+    if encoder == "ffmpeg":
+        try:
+            return FFmpegVideoWriter(output_path, fps, size, audio_source=audio_source, **encoder_options)
+        except (FileNotFoundError, OSError, RuntimeError) as e:
+            # Binaire absent ou ffmpeg arrêté dès son lancement
+            print(f"ffmpeg indisponible, repli sur l'encodeur OpenCV: {e}")
+    elif encoder != "opencv":
+        raise ValueError(f"Encodeur vidéo '{encoder}' non supporté.")
+
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec MP4
+    return cv2.VideoWriter(output_path, fourcc, fps, size)
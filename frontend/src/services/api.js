@@ -104,6 +104,45 @@ const sessionService = {
   }
 };
 
+// Service pour les traitements vidéo asynchrones
+const jobService = {
+  /**
+   * Lance le traitement de la vidéo d'une session en arrière-plan
+   * @param {string} sessionId - ID de la session
+   * @returns {Promise} - Promesse avec l'ID du job
+   */
+  submitJob(sessionId) {
+    return apiClient.post(`/session/${sessionId}/jobs`);
+  },
+
+  /**
+   * Récupère la progression d'un job
+   * @param {string} jobId - ID du job
+   * @returns {Promise}
+   */
+  getJob(jobId) {
+    return apiClient.get(`/jobs/${jobId}`);
+  },
+
+  /**
+   * Récupère l'URL du flux de progression (Server-Sent Events)
+   * @param {string} jobId - ID du job
+   * @returns {string} - URL du flux d'événements
+   */
+  getEventsUrl(jobId) {
+    return `${apiClient.defaults.baseURL}/jobs/${jobId}/events`;
+  },
+
+  /**
+   * Récupère l'URL de la vidéo produite par un job terminé
+   * @param {string} jobId - ID du job
+   * @returns {string} - URL du fichier
+   */
+  getFileUrl(jobId) {
+    return `${apiClient.defaults.baseURL}/jobs/${jobId}/file`;
+  }
+};
+
 // Service pour les webcams
 const webcamService = {
   /**
@@ -143,5 +182,6 @@ const videoService = {
 export default {
   sessionService,
   webcamService,
-  videoService
+  videoService,
+  jobService
 };
\ No newline at end of file
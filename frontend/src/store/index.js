@@ -297,8 +297,34 @@ export default createStore({
       try {
         commit('SET_LOADING', true);
         
+        // Lancer le traitement en arrière-plan
+        const response = await api.jobService.submitJob(state.session.id);
+        if (!response.data.success) {
+          throw new Error(response.data.error || 'Impossible de lancer le traitement');
+        }
+        const jobId = response.data.job_id;
+        
+        // Attendre la fin du traitement via le flux de progression
+        await new Promise((resolve, reject) => {
+          const events = new EventSource(api.jobService.getEventsUrl(jobId));
+          events.onmessage = (event) => {
+            const status = JSON.parse(event.data);
+            if (status.status === 'completed') {
+              events.close();
+              resolve(status);
+            } else if (status.status === 'error') {
+              events.close();
+              reject(new Error(status.error_message || 'Échec du traitement vidéo'));
+            }
+          };
+          events.onerror = () => {
+            events.close();
+            reject(new Error('Connexion au suivi du traitement perdue'));
+          };
+        });
+        
         // Créer un lien de téléchargement
-        const downloadUrl = api.sessionService.getDownloadUrl(state.session.id);
+        const downloadUrl = api.jobService.getFileUrl(jobId);
         
         // Créer un lien invisible et déclencher le téléchargement
         const link = document.createElement('a');